@@ -8,6 +8,9 @@ import serial
 import time
 import random
 import numpy as np
+from transporte import abrir_transporte, PUERTOS_VIRTUALES
+from codificador_tramas import verificar_trama
+from encuadre_uart import ENCUADRE_PREDETERMINADO, ENCUADRES_COMUNES, obtener_encuadre
 
 class AnalizadorProtocolo(tk.Tk):
     """Analizador de protocolo RS-232.
@@ -40,7 +43,7 @@ class AnalizadorProtocolo(tk.Tk):
         # Controles
         self.puerto_label = ttk.Label(self.control_frame, text="Puerto:")
         self.puerto_label.pack(side=tk.LEFT, padx=5)
-        self.puerto_combo = ttk.Combobox(self.control_frame, values=self.DEFAULT_PORTS)
+        self.puerto_combo = ttk.Combobox(self.control_frame, values=self.DEFAULT_PORTS + PUERTOS_VIRTUALES)
         self.puerto_combo.set(self.DEFAULT_PORTS[1])  # /dev/ttyS1 por defecto
         self.puerto_combo.pack(side=tk.LEFT, padx=5)
         
@@ -50,6 +53,12 @@ class AnalizadorProtocolo(tk.Tk):
         self.velocidad_combo.set(self.DEFAULT_BAUD_RATES[0])  # 9600 por defecto
         self.velocidad_combo.pack(side=tk.LEFT, padx=5)
         
+        self.encuadre_label = ttk.Label(self.control_frame, text="Encuadre:")
+        self.encuadre_label.pack(side=tk.LEFT, padx=5)
+        self.encuadre_combo = ttk.Combobox(self.control_frame, values=ENCUADRES_COMUNES, width=6)
+        self.encuadre_combo.set(ENCUADRE_PREDETERMINADO)
+        self.encuadre_combo.pack(side=tk.LEFT, padx=5)
+        
         self.iniciar_btn = ttk.Button(self.control_frame, text="Iniciar Análisis", 
                                     command=self.iniciar_analisis)
         self.iniciar_btn.pack(side=tk.LEFT, padx=20)
@@ -101,13 +110,12 @@ class AnalizadorProtocolo(tk.Tk):
                 # Configurar puerto serie
                 self.puerto = self.puerto_combo.get()
                 baudrate = int(self.velocidad_combo.get())
-                self.ser = serial.Serial(
-                    port=self.puerto,
+                self.encuadre = obtener_encuadre(self.encuadre_combo.get())
+                self.ser = abrir_transporte(
+                    self.puerto,
                     baudrate=baudrate,
-                    bytesize=serial.EIGHTBITS,
-                    parity=serial.PARITY_NONE,
-                    stopbits=serial.STOPBITS_ONE,
-                    timeout=0.1
+                    timeout=0.1,
+                    **self.encuadre.opciones_serial()
                 )
                 
                 self.analizando = True
@@ -117,7 +125,7 @@ class AnalizadorProtocolo(tk.Tk):
                 self.y_data = []
                 self.analizar_trama()
                 
-            except serial.SerialException as e:
+            except (serial.SerialException, ValueError) as e:
                 messagebox.showerror("Error", f"Error al abrir el puerto {self.puerto}: {str(e)}")
                 self.analizando = False
                 self.iniciar_btn.config(text="Iniciar Análisis")
@@ -142,15 +150,13 @@ class AnalizadorProtocolo(tk.Tk):
                         trama = partes[0].split(":")[1]
                         valor = float(partes[1].split(":")[1])
                         
-                        # Analizar partes de la trama
-                        bit_inicio = trama[0]
-                        bits_datos = trama[1:9]
-                        bit_paridad = trama[9]
-                        bit_parada = trama[10]
-                        
-                        # Verificar paridad
-                        paridad_calculada = '1' if bits_datos.count('1') % 2 == 0 else '0'
-                        paridad_correcta = paridad_calculada == bit_paridad
+                        # Analizar partes de la trama según el encuadre
+                        partes = verificar_trama(trama, self.encuadre)
+                        bit_inicio = partes.bit_inicio
+                        bits_datos = partes.bits_datos
+                        bit_paridad = partes.bit_paridad or "-"
+                        bit_parada = partes.bit_parada
+                        paridad_correcta = partes.paridad_correcta
                         
                         # Actualizar información en la interfaz
                         self.bits_text.delete('1.0', tk.END)
@@ -162,7 +168,7 @@ class AnalizadorProtocolo(tk.Tk):
                         self.explicacion_text.insert(tk.END, f"1. Bit de inicio: {bit_inicio} ({'-12V' if bit_inicio == '0' else '+12V'})\n")
                         self.explicacion_text.insert(tk.END, f"2. Bits de datos: {bits_datos} (Valor: {int(bits_datos, 2)})\n")
                         self.explicacion_text.insert(tk.END, f"3. Bit de paridad: {bit_paridad} ({'Correcto' if paridad_correcta else 'Error'})\n")
-                        self.explicacion_text.insert(tk.END, f"4. Bit de parada: {bit_parada} ({'+12V' if bit_parada == '1' else '-12V'})\n")
+                        self.explicacion_text.insert(tk.END, f"4. Bit de parada: {bit_parada} ({'+12V' if partes.parada_correcta else '-12V'})\n")
                         self.explicacion_text.insert(tk.END, f"\nVoltaje actual: {valor:.2f}V")
                         self.explicacion_text.insert(tk.END, f"\nVelocidad: {self.velocidad_combo.get()} bps")
                         self.explicacion_text.insert(tk.END, f"\nTiempo por bit: {self.tiempo_bit:.2f} ms")
@@ -1,14 +1,27 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
+from tkinter import filedialog
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import serial
 import serial.tools.list_ports
 import time
-import random
 import numpy as np
+from parser_flujo import ParserFlujo
+from multiplexor_puertos import CanalPuerto, MultiplexorPuertos, nombre_para_archivo
+from renderizador_senal import RenderizadorSenal
+from senal_analizador import SenalAnalizador
+from codificador_tramas import BITS_TRAMA, verificar_trama
+from encuadre_uart import ENCUADRE_PREDETERMINADO, ENCUADRES_COMUNES, NOMBRES_PARIDAD, obtener_encuadre
+from transporte import abrir_transporte, PUERTOS_VIRTUALES
+from control_flujo import MODOS_FLUJO, SIN_CONTROL, comprobar_modo
+from monitor_lineas import LINEAS_ENTRADA
+from latencia import MedidorLatencia
+from perfilador import Perfilador, agregar_menu_perfil
+from captura import (EXTENSION, VELOCIDADES_REPRODUCCION, FuenteReproduccion,
+                     GrabadorCaptura, velocidad_de_texto)
 
 class AnalizadorProtocolo(tk.Tk):
     """Analizador de protocolo RS-232.
@@ -23,6 +36,27 @@ class AnalizadorProtocolo(tk.Tk):
     DEFAULT_BAUD_RATES = ["9600", "19200", "38400", "57600", "115200"]
     DEFAULT_PORTS = ["COM6", "COM7", "COM8"]
     VOLTAGE_RANGE = (-12, 12)  # Voltaje mínimo y máximo en V
+    DEFAULT_REFRESH_RATES = ["10", "30", "60"]  # Refrescos de pantalla en Hz
+    MAX_TRAMAS_POR_REFRESCO = 2000  # Tramas que se dibujan como máximo por refresco
+    CAPACIDAD_HISTORIAL = 1_000_000  # Muestras de señal conservadas
+    SOBREMUESTREO = 10  # Muestras sintetizadas por bit
+    SEMILLA_RUIDO = 0  # Semilla del ruido de la señal sintetizada
+    TRAMAS_VISIBLES = 10  # Tramas en la ventana visible
+    ZOOM_INICIAL = np.log2(TRAMAS_VISIBLES * BITS_TRAMA)  # log2 de los bits visibles al abrir
+    ZOOM_MAXIMO = 30  # log2 de los bits visibles con el zoom más alejado
+    SEPARADOR_PUERTOS = ","  # Varios puertos a la vez: "COM6, COM7" o "/dev/ttyUSB0,/dev/ttyUSB1"
+    ANCHO_TIRA = 240  # Tamaño en píxeles de la tira de cada puerto en el resumen
+    ALTO_TIRA = 28
+    FILAS_RESUMEN = 6  # Filas visibles del resumen antes de desplazarse
+    TODOS_SENSORES = "Todos"  # Sin filtro de sensor en un bus multiplexado
+    INTERVALO_SENSORES = 1.0  # s entre actualizaciones de la tabla de sensores
+    VENTANA_LINEAS = 10.0  # s de historia en la línea de tiempo de las líneas de control
+    INTERVALO_LINEAS = 0.1  # s entre redibujados de esa línea de tiempo
+    ALTO_LINEA = 18  # Píxeles de cada línea de control en la línea de tiempo
+    MARGEN_LINEAS = 40  # Píxeles a la izquierda para el nombre de la línea
+    EVENTOS_LINEAS = 5  # Últimos cambios listados junto a la línea de tiempo
+    FUNCIONES_PERFIL = ["analizar_trama", "generar_puntos_señal", "actualizar_grafico", "mostrar_trama",
+                        "actualizar_resumen", "actualizar_sensores", "actualizar_lineas"]
     
     def __init__(self):
         """Inicializa la aplicación y configura la interfaz gráfica."""
@@ -30,11 +64,14 @@ class AnalizadorProtocolo(tk.Tk):
         self.title("Analizador de Protocolo RS-232")
         self.geometry(self.DEFAULT_WINDOW_SIZE)
         
-        # Detectar puertos COM disponibles
-        puertos = [p.device for p in serial.tools.list_ports.comports() if 'COM' in p.device]
+        # Detectar puertos disponibles (COMx en Windows, /dev/tty* en Linux y macOS)
+        puertos = [p.device for p in serial.tools.list_ports.comports()]
         if puertos:
             self.DEFAULT_PORTS = puertos
-        print(f"Puertos COM detectados: {puertos if puertos else 'Ninguno'}")
+            if len(puertos) > 1:
+                # Opción para monitorear todos los puertos detectados a la vez
+                self.DEFAULT_PORTS = puertos + [f"{self.SEPARADOR_PUERTOS} ".join(puertos)]
+        print(f"Puertos detectados: {puertos if puertos else 'Ninguno'}")
         
         # Crear el frame principal
         self.main_frame = ttk.Frame(self)
@@ -47,7 +84,7 @@ class AnalizadorProtocolo(tk.Tk):
         # Controles
         self.puerto_label = ttk.Label(self.control_frame, text="Puerto:")
         self.puerto_label.pack(side=tk.LEFT, padx=5)
-        self.puerto_combo = ttk.Combobox(self.control_frame, values=self.DEFAULT_PORTS)
+        self.puerto_combo = ttk.Combobox(self.control_frame, values=self.DEFAULT_PORTS + PUERTOS_VIRTUALES)
         self.puerto_combo.set("COM7")  # COM7 por defecto para recibir de COM6
         self.puerto_combo.pack(side=tk.LEFT, padx=5)
         
@@ -57,10 +94,48 @@ class AnalizadorProtocolo(tk.Tk):
         self.velocidad_combo.set(self.DEFAULT_BAUD_RATES[0])  # 9600 por defecto
         self.velocidad_combo.pack(side=tk.LEFT, padx=5)
         
+        # Encuadre esperado: configura la línea y la verificación de las tramas
+        ttk.Label(self.control_frame, text="Encuadre:").pack(side=tk.LEFT, padx=5)
+        self.encuadre_combo = ttk.Combobox(self.control_frame, values=ENCUADRES_COMUNES, width=6)
+        self.encuadre_combo.set(ENCUADRE_PREDETERMINADO)
+        self.encuadre_combo.pack(side=tk.LEFT, padx=5)
+        
+        # Control de flujo hacia el transmisor cuando la interfaz se atrasa
+        ttk.Label(self.control_frame, text="Flujo:").pack(side=tk.LEFT, padx=5)
+        self.flujo_combo = ttk.Combobox(self.control_frame, values=MODOS_FLUJO, width=9)
+        self.flujo_combo.set(SIN_CONTROL)
+        self.flujo_combo.pack(side=tk.LEFT, padx=5)
+        
+        self.refresco_label = ttk.Label(self.control_frame, text="Refresco (Hz):")
+        self.refresco_label.pack(side=tk.LEFT, padx=5)
+        self.refresco_combo = ttk.Combobox(self.control_frame, values=self.DEFAULT_REFRESH_RATES, width=5)
+        self.refresco_combo.set(self.DEFAULT_REFRESH_RATES[1])  # 30 Hz por defecto
+        self.refresco_combo.pack(side=tk.LEFT, padx=5)
+        
         self.iniciar_btn = ttk.Button(self.control_frame, text="Iniciar Análisis", 
                                     command=self.iniciar_analisis)
         self.iniciar_btn.pack(side=tk.LEFT, padx=20)
         
+        # Grabación de lo recibido y reproducción de capturas
+        self.grabar_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.control_frame, text="Grabar captura",
+                        variable=self.grabar_var).pack(side=tk.LEFT, padx=5)
+        self.reproduccion_combo = ttk.Combobox(self.control_frame, values=VELOCIDADES_REPRODUCCION, width=5)
+        self.reproduccion_combo.set(VELOCIDADES_REPRODUCCION[0])
+        self.reproduccion_combo.pack(side=tk.LEFT, padx=5)
+        self.reproducir_btn = ttk.Button(self.control_frame, text="Reproducir...",
+                                         command=self.reproducir_captura)
+        self.reproducir_btn.pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.control_frame, text="Guardar latencias...",
+                   command=self.guardar_latencias).pack(side=tk.LEFT, padx=5)
+        
+        # Sensor que se muestra en detalle cuando la línea es un bus multiplexado
+        ttk.Label(self.control_frame, text="Sensor:").pack(side=tk.LEFT, padx=5)
+        self.sensor_combo = ttk.Combobox(self.control_frame, values=[self.TODOS_SENSORES], width=8)
+        self.sensor_combo.set(self.TODOS_SENSORES)
+        self.sensor_combo.bind("<<ComboboxSelected>>", lambda _: self.filtrar_sensor())
+        self.sensor_combo.pack(side=tk.LEFT, padx=5)
+        
         # Panel de visualización
         self.visual_frame = ttk.Frame(self.main_frame)
         self.visual_frame.pack(fill=tk.BOTH, expand=True, pady=10)
@@ -69,15 +144,54 @@ class AnalizadorProtocolo(tk.Tk):
         self.fig = Figure(figsize=(12, 4))
         self.ax = self.fig.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.visual_frame)
-        self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
-        # Configurar gráfico
-        self.ax.set_title("Análisis de Señal RS-232")
-        self.ax.set_ylabel("Voltaje (V)")
-        self.ax.set_xlabel("Tiempo (ms)")
-        self.ax.grid(True)
-        self.ax.set_ylim(-13, 13)
+        # Línea de tiempo de CTS, DSR, DCD y RI: se muestra si el enlace tiene esas líneas
+        self.lineas_frame = ttk.LabelFrame(self.visual_frame, text="Líneas de control", padding="5")
+        self.lineas_canvas = tk.Canvas(self.lineas_frame, height=self.ALTO_LINEA * len(LINEAS_ENTRADA),
+                                       bg="white", highlightthickness=0)
+        self.lineas_canvas.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.lineas_label = ttk.Label(self.lineas_frame, width=45, justify=tk.LEFT)
+        self.lineas_label.pack(side=tk.LEFT, padx=5)
+        self.lineas_trazos = {}  # Línea -> id del trazo en el canvas
+        self.lineas_visible = False
+        
+        # Desplazamiento por el historial (100 = en vivo)
+        self.historial_frame = ttk.Frame(self.visual_frame)
+        self.historial_frame.pack(fill=tk.X)
+        ttk.Label(self.historial_frame, text="Historial:").pack(side=tk.LEFT, padx=5)
+        self.historial_scale = ttk.Scale(self.historial_frame, from_=0, to=100, orient=tk.HORIZONTAL,
+                                         command=lambda _: self.actualizar_grafico())
+        self.historial_scale.set(SenalAnalizador.EN_VIVO)
+        self.historial_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        # Zoom: log2 de la cantidad de bits visibles (de 1 bit a horas de captura)
+        ttk.Label(self.historial_frame, text="Zoom:").pack(side=tk.LEFT, padx=5)
+        self.zoom_scale = ttk.Scale(self.historial_frame, from_=self.ZOOM_MAXIMO, to=0, orient=tk.HORIZONTAL,
+                                    command=lambda _: self.actualizar_grafico())
+        self.zoom_scale.set(self.ZOOM_INICIAL)
+        self.zoom_scale.pack(side=tk.LEFT, padx=5)
+        
+        # Configurar gráfico: los artistas se crean una vez y se actualizan con blitting
+        self.renderizador = RenderizadorSenal(self.ax, self.canvas)
+        self.canvas.draw()
+        
+        # Resumen de puertos: se muestra solo al monitorear más de uno
+        self.resumen_frame = ttk.LabelFrame(self.main_frame, text="Puertos", padding="5")
+        self.resumen_label = ttk.Label(self.resumen_frame)
+        self.resumen_label.pack(fill=tk.X)
+        self.resumen_canvas = tk.Canvas(self.resumen_frame, highlightthickness=0,
+                                        height=self.FILAS_RESUMEN * (self.ALTO_TIRA + 4))
+        resumen_scroll = ttk.Scrollbar(self.resumen_frame, orient=tk.VERTICAL,
+                                       command=self.resumen_canvas.yview)
+        self.resumen_canvas.configure(yscrollcommand=resumen_scroll.set)
+        resumen_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.resumen_canvas.pack(fill=tk.X, expand=True)
+        self.filas_frame = ttk.Frame(self.resumen_canvas)
+        self.resumen_canvas.create_window(0, 0, window=self.filas_frame, anchor=tk.NW)
+        self.filas_frame.bind("<Configure>", lambda _: self.resumen_canvas.configure(
+            scrollregion=self.resumen_canvas.bbox(tk.ALL)))
+        self.detalle_var = tk.IntVar(value=0)
         
         # Panel de información
         self.info_frame = ttk.LabelFrame(self.main_frame, text="Análisis de Trama", padding="10")
@@ -90,157 +204,476 @@ class AnalizadorProtocolo(tk.Tk):
         self.bits_text = tk.Text(self.bits_frame, height=2, width=50)
         self.bits_text.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
+        # Tabla de sensores del bus: se muestra cuando llegan registros con CH
+        self.sensores_tree = ttk.Treeview(self.info_frame, columns=("registros", "tasa", "voltaje"),
+                                          height=6)
+        self.sensores_tree.heading("#0", text="Sensor")
+        self.sensores_tree.heading("registros", text="Registros")
+        self.sensores_tree.heading("tasa", text="Tramas/s")
+        self.sensores_tree.heading("voltaje", text="Último (V)")
+        for columna in ("#0", "registros", "tasa", "voltaje"):
+            self.sensores_tree.column(columna, width=80, anchor=tk.E)
+        self.sensores_visible = False
+        
         # Explicación
         self.explicacion_text = tk.Text(self.info_frame, height=6, width=50)
         self.explicacion_text.pack(fill=tk.BOTH, expand=True, pady=5)
         
         # Variables de control
         self.analizando = False
-        self.x_data = []
-        self.y_data = []
+        # Los niveles gruesos conservan, decimado, todo lo que abarca el zoom
+        self.senal = SenalAnalizador(self.CAPACIDAD_HISTORIAL, self.SOBREMUESTREO, self.SEMILLA_RUIDO,
+                                     cobertura=2 ** self.ZOOM_MAXIMO * self.SOBREMUESTREO)
         self.bits_actuales = []
+        self.encuadre = obtener_encuadre()
+        self.parser = ParserFlujo(self.encuadre)
+        self.lector = None
+        self.latencia = MedidorLatencia()
+        self.multiplexor = None
+        self.canales = []  # Un CanalPuerto por puerto monitoreado
+        self.canal = None  # Canal que se muestra en detalle
+        self.filas = []  # Widgets del resumen de cada canal
+        self.sensores_previos = {}  # Sensor -> registros en la última actualización de la tabla
+        self.sensores_instante = 0.0
+        self.lineas_instante = 0.0
         self.tiempo_bit = 1000 / int(self.velocidad_combo.get())  # ms
         
+        # Perfil opcional de los métodos críticos (menú Perfil o variable RS232_PERFIL)
+        self.perfilador = Perfilador(self, self.FUNCIONES_PERFIL, self.after,
+                                     prefijo="perfil_analizador")
+        self.perfilador.activar_desde_entorno()
+        agregar_menu_perfil(self, self.perfilador)
+        
     def iniciar_analisis(self):
         """Inicia o detiene el análisis de datos RS-232."""
         if not self.analizando:
+            # Uno o varios puertos separados por comas
+            nombres = [nombre.strip() for nombre in self.puerto_combo.get().split(self.SEPARADOR_PUERTOS)
+                       if nombre.strip()]
+            baudrate = int(self.velocidad_combo.get())
+            # La escala de tiempo de la señal sigue a la velocidad elegida
+            self.tiempo_bit = 1000 / baudrate  # ms
+            abiertos = []
+            nombre = ", ".join(nombres)  # Puerto que se está abriendo, para el mensaje de error
             try:
-                # Configurar puerto serie
-                self.puerto = self.puerto_combo.get()
-                baudrate = int(self.velocidad_combo.get())
-                self.ser = serial.Serial(
-                    port=self.puerto,
-                    baudrate=baudrate,
-                    bytesize=serial.EIGHTBITS,
-                    parity=serial.PARITY_NONE,
-                    stopbits=serial.STOPBITS_ONE,
-                    timeout=0.1
-                )
-                
-                self.analizando = True
-                self.iniciar_btn.config(text="Detener Análisis")
-                self.bits_actuales = []
-                self.x_data = []
-                self.y_data = []
-                self.analizar_trama()
-                
-            except serial.SerialException as e:
-                messagebox.showerror("Error", f"Error al abrir el puerto {self.puerto}: {str(e)}")
+                self.encuadre = obtener_encuadre(self.encuadre_combo.get())
+                for nombre in nombres:
+                    # Configurar puerto serie con el encuadre de las tramas
+                    abiertos.append(abrir_transporte(
+                        nombre,
+                        baudrate=baudrate,
+                        timeout=0.1,
+                        **self.encuadre.opciones_serial()
+                    ))
+                    comprobar_modo(abiertos[-1], self.flujo_combo.get())
+            except (serial.SerialException, ValueError) as e:
+                for ser in abiertos:
+                    ser.close()
+                messagebox.showerror("Error", f"Error al abrir el puerto {nombre}: {str(e)}")
                 self.analizando = False
                 self.iniciar_btn.config(text="Iniciar Análisis")
                 return
+            if not abiertos:
+                return
+            
+            # Los enlaces como pty:// informan en `port` la ruta que abre el otro lado
+            self.puerto = ", ".join(ser.port for ser in abiertos)
+            print(f"Analizando {self.puerto}")
+            self.comenzar_lectura(abiertos)
         else:
-            self.analizando = False
-            self.iniciar_btn.config(text="Iniciar Análisis")
-            if hasattr(self, 'ser') and self.ser.is_open:
-                self.ser.close()
+            self.detener_analisis()
                 
-    def analizar_trama(self):
-        """Analiza los datos recibidos del puerto serial."""
+    def reproducir_captura(self):
+        """Analiza una captura grabada como si llegara por el puerto."""
+        if self.analizando:
+            self.detener_analisis()
+        ruta = filedialog.askopenfilename(title="Reproducir captura",
+                                          filetypes=[("Capturas RS-232", f"*{EXTENSION}")])
+        if not ruta:
+            return
         try:
-            if self.ser and self.ser.is_open and self.analizando:
-                # Leer datos del puerto serial
-                if self.ser.in_waiting > 0:
-                    datos = self.ser.readline().decode().strip()
-                    print(f"Datos recibidos: {datos}")
-                else:
-                    datos = ""
+            self.puerto = ruta
+            self.tiempo_bit = 1000 / int(self.velocidad_combo.get())  # ms
+            self.encuadre = obtener_encuadre(self.encuadre_combo.get())
+            fuente = FuenteReproduccion(ruta, velocidad_de_texto(self.reproduccion_combo.get()))
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Error al abrir la captura {ruta}: {str(e)}")
+            return
+        self.comenzar_lectura([fuente])
+    
+    def comenzar_lectura(self, puertos):
+        """Reinicia el estado del análisis y empieza a leer los puertos.
+
+        Args:
+            puertos (list): Enlaces abiertos; el primero se muestra en detalle
+        """
+        self.analizando = True
+        self.iniciar_btn.config(text="Detener Análisis")
+        
+        # En una reproducción las marcas de tiempo del transmisor son de la
+        # grabación: no se mide la latencia ni se vuelve a grabar
+        reproduccion = isinstance(puertos[0], FuenteReproduccion)
+        fecha = time.strftime("%Y%m%d_%H%M%S")
+        
+        # Un solo hilo lee todos los puertos; la interfaz solo vacía las colas
+        self.multiplexor = MultiplexorPuertos()
+        self.canales = []
+        for ser in puertos:
+            grabador = None
+            if self.grabar_var.get() and not reproduccion:
+                # Opcionalmente grabar bloques crudos y tramas decodificadas, un archivo por puerto
+                ruta = f"captura_{fecha}{EXTENSION}"
+                if len(puertos) > 1:
+                    ruta = f"captura_{fecha}_{nombre_para_archivo(ser.port)}{EXTENSION}"
+                grabador = GrabadorCaptura(ruta)
+                print(f"Grabando captura de {ser.port} en {ruta}")
+            canal = CanalPuerto(ser, medir=not reproduccion, grabador=grabador,
+                                flujo=SIN_CONTROL if reproduccion else self.flujo_combo.get(),
+                                encuadre=self.encuadre)
+            self.canales.append(canal)
+            self.multiplexor.agregar(canal)
+        self.multiplexor.start()
+        
+        self.construir_resumen()
+        self.seleccionar_canal(0)
+        self.analizar_trama()
+    
+    def seleccionar_canal(self, indice):
+        """Elige el puerto que se muestra en el gráfico y el panel de información.
+
+        Args:
+            indice (int): Posición del canal en `self.canales`
+        """
+        # Solo el puerto en detalle filtra por sensor; los demás muestran todo en su tira
+        if self.canal is not None:
+            self.canal.demultiplexor.filtro = None
+        self.canal = self.canales[indice]
+        self.detalle_var.set(indice)
+        self.parser = self.canal.parser
+        self.lector = self.canal.lector
+        self.latencia = self.canal.latencia
+        self.sensores_tree.delete(*self.sensores_tree.get_children())
+        self.sensores_previos = {}
+        self.preparar_lineas()
+        self.filtrar_sensor()
+        if self.canal.ultima is not None:
+            self.mostrar_trama(*self.canal.ultima)
+    
+    def filtrar_sensor(self):
+        """Muestra en detalle solo las tramas del sensor elegido (o de todos)."""
+        elegido = self.sensor_combo.get()
+        try:
+            filtro = None if elegido == self.TODOS_SENSORES else int(elegido)
+        except ValueError:
+            filtro = None
+            self.sensor_combo.set(self.TODOS_SENSORES)
+        if self.canal is not None:
+            self.canal.demultiplexor.filtro = filtro
+        # La señal de otro sensor no continúa la que se venía dibujando
+        self.bits_actuales = []
+        self.senal.limpiar()
+        self.actualizar_grafico()
+    
+    def detener_analisis(self):
+        """Detiene la lectura y cierra los puertos."""
+        self.analizando = False
+        self.iniciar_btn.config(text="Iniciar Análisis")
+        if self.multiplexor is not None:
+            self.multiplexor.detener()
+            self.multiplexor = None
+        for canal in self.canales:
+            if canal.grabador is not None:
+                canal.grabador.cerrar()
+                print(f"Captura guardada: {canal.grabador.ruta} "
+                      f"({canal.grabador.bloques} bloques, {canal.grabador.tramas} tramas)")
+                canal.grabador = None
                 
-                if datos and datos.startswith("<") and datos.endswith(">"):
-                    try:
-                        # Extraer trama y voltaje
-                        partes = datos[1:-1].split("|")
-                        trama = partes[0].split(":")[1]
-                        valor = float(partes[1].split(":")[1])
-                        
-                        # Analizar partes de la trama
-                        bit_inicio = trama[0]
-                        bits_datos = trama[1:9]
-                        bit_paridad = trama[9]
-                        bit_parada = trama[10]
-                        
-                        # Verificar paridad
-                        paridad_calculada = '1' if bits_datos.count('1') % 2 == 0 else '0'
-                        paridad_correcta = paridad_calculada == bit_paridad
-                        
-                        # Actualizar información en la interfaz
-                        self.bits_text.delete('1.0', tk.END)
-                        self.bits_text.insert(tk.END, f"Trama: {trama} | Valor: {valor:.2f}V")
-                        
-                        # Explicar la trama
-                        self.explicacion_text.delete('1.0', tk.END)
-                        self.explicacion_text.insert(tk.END, f"=== Análisis de Trama RS-232 ===\n")
-                        self.explicacion_text.insert(tk.END, f"1. Bit de inicio: {bit_inicio} ({'-12V' if bit_inicio == '0' else '+12V'})\n")
-                        self.explicacion_text.insert(tk.END, f"2. Bits de datos: {bits_datos} (Valor: {int(bits_datos, 2)})\n")
-                        self.explicacion_text.insert(tk.END, f"3. Bit de paridad: {bit_paridad} ({'Correcto' if paridad_correcta else 'Error'})\n")
-                        self.explicacion_text.insert(tk.END, f"4. Bit de parada: {bit_parada} ({'+12V' if bit_parada == '1' else '-12V'})\n")
-                        self.explicacion_text.insert(tk.END, f"\nVoltaje actual: {valor:.2f}V")
-                        self.explicacion_text.insert(tk.END, f"\nVelocidad: {self.velocidad_combo.get()} bps")
-                        self.explicacion_text.insert(tk.END, f"\nTiempo por bit: {self.tiempo_bit:.2f} ms")
-                        
-                        # Generar puntos para la señal
-                        self.generar_puntos_señal(trama, valor)
-                        
-                        # Actualizar gráfico
-                        self.actualizar_grafico()
-                    except ValueError as e:
-                        print(f"Error al procesar datos: {datos}")
-                        
-        except serial.SerialException as e:
-            messagebox.showerror("Error", f"Error de comunicación serial: {str(e)}")
-            self.analizando = False
-            self.iniciar_btn.config(text="Iniciar Análisis")
-            if hasattr(self, 'ser') and self.ser.is_open:
-                self.ser.close()
+    def analizar_trama(self):
+        """Analiza las tramas que dejó el hilo lector desde el último refresco."""
+        if not self.analizando:
             return
         
-        # Programar siguiente actualización
-        if self.analizando:
-            self.after(int(self.tiempo_bit * 10), self.analizar_trama)
+        # Con un solo puerto un error detiene el análisis; con varios se
+        # informa en la fila del puerto y los demás siguen
+        if len(self.canales) == 1 and self.lector.error is not None:
+            messagebox.showerror("Error", f"Error de comunicación serial: {str(self.lector.error)}")
+            self.detener_analisis()
+            return
         
-    def generar_puntos_señal(self, bits, voltaje_actual):
-        """Genera puntos para la señal a partir de los bits.
+        for canal in self.canales:
+            tramas = canal.drenar(self.MAX_TRAMAS_POR_REFRESCO)
+            if tramas and canal is self.canal:
+                # Generar de una vez los puntos de todas las tramas recibidas
+                self.generar_puntos_señal(*zip(*tramas))
+                
+                # Explicar la última trama y actualizar el gráfico
+                self.mostrar_trama(*tramas[-1])
+                self.actualizar_grafico()
+            
+            # Las tramas ya están en pantalla (gráfico o tira del resumen);
+            # las descartadas por cola llena nunca lo estarán
+            canal.registrar_pantalla()
+        if len(self.canales) > 1:
+            self.actualizar_resumen()
+        self.actualizar_sensores()
+        self.actualizar_lineas()
         
+        # Programar siguiente refresco a la frecuencia elegida
+        try:
+            frecuencia = float(self.refresco_combo.get())
+        except ValueError:
+            frecuencia = float(self.DEFAULT_REFRESH_RATES[1])
+        self.after(max(1, int(1000 / frecuencia)), self.analizar_trama)
+
+    def mostrar_trama(self, trama, valor):
+        """Interpreta una trama recibida y la explica en la interfaz.
+
         Args:
-            bits (str): Cadena de bits a representar
-            voltaje_actual (float): Voltaje actual de la señal
+            trama (str): Trama en texto con el encuadre configurado
+            valor (float): Voltaje asociado a la trama
         """
-        # Varios puntos por bit para mostrar transiciones
-        for bit in bits:
-            for i in range(10):
-                tiempo = len(self.x_data) * (self.tiempo_bit / 10)
-                self.x_data.append(tiempo)
-                # Agregar ruido a la señal para hacerla más realista
-                # Usar el voltaje actual para una representación más precisa
-                if bit == '1':
-                    base_voltage = voltaje_actual
-                else:
-                    base_voltage = -voltaje_actual
-                ruido = random.uniform(-0.2, 0.2)  # Menos ruido para mejor visualización
-                self.y_data.append(base_voltage + ruido)
-        
-        # Mantener solo los últimos 100 puntos
-        if len(self.x_data) > 100:
-            self.x_data = self.x_data[-100:]
-            self.y_data = self.y_data[-100:]
+        # Analizar partes de la trama
+        partes = verificar_trama(trama, self.encuadre)
+        bit_inicio = partes.bit_inicio
+        bits_datos = partes.bits_datos
+        bit_paridad = partes.bit_paridad
+        bit_parada = partes.bit_parada
+        paridad_correcta = partes.paridad_correcta
+        parada_correcta = partes.parada_correcta
+        paridad = NOMBRES_PARIDAD[self.encuadre.paridad]
+        
+        # Actualizar información en la interfaz
+        self.bits_text.delete('1.0', tk.END)
+        self.bits_text.insert(tk.END, f"Trama: {trama} | Valor: {valor:.2f}V")
+        
+        # Explicar la trama
+        self.explicacion_text.delete('1.0', tk.END)
+        self.explicacion_text.insert(tk.END, f"=== Análisis de Trama RS-232 ({self.encuadre.nombre}) ===\n")
+        self.explicacion_text.insert(tk.END, f"1. Bit de inicio: {bit_inicio} ({'-12V' if bit_inicio == '0' else '+12V'})\n")
+        self.explicacion_text.insert(tk.END, f"2. Bits de datos ({self.encuadre.bits_datos}): {bits_datos} "
+                                             f"(Valor: {int(bits_datos or '0', 2)})\n")
+        if self.encuadre.tiene_paridad:
+            self.explicacion_text.insert(tk.END, f"3. Bit de paridad ({paridad}): {bit_paridad} "
+                                                 f"({'Correcto' if paridad_correcta else 'Error'})\n")
+        else:
+            self.explicacion_text.insert(tk.END, "3. Sin bit de paridad\n")
+        self.explicacion_text.insert(tk.END, f"4. Bits de parada ({self.encuadre.parada}): {bit_parada} "
+                                             f"({'+12V' if parada_correcta else 'Error'})\n")
+        if len(trama) != self.encuadre.largo:
+            self.explicacion_text.insert(tk.END, f"La trama tiene {len(trama)} bits y el encuadre "
+                                                 f"{self.encuadre.largo}: revise la configuración\n")
+        self.explicacion_text.insert(tk.END, f"\nVoltaje actual: {valor:.2f}V")
+        self.explicacion_text.insert(tk.END, f"\nVelocidad: {self.velocidad_combo.get()} bps")
+        self.explicacion_text.insert(tk.END, f"\nTiempo por bit: {self.tiempo_bit:.2f} ms")
+        self.explicacion_text.insert(tk.END, f"\nFormato: {'Binario' if self.parser.modo_binario else 'Texto'}")
+        self.explicacion_text.insert(tk.END, f"\nRegistros: {self.parser.registros} | Errores: {self.parser.errores} "
+                                             f"| Bytes descartados: {self.parser.bytes_descartados}")
+        sensores = len(self.canal.demultiplexor.estadisticas)
+        if sensores:
+            filtro = self.canal.demultiplexor.filtro
+            self.explicacion_text.insert(tk.END, f"\nBus multiplexado: {sensores} sensores "
+                                                 f"| Mostrando: {'todos' if filtro is None else f'sensor {filtro}'}")
+        self.explicacion_text.insert(tk.END, f"\nCola: {self.lector.cola.qsize()} pendientes "
+                                             f"| Descartadas por cola llena: {self.lector.descartados}")
+        flujo = self.canal.flujo if self.canal is not None else None
+        if flujo is not None:
+            self.explicacion_text.insert(tk.END, f" | Flujo {flujo.modo}: "
+                                                 f"{'transmisor detenido' if flujo.detenido else 'libre'} "
+                                                 f"({flujo.pausas} pausas)")
+        self.explicacion_text.insert(tk.END, f"\n\nLatencia por etapa:\n{self.latencia.texto()}")
+        
+    def construir_resumen(self):
+        """Crea una fila por puerto (selector de detalle, tira y contadores) y el total."""
+        for fila in self.filas:
+            fila["frame"].destroy()
+        self.filas = []
+        self.resumen_previo = (time.monotonic(), 0)  # Para la tasa agregada de tramas
+        self.tasa_total = 0.0
+        if len(self.canales) < 2:
+            self.resumen_frame.pack_forget()
+            return
+        for indice, canal in enumerate(self.canales):
+            frame = ttk.Frame(self.filas_frame)
+            frame.pack(fill=tk.X, pady=2)
+            ttk.Radiobutton(frame, text=canal.nombre, width=18, variable=self.detalle_var, value=indice,
+                            command=lambda i=indice: self.seleccionar_canal(i)).pack(side=tk.LEFT)
+            tira = tk.Canvas(frame, width=self.ANCHO_TIRA, height=self.ALTO_TIRA, bg="white",
+                             highlightthickness=0)
+            tira.pack(side=tk.LEFT, padx=5)
+            tira.create_line(0, self.ALTO_TIRA / 2, self.ANCHO_TIRA, self.ALTO_TIRA / 2, fill="lightgray")
+            linea = tira.create_line(0, 0, 0, 0, fill="blue")
+            contadores = ttk.Label(frame)
+            contadores.pack(side=tk.LEFT, padx=5)
+            self.filas.append({"frame": frame, "tira": tira, "linea": linea,
+                               "contadores": contadores, "dibujadas": -1})
+        self.resumen_frame.pack(fill=tk.X, padx=5, pady=5, before=self.info_frame)
+        self.actualizar_resumen()
+    
+    def actualizar_resumen(self):
+        """Actualiza las tiras y contadores de los puertos con novedades y el total."""
+        registros = errores = descartadas = 0
+        for canal, fila in zip(self.canales, self.filas):
+            parser, lector = canal.parser, canal.lector
+            registros += parser.registros
+            errores += parser.errores
+            descartadas += lector.descartados
+            # Solo se redibujan las filas que cambiaron desde el último refresco
+            if lector.elementos_leidos == fila["dibujadas"] and lector.error is None:
+                continue
+            fila["dibujadas"] = lector.elementos_leidos
+            if len(canal.voltajes) > 1:
+                x = np.linspace(0, self.ANCHO_TIRA, len(canal.voltajes))
+                y = (self.ALTO_TIRA / 2) * (1 - np.asarray(canal.voltajes) / self.VOLTAGE_RANGE[1])
+                fila["tira"].coords(fila["linea"], *np.column_stack((x, y)).ravel().tolist())
+            estado = f"Error: {lector.error}" if lector.error is not None else \
+                f"{canal.ultima[1]:.2f}V" if canal.ultima else "sin datos"
+            fila["contadores"].config(text=f"Registros: {parser.registros} | Errores: {parser.errores} "
+                                           f"| Descartadas: {lector.descartados} | {estado}")
+        
+        # La tasa agregada se recalcula como mucho una vez por segundo
+        ahora = time.monotonic()
+        instante, previos = self.resumen_previo
+        if ahora - instante >= 1:
+            self.tasa_total = (registros - previos) / (ahora - instante)
+            self.resumen_previo = (ahora, registros)
+        self.resumen_label.config(text=f"Puertos: {len(self.canales)} | Registros: {registros} "
+                                       f"| Errores: {errores} | Descartadas: {descartadas} "
+                                       f"| Tramas/s: {self.tasa_total:.0f}")
+    
+    def actualizar_sensores(self):
+        """Actualiza la tabla y la lista de sensores del puerto en detalle."""
+        ahora = time.monotonic()
+        if ahora - self.sensores_instante < self.INTERVALO_SENSORES:
+            return
+        # Copia: el hilo lector sigue agregando sensores mientras se recorre
+        estadisticas = sorted(list(self.canal.demultiplexor.estadisticas.items()))
+        if not estadisticas:
+            return
+        transcurrido = ahora - self.sensores_instante
+        self.sensores_instante = ahora
+        if not self.sensores_visible:
+            self.sensores_tree.pack(side=tk.RIGHT, fill=tk.Y, padx=5, before=self.explicacion_text)
+            self.sensores_visible = True
+        
+        for sensor, (registros, voltaje) in estadisticas:
+            previos = self.sensores_previos.get(sensor)
+            tasa = (registros - previos) / transcurrido if previos is not None else 0.0
+            self.sensores_previos[sensor] = registros
+            valores = (registros, f"{tasa:.1f}", f"{voltaje:.2f}")
+            if self.sensores_tree.exists(str(sensor)):
+                self.sensores_tree.item(str(sensor), values=valores)
+            else:
+                self.sensores_tree.insert("", tk.END, iid=str(sensor), text=str(sensor), values=valores)
+        if len(estadisticas) != len(self.sensor_combo["values"]) - 1:
+            self.sensor_combo["values"] = [self.TODOS_SENSORES] + [str(sensor) for sensor, _ in estadisticas]
+    
+    def preparar_lineas(self):
+        """Muestra la línea de tiempo de las líneas de control si el puerto en detalle las tiene."""
+        self.lineas_canvas.delete(tk.ALL)
+        self.lineas_trazos = {}
+        self.lineas_instante = 0.0
+        if self.canal.monitor is None:
+            if self.lineas_visible:
+                self.lineas_frame.pack_forget()
+                self.lineas_visible = False
+            return
+        for fila, pin in enumerate(LINEAS_ENTRADA):
+            centro = (fila + 0.5) * self.ALTO_LINEA
+            self.lineas_canvas.create_text(5, centro, text=pin, anchor=tk.W)
+            self.lineas_trazos[pin] = self.lineas_canvas.create_line(0, 0, 0, 0, fill="darkgreen", width=2)
+        if not self.lineas_visible:
+            self.lineas_frame.pack(fill=tk.X, before=self.historial_frame)
+            self.lineas_visible = True
+        self.actualizar_lineas()
+    
+    def actualizar_lineas(self):
+        """Redibuja la línea de tiempo con los cambios que registró el monitor del puerto.
+
+        El monitor corre en su propio hilo y guarda cada cambio con su
+        instante; aquí solo se dibuja lo registrado, así que un pulso más
+        corto que el refresco también aparece (marcado en rojo).
+        """
+        monitor = self.canal.monitor if self.canal is not None else None
+        ahora = time.monotonic()
+        if monitor is None or ahora - self.lineas_instante < self.INTERVALO_LINEAS:
+            return
+        self.lineas_instante = ahora
+        desde = ahora - self.VENTANA_LINEAS
+        eventos = monitor.eventos_desde(desde)
+        ancho = max(self.lineas_canvas.winfo_width(), 2 * self.MARGEN_LINEAS)
+        escala = (ancho - self.MARGEN_LINEAS) / self.VENTANA_LINEAS
+        self.lineas_canvas.delete("pulso")
+        for fila, pin in enumerate(LINEAS_ENTRADA):
+            alto, bajo = fila * self.ALTO_LINEA + 3, (fila + 1) * self.ALTO_LINEA - 3
+            propios = [evento for evento in eventos if evento[1] == pin]
+            # Estado al comienzo de la ventana: antes del primer cambio visible
+            estado = monitor.estado[pin]
+            if propios:
+                _, _, estado, transiciones = propios[0]
+                estado = estado if transiciones % 2 == 0 else not estado
+            puntos = [self.MARGEN_LINEAS, alto if estado else bajo]
+            for instante, _, estado, transiciones in propios:
+                x = self.MARGEN_LINEAS + (instante - desde) * escala
+                puntos += [x, puntos[-1], x, alto if estado else bajo]
+                if transiciones > 1:
+                    self.lineas_canvas.create_line(x, alto - 2, x, bajo + 2, fill="red", tags="pulso")
+            puntos += [ancho, puntos[-1]]
+            self.lineas_canvas.coords(self.lineas_trazos[pin], *puntos)
+        
+        # Contadores y últimos cambios con su hora
+        origen = time.time() - ahora
+        texto = "Transiciones: " + " | ".join(f"{pin} {monitor.transiciones[pin]}" for pin in LINEAS_ENTRADA)
+        for instante, pin, estado, transiciones in monitor.ultimos(self.EVENTOS_LINEAS):
+            hora = origen + instante
+            texto += (f"\n{time.strftime('%H:%M:%S', time.localtime(hora))}.{int(hora % 1 * 1e6):06d} "
+                      f"{pin} {'activa' if estado else 'inactiva'}")
+            if transiciones > 1:
+                texto += f" ({transiciones} transiciones)"
+        self.lineas_label.config(text=texto)
+    
+    def guardar_latencias(self):
+        """Guarda en un archivo JSON los percentiles e histogramas de latencia."""
+        ruta = filedialog.asksaveasfilename(title="Guardar latencias", defaultextension=".json",
+                                            initialfile=time.strftime("latencias_%Y%m%d_%H%M%S.json"),
+                                            filetypes=[("JSON", "*.json")])
+        if not ruta:
+            return
+        try:
+            self.latencia.volcar(ruta)
+        except OSError as e:
+            messagebox.showerror("Error", f"Error al guardar las latencias: {str(e)}")
+        
+    def generar_puntos_señal(self, tramas, voltajes):
+        """Genera puntos para la señal a partir de los bits de un lote de tramas.
+        
+        Args:
+            tramas (list): Tramas a representar, como cadenas de bits
+            voltajes (list): Voltaje de cada trama
+        """
+        self.senal.agregar(tramas, voltajes, self.encuadre, self.tiempo_bit)
+    
+    def ventana_visible(self):
+        """Devuelve los puntos a dibujar según el historial y el zoom elegidos.
+
+        Returns:
+            tuple: (tiempos, voltajes) decimados a unos dos puntos por píxel,
+                inicio y ancho de la ventana en ms
+        """
+        ancho = self.tiempo_bit * 2 ** float(self.zoom_scale.get())
+        return self.senal.ventana(ancho, float(self.historial_scale.get()), self.ax.bbox.width)
     
     def actualizar_grafico(self):
         """Actualiza la visualización del gráfico."""
-        self.ax.clear()
-        self.ax.plot(self.x_data, self.y_data, 'b-', linewidth=2)
-        self.ax.set_ylim(-13, 13)
-        self.ax.grid(True)
-        self.ax.set_title("Análisis de Señal RS-232")
-        self.ax.set_ylabel("Voltaje (V)")
-        self.ax.set_xlabel("Tiempo (ms)")
-        
-        # Agregar líneas de referencia
-        self.ax.axhline(y=12, color='g', linestyle=':', alpha=0.5)
-        self.ax.axhline(y=-12, color='r', linestyle=':', alpha=0.5)
-        self.ax.axhline(y=0, color='gray', linestyle=':', alpha=0.3)
-        
-        self.canvas.draw()
+        self.renderizador.actualizar(*self.ventana_visible())
+
+    def on_closing(self):
+        """Maneja el cierre de la aplicación"""
+        self.detener_analisis()
+        if self.perfilador.activo:
+            print(f"Reporte de perfil: {self.perfilador.guardar_reporte()}")
+        self.destroy()
 
 if __name__ == "__main__":
     app = AnalizadorProtocolo()
+    app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()
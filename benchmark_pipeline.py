@@ -0,0 +1,402 @@
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import numpy as np
+
+from analizador_protocolo_v3 import AnalizadorProtocolo
+from codificador_tramas import formatear_lote
+from encuadre_uart import obtener_encuadre
+from formato_binario import ANUNCIO_BINARIO, ANUNCIO_TEXTO, FORMATOS, codificar_paquetes
+from lector_serial import LectorSerial
+from motor_transmision import MotorTransmision
+from parser_flujo import ParserFlujo
+from renderizador_senal import RenderizadorSenal
+from senal_analizador import SenalAnalizador
+from transmisor_rs232_v3 import SensorIndustrial
+from transporte import crear_tubo
+
+# Velocidades de DEFAULT_BAUD_RATES del transmisor y del analizador (v3)
+VELOCIDADES = sorted({int(v) for v in SensorIndustrial.DEFAULT_BAUD_RATES
+                      + AnalizadorProtocolo.DEFAULT_BAUD_RATES})
+VERSION_INFORME = 1
+SEMILLA = AnalizadorProtocolo.SEMILLA_RUIDO  # Semilla de los valores del sensor y del ruido
+REFRESCO = int(AnalizadorProtocolo.DEFAULT_REFRESH_RATES[1])  # Hz; refresco por defecto del analizador
+TAMANO_LECTURA = 4096  # Bytes por lectura simulada del puerto
+TAMANO_FIGURA = (12, 4)  # Pulgadas, a 100 dpi
+# Fracción mínima de refrescos en régimen (sin contar el primero) que deben
+# resolverse con blitting y no con un redibujado completo
+FRACCION_BLIT_MINIMA = 0.9
+
+
+def estadisticas(duraciones):
+    """Resume una lista de duraciones en segundos.
+
+    Returns:
+        dict: Mediana, mínimo, p95 y máximo
+    """
+    duraciones = np.asarray(duraciones, dtype=np.float64)
+    if duraciones.size == 0:
+        return {"mediana": 0.0, "minimo": 0.0, "p95": 0.0, "maximo": 0.0}
+    return {"mediana": float(np.median(duraciones)),
+            "minimo": float(duraciones.min()),
+            "p95": float(np.percentile(duraciones, 95)),
+            "maximo": float(duraciones.max())}
+
+
+def medir(funcion, repeticiones):
+    """Ejecuta `funcion` varias veces y devuelve las duraciones."""
+    duraciones = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        duraciones.append(time.perf_counter() - inicio)
+    return duraciones
+
+
+def codificar(valores, formato):
+    """Codifica los valores como lo hace el motor de transmisión."""
+    if formato == "Binario":
+        return codificar_paquetes(valores)
+    return formatear_lote(valores)[0]
+
+
+def tramas_por_segundo_nominal(baudrate, formato):
+    """Tramas por segundo que admite una línea saturada."""
+    muestra = np.random.default_rng(SEMILLA).uniform(-12, 12, 1000)
+    bytes_por_trama = len(codificar(muestra, formato)) / muestra.size
+    return baudrate / MotorTransmision.BITS_POR_CARACTER / bytes_por_trama
+
+
+def trafico(baudrate, formato, segundos):
+    """Valores del sensor que caben en `segundos` de línea saturada.
+
+    Returns:
+        np.ndarray: Voltajes
+    """
+    cantidad = max(1, math.ceil(tramas_por_segundo_nominal(baudrate, formato) * segundos))
+    return np.random.default_rng(SEMILLA).uniform(-12, 12, cantidad)
+
+
+def parsear(datos):
+    """Pasa los datos por el parser en lecturas del tamaño de un bloque."""
+    parser = ParserFlujo()
+    tramas = []
+    for i in range(0, len(datos), TAMANO_LECTURA):
+        tramas.extend(parser.alimentar(datos[i:i + TAMANO_LECTURA]))
+    return tramas
+
+
+class EscenarioAnalizador:
+    """Estado del analizador sin Tk: la misma `SenalAnalizador` y el gráfico en Agg.
+
+    Usa los parámetros de `AnalizadorProtocolo` con los controles en sus
+    valores iniciales: encuadre predeterminado, zoom inicial y en vivo.
+    """
+
+    def __init__(self, baudrate):
+        analizador = AnalizadorProtocolo
+        self.tiempo_bit = 1000 / baudrate  # ms
+        self.encuadre = obtener_encuadre()
+        self.senal = SenalAnalizador(analizador.CAPACIDAD_HISTORIAL, analizador.SOBREMUESTREO,
+                                     analizador.SEMILLA_RUIDO,
+                                     cobertura=2 ** analizador.ZOOM_MAXIMO * analizador.SOBREMUESTREO)
+        self.figura = Figure(figsize=TAMANO_FIGURA, dpi=100)
+        self.ax = self.figura.add_subplot(111)
+        self.canvas = FigureCanvasAgg(self.figura)
+        self.renderizador = RenderizadorSenal(self.ax, self.canvas)
+        self.canvas.draw()
+
+    def reiniciar(self):
+        self.senal.limpiar()
+
+    def generar_puntos(self, tramas, voltajes):
+        """Lo que hace `AnalizadorProtocolo.generar_puntos_señal`."""
+        self.senal.agregar(tramas, voltajes, self.encuadre, self.tiempo_bit)
+
+    def actualizar_grafico(self):
+        """Lo que hace `AnalizadorProtocolo.actualizar_grafico` en vivo."""
+        ancho = self.tiempo_bit * 2 ** AnalizadorProtocolo.ZOOM_INICIAL
+        self.renderizador.actualizar(*self.senal.ventana(ancho, SenalAnalizador.EN_VIVO,
+                                                         self.ax.bbox.width))
+
+
+def lotes_por_refresco(tramas, segundos):
+    """Parte las tramas en los lotes que vería cada refresco del analizador."""
+    refrescos = max(1, int(segundos * REFRESCO))
+    tamano = max(1, math.ceil(len(tramas) / refrescos))
+    return [tramas[i:i + tamano] for i in range(0, len(tramas), tamano)]
+
+
+def medir_etapas(baudrate, formato, segundos, repeticiones):
+    """Mide cada etapa por separado con `segundos` de tráfico.
+
+    Returns:
+        list: Un dict por etapa
+    """
+    valores = trafico(baudrate, formato, segundos)
+    # El motor anuncia el formato antes de las tramas
+    anuncio = ANUNCIO_BINARIO if formato == "Binario" else ANUNCIO_TEXTO
+    datos = anuncio + codificar(valores, formato)
+    tramas = parsear(datos)
+    lotes = [tuple(zip(*lote)) for lote in lotes_por_refresco(tramas, segundos)]
+    escenario = EscenarioAnalizador(baudrate)
+
+    def sintetizar():
+        escenario.reiniciar()
+        for lote in lotes:
+            escenario.generar_puntos(*lote)
+
+    def dibujar():
+        # Solo se mide el dibujado; la síntesis previa queda fuera del tiempo
+        escenario.reiniciar()
+        duraciones = []
+        blits = 0
+        for numero, lote in enumerate(lotes):
+            escenario.generar_puntos(*lote)
+            antes = escenario.renderizador.blits
+            inicio = time.perf_counter()
+            escenario.actualizar_grafico()
+            duraciones.append(time.perf_counter() - inicio)
+            # El primer refresco puede necesitar el dibujado completo inicial
+            if numero > 0:
+                blits += escenario.renderizador.blits - antes
+        return duraciones, blits
+
+    resultados = []
+    for etapa, funcion, cantidad in (
+            ("codificacion", lambda: codificar(valores, formato), valores.size),
+            ("parseo", lambda: parsear(datos), len(tramas)),
+            ("sintesis", sintetizar, len(tramas))):
+        tiempos = estadisticas(medir(funcion, repeticiones))
+        resultados.append({
+            "etapa": etapa, "velocidad": baudrate, "formato": formato,
+            "tramas": cantidad, "bytes": len(datos), "segundos_trafico": segundos,
+            "segundos": tiempos,
+            "tramas_por_segundo": cantidad / tiempos["mediana"] if tiempos["mediana"] else 0.0,
+            # Fracción del tiempo real que consume la etapa a velocidad de línea
+            "carga": tiempos["mediana"] / segundos,
+        })
+
+    actualizaciones = []
+    blits = 0
+    for _ in range(repeticiones):
+        duraciones, blits_ronda = dibujar()
+        actualizaciones.extend(duraciones)
+        blits += blits_ronda
+    en_regimen = repeticiones * (len(lotes) - 1)
+    por_refresco = estadisticas(actualizaciones)
+    resultados.append({
+        "etapa": "dibujado", "velocidad": baudrate, "formato": formato,
+        "tramas": len(tramas), "bytes": len(datos), "segundos_trafico": segundos,
+        "actualizaciones": len(lotes), "segundos_por_actualizacion": por_refresco,
+        "redibujados_completos": escenario.renderizador.redibujados,
+        "fraccion_blit": blits / en_regimen if en_regimen else 1.0,
+        "carga": por_refresco["mediana"] * REFRESCO,
+    })
+    return resultados
+
+
+def medir_extremo_a_extremo(baudrate, formato, segundos):
+    """Transmisor, tubo en memoria, lector, síntesis y dibujado a la vez.
+
+    El motor escribe a velocidad de línea y un bucle a REFRESCO Hz hace
+    el trabajo de `analizar_trama`, como en los programas reales.
+
+    Returns:
+        dict: Tramas enviadas y recibidas, tasas y costo de cada refresco
+    """
+    transmisor, receptor = crear_tubo(baudrate=baudrate)
+    generador = np.random.default_rng(SEMILLA)
+    motor = MotorTransmision(transmisor, lambda: float(generador.uniform(-12, 12)),
+                             baudrate, formato=formato)
+    parser = ParserFlujo()
+    lector = LectorSerial(receptor, parser.alimentar)
+    escenario = EscenarioAnalizador(baudrate)
+    refrescos = []
+    recibidas = 0
+
+    def refrescar():
+        tramas = lector.drenar(AnalizadorProtocolo.MAX_TRAMAS_POR_REFRESCO)
+        if tramas:
+            inicio = time.perf_counter()
+            escenario.generar_puntos(*zip(*tramas))
+            escenario.actualizar_grafico()
+            refrescos.append(time.perf_counter() - inicio)
+        return len(tramas)
+
+    lector.start()
+    motor.start()
+    inicio = time.monotonic()
+    siguiente = inicio
+    while time.monotonic() - inicio < segundos:
+        recibidas += refrescar()
+        siguiente += 1 / REFRESCO
+        time.sleep(max(0.0, siguiente - time.monotonic()))
+    motor.detener()
+    duracion = time.monotonic() - inicio
+
+    # Recoger lo que quedó en el camino
+    time.sleep(0.1)
+    pendientes = 0
+    while True:
+        tramas = lector.drenar()
+        if not tramas:
+            break
+        pendientes += len(tramas)
+    lector.detener()
+    transmisor.close()
+
+    return {
+        "velocidad": baudrate, "formato": formato, "segundos": duracion,
+        "tramas_enviadas": motor.tramas_enviadas,
+        "tramas_recibidas": recibidas + pendientes,
+        "tramas_pendientes_al_final": pendientes,
+        "tramas_descartadas": lector.descartados,
+        "errores_parser": parser.errores,
+        "tramas_por_segundo": recibidas / duracion if duracion else 0.0,
+        "tramas_por_segundo_nominal": tramas_por_segundo_nominal(baudrate, formato),
+        "segundos_por_refresco": estadisticas(refrescos),
+        "error": None if motor.error is None and lector.error is None
+        else str(motor.error or lector.error),
+    }
+
+
+def entorno():
+    """Datos de la máquina y del código para interpretar el informe."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__, "plataforma": platform.platform(),
+            "procesador": platform.processor() or platform.machine(), "commit": commit}
+
+
+def comparar(informe, referencia, tolerancia):
+    """Etapas más lentas que en un informe anterior.
+
+    Args:
+        informe (dict): Informe actual
+        referencia (dict): Informe anterior
+        tolerancia (float): Aumento relativo admitido (0.2 = 20 %)
+
+    Returns:
+        list: Mensajes de las regresiones encontradas
+    """
+    def clave(etapa):
+        return etapa["etapa"], etapa["velocidad"], etapa["formato"]
+
+    def costo(etapa):
+        tiempos = etapa.get("segundos") or etapa["segundos_por_actualizacion"]
+        return tiempos["mediana"]
+
+    anteriores = {clave(etapa): costo(etapa) for etapa in referencia.get("etapas", [])}
+    regresiones = []
+    for etapa in informe["etapas"]:
+        antes = anteriores.get(clave(etapa))
+        ahora = costo(etapa)
+        if antes and ahora > antes * (1 + tolerancia):
+            regresiones.append(f"{etapa['etapa']} a {etapa['velocidad']} baudios "
+                               f"({etapa['formato']}): {antes * 1e3:.3f} ms -> "
+                               f"{ahora * 1e3:.3f} ms (+{ahora / antes - 1:.0%})")
+    return regresiones
+
+
+def sin_blitting(informe):
+    """Etapas de dibujado que redibujan todo en demasiados refrescos.
+
+    Returns:
+        list: Mensajes de las etapas con fraccion_blit < FRACCION_BLIT_MINIMA
+    """
+    return [f"dibujado a {etapa['velocidad']} baudios ({etapa['formato']}): "
+            f"{etapa['fraccion_blit']:.0%} de refrescos con blitting"
+            for etapa in informe["etapas"]
+            if etapa["etapa"] == "dibujado" and etapa["fraccion_blit"] < FRACCION_BLIT_MINIMA]
+
+
+def mostrar_resumen(informe):
+    """Imprime una tabla con la carga de cada etapa."""
+    print(f"{'Etapa':<14}{'Baudios':>9}{'Formato':>9}{'Tramas':>9}{'Mediana ms':>12}{'Carga':>9}")
+    for etapa in informe["etapas"]:
+        tiempos = etapa.get("segundos") or etapa["segundos_por_actualizacion"]
+        print(f"{etapa['etapa']:<14}{etapa['velocidad']:>9}{etapa['formato']:>9}"
+              f"{etapa['tramas']:>9}{tiempos['mediana'] * 1e3:>12.3f}{etapa['carga']:>9.2%}")
+    for prueba in informe["extremo_a_extremo"]:
+        refresco = prueba["segundos_por_refresco"]
+        print(f"Extremo a extremo {prueba['velocidad']} baudios ({prueba['formato']}): "
+              f"{prueba['tramas_recibidas']}/{prueba['tramas_enviadas']} tramas, "
+              f"{prueba['tramas_por_segundo']:.0f}/{prueba['tramas_por_segundo_nominal']:.0f} "
+              f"tramas/s, refresco p95 {refresco['p95'] * 1e3:.2f} ms")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Mide codificación, parseo, síntesis y dibujado sin interfaz gráfica")
+    parser.add_argument("-s", "--segundos", type=float, default=1.0,
+                        help="Segundos de tráfico de línea por medición")
+    parser.add_argument("-r", "--repeticiones", type=int, default=5,
+                        help="Repeticiones de cada etapa (se informa la mediana)")
+    parser.add_argument("-v", "--velocidades", type=int, nargs="+", default=VELOCIDADES,
+                        help="Velocidades en baudios")
+    parser.add_argument("-f", "--formatos", nargs="+", choices=FORMATOS, default=FORMATOS,
+                        help="Formatos de línea")
+    parser.add_argument("-e", "--extremo", type=float, default=2.0,
+                        help="Segundos de la prueba de extremo a extremo (0 = omitirla)")
+    parser.add_argument("-o", "--salida", default="benchmark_pipeline.json",
+                        help="Archivo JSON del informe")
+    parser.add_argument("--referencia", help="Informe anterior con el que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="Aumento relativo admitido frente a la referencia")
+    argumentos = parser.parse_args(argumentos)
+
+    informe = {
+        "version": VERSION_INFORME,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "entorno": entorno(),
+        "parametros": {"segundos": argumentos.segundos, "repeticiones": argumentos.repeticiones,
+                       "refresco": REFRESCO, "sobremuestreo": AnalizadorProtocolo.SOBREMUESTREO,
+                       "tamano_lectura": TAMANO_LECTURA, "semilla": SEMILLA},
+        "etapas": [],
+        "extremo_a_extremo": [],
+    }
+    for formato in argumentos.formatos:
+        for baudrate in argumentos.velocidades:
+            print(f"Midiendo {baudrate} baudios ({formato})...", file=sys.stderr)
+            informe["etapas"].extend(medir_etapas(baudrate, formato, argumentos.segundos,
+                                                  argumentos.repeticiones))
+            if argumentos.extremo > 0:
+                informe["extremo_a_extremo"].append(
+                    medir_extremo_a_extremo(baudrate, formato, argumentos.extremo))
+
+    with open(argumentos.salida, "w") as archivo:
+        json.dump(informe, archivo, indent=2)
+    mostrar_resumen(informe)
+    print(f"Informe guardado en {argumentos.salida}")
+
+    fallas = sin_blitting(informe)
+    for falla in fallas:
+        print(f"Sin blitting: {falla}")
+
+    if argumentos.referencia:
+        with open(argumentos.referencia) as archivo:
+            regresiones = comparar(informe, json.load(archivo), argumentos.tolerancia)
+        for regresion in regresiones:
+            print(f"Regresión: {regresion}")
+        if regresiones:
+            return 1
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import numpy as np
+
+
+class BufferCircular:
+    """Historial circular preasignado de muestras (tiempo, voltaje).
+
+    Cada muestra se escribe dos veces, en `i` y en `i + capacidad`, de modo
+    que cualquier ventana de hasta `capacidad` muestras recientes es un
+    tramo contiguo del arreglo y se entrega como vista, sin copias. Agregar
+    es O(1) por muestra y la memoria no crece con el tiempo.
+    """
+
+    CAPACIDAD_DEFECTO = 1_000_000  # Muestras conservadas
+
+    def __init__(self, capacidad=None):
+        """Reserva la memoria del historial.
+
+        Args:
+            capacidad (int): Cantidad máxima de muestras conservadas
+        """
+        self.capacidad = int(capacidad or self.CAPACIDAD_DEFECTO)
+        self._tiempos = np.zeros(2 * self.capacidad, dtype=np.float64)
+        self._valores = np.zeros(2 * self.capacidad, dtype=np.float64)
+        self._escritura = 0  # Próxima posición en [0, capacidad)
+        self._cantidad = 0
+        self.total = 0  # Muestras agregadas desde el inicio
+
+    def __len__(self):
+        return self._cantidad
+
+    def limpiar(self):
+        """Vacía el historial sin liberar la memoria."""
+        self._escritura = 0
+        self._cantidad = 0
+        self.total = 0
+
+    def agregar(self, tiempo, valor):
+        """Agrega una muestra.
+
+        Args:
+            tiempo (float): Tiempo de la muestra en ms
+            valor (float): Voltaje de la muestra
+        """
+        i = self._escritura
+        self._tiempos[i] = self._tiempos[i + self.capacidad] = tiempo
+        self._valores[i] = self._valores[i + self.capacidad] = valor
+        self._escritura = (i + 1) % self.capacidad
+        self._cantidad = min(self._cantidad + 1, self.capacidad)
+        self.total += 1
+
+    def extender(self, tiempos, valores):
+        """Agrega un bloque de muestras de una vez.
+
+        Args:
+            tiempos (array_like): Tiempos en ms, en orden creciente
+            valores (array_like): Voltajes de cada muestra
+        """
+        tiempos = np.asarray(tiempos, dtype=np.float64)
+        valores = np.asarray(valores, dtype=np.float64)
+        n = tiempos.size
+        self.total += n
+        if n > self.capacidad:
+            # Solo caben las últimas muestras
+            tiempos = tiempos[-self.capacidad:]
+            valores = valores[-self.capacidad:]
+            n = self.capacidad
+
+        posiciones = (self._escritura + np.arange(n)) % self.capacidad
+        for datos, bloque in ((self._tiempos, tiempos), (self._valores, valores)):
+            datos[posiciones] = bloque
+            datos[posiciones + self.capacidad] = bloque
+        self._escritura = (self._escritura + n) % self.capacidad
+        self._cantidad = min(self._cantidad + n, self.capacidad)
+
+    def ultimos(self, n=None):
+        """Vistas de las últimas `n` muestras, de la más antigua a la más nueva.
+
+        Args:
+            n (int): Cantidad de muestras (todas las guardadas si es None)
+
+        Returns:
+            tuple: (vista de tiempos, vista de voltajes)
+        """
+        n = self._cantidad if n is None else min(int(n), self._cantidad)
+        fin = self._escritura + self.capacidad
+        return self._tiempos[fin - n:fin], self._valores[fin - n:fin]
+
+    def ventana(self, t_inicio, t_fin):
+        """Vistas de las muestras con tiempo entre `t_inicio` y `t_fin`.
+
+        Args:
+            t_inicio (float): Tiempo inicial en ms
+            t_fin (float): Tiempo final en ms
+
+        Returns:
+            tuple: (vista de tiempos, vista de voltajes)
+        """
+        tiempos, valores = self.ultimos()
+        a = np.searchsorted(tiempos, t_inicio, side='left')
+        b = np.searchsorted(tiempos, t_fin, side='right')
+        return tiempos[a:b], valores[a:b]
+
+    @property
+    def primer_tiempo(self):
+        """Tiempo de la muestra más antigua conservada."""
+        return self.ultimos()[0][0] if self._cantidad else 0.0
+
+    @property
+    def ultimo_tiempo(self):
+        """Tiempo de la muestra más reciente."""
+        return self._tiempos[self._escritura + self.capacidad - 1] if self._cantidad else 0.0
@@ -0,0 +1,136 @@
+import heapq
+import math
+import random
+
+# Tasa de muestreo por defecto de cada tipo de sensor, en muestras por segundo
+TASAS_SENSOR = {
+    "Temperatura": 1.0,
+    "Presión": 10.0,
+    "Nivel": 2.0,
+    "Caudal": 20.0,
+}
+VOLTAJE_MAXIMO = 12.0  # Los valores se mantienen dentro de ±12 V
+
+
+class SensorSimulado:
+    """Sensor de campo con su propio tipo, tasa de muestreo y señal.
+
+    Cada tipo sigue un modelo sencillo pero distinguible en el analizador:
+    la temperatura deriva lentamente, la presión oscila con ruido alrededor
+    de su valor de trabajo, el nivel sube y baja como un tanque que se
+    llena y vacía, y el caudal es ruidoso con pulsos ocasionales.
+    """
+
+    def __init__(self, identificador, tipo, tasa=None, semilla=None):
+        """Configura el sensor.
+
+        Args:
+            identificador (int): Identificador en el bus (campo CH)
+            tipo (str): Uno de los tipos de TASAS_SENSOR
+            tasa (float): Muestras por segundo (por defecto la del tipo)
+            semilla (int): Semilla del generador de la señal
+        """
+        if tipo not in TASAS_SENSOR:
+            raise ValueError(f"Tipo de sensor desconocido: {tipo}")
+        self.identificador = identificador
+        self.tipo = tipo
+        self.tasa = float(tasa or TASAS_SENSOR[tipo])
+        if self.tasa <= 0:
+            raise ValueError(f"Tasa inválida para el sensor {identificador}: {tasa}")
+        self.periodo = 1.0 / self.tasa
+        self.azar = random.Random(semilla)
+        self.valor = self.azar.uniform(-VOLTAJE_MAXIMO / 2, VOLTAJE_MAXIMO / 2)
+        self.fase = self.azar.uniform(0, 2 * math.pi)
+        self.muestras = 0
+
+    def generar(self):
+        """Devuelve la siguiente muestra del sensor en V."""
+        self.muestras += 1
+        azar = self.azar
+        if self.tipo == "Temperatura":
+            self.valor += azar.gauss(0, 0.05)
+        elif self.tipo == "Presión":
+            self.valor = 4.0 + 2.0 * math.sin(self.fase + self.muestras / 50) + azar.gauss(0, 0.3)
+        elif self.tipo == "Nivel":
+            self.valor = 10.0 * math.sin(self.fase + self.muestras / 200)
+        else:
+            self.valor = azar.gauss(-2.0, 0.8) + (8.0 if azar.random() < 0.02 else 0.0)
+        self.valor = min(VOLTAJE_MAXIMO, max(-VOLTAJE_MAXIMO, self.valor))
+        return self.valor
+
+
+def crear_sensores(cantidad, tipos=None, escala_tasa=1.0, semilla=0):
+    """Crea un bus de sensores con los tipos repartidos en rotación.
+
+    Args:
+        cantidad (int): Cantidad de sensores
+        tipos (list): Tipos a repartir (por defecto todos los de TASAS_SENSOR)
+        escala_tasa (float): Factor aplicado a la tasa de cada tipo
+        semilla (int): Semilla base; cada sensor usa una distinta
+
+    Returns:
+        list: SensorSimulado con identificadores 1..cantidad
+    """
+    tipos = list(tipos or TASAS_SENSOR)
+    return [SensorSimulado(i + 1, tipos[i % len(tipos)], TASAS_SENSOR[tipos[i % len(tipos)]] * escala_tasa,
+                           None if semilla is None else semilla + i)
+            for i in range(cantidad)]
+
+
+class PlanificadorSensores:
+    """Decide qué sensor transmite a continuación en un bus compartido.
+
+    Guarda en un montículo el vencimiento de la próxima muestra de cada
+    sensor, así que elegir el siguiente cuesta O(log n) aunque haya cientos
+    de canales con tasas distintas. Si la línea no da abasto las muestras
+    salen tarde pero en orden de vencimiento, sin que un sensor rápido
+    acapare el bus; el atraso queda en `retraso`.
+    """
+
+    def __init__(self, sensores):
+        """Args:
+            sensores (list): SensorSimulado del bus
+        """
+        self.sensores = {sensor.identificador: sensor for sensor in sensores}
+        if len(self.sensores) != len(sensores):
+            raise ValueError("Hay identificadores de sensor repetidos")
+        # Fases iniciales repartidas para que no transmitan todos a la vez
+        azar = random.Random(0)
+        self.monticulo = [(azar.uniform(0, sensor.periodo), sensor.identificador)
+                          for sensor in sensores]
+        heapq.heapify(self.monticulo)
+        self.retraso = 0.0  # s; atraso de la última muestra entregada
+        self.entregadas = 0
+
+    @property
+    def tasa_total(self):
+        """Muestras por segundo que pide el bus completo."""
+        return sum(sensor.tasa for sensor in self.sensores.values())
+
+    def proximo(self):
+        """Vencimiento en s de la próxima muestra, o None si no hay sensores."""
+        return self.monticulo[0][0] if self.monticulo else None
+
+    def vencidas(self, instante, maximo=None):
+        """Genera las muestras vencidas hasta `instante`, la más antigua primero.
+
+        Args:
+            instante (float): Segundos desde el inicio de la transmisión
+            maximo (int): Cantidad máxima a entregar (las demás esperan)
+
+        Returns:
+            tuple: (identificadores, valores, vencimientos en s)
+        """
+        identificadores, valores, vencimientos = [], [], []
+        monticulo = self.monticulo
+        while monticulo and monticulo[0][0] <= instante and (maximo is None or len(valores) < maximo):
+            vencimiento, identificador = monticulo[0]
+            sensor = self.sensores[identificador]
+            heapq.heapreplace(monticulo, (vencimiento + sensor.periodo, identificador))
+            identificadores.append(identificador)
+            valores.append(sensor.generar())
+            vencimientos.append(vencimiento)
+        if valores:
+            self.retraso = instante - vencimientos[-1]
+            self.entregadas += len(valores)
+        return identificadores, valores, vencimientos
@@ -0,0 +1,264 @@
+import mmap
+import struct
+import threading
+import time
+
+# Archivo de captura de solo anexado:
+# - Cabecera: MAGIA (8 bytes) + versión (uint16)
+# - Registros: tipo (uint8) + largo del contenido (uint32)
+#   + marca de tiempo monotónica en ns (uint64) + contenido
+MAGIA = b"RS232CAP"
+VERSION = 1
+CABECERA = struct.Struct("<8sH")
+REGISTRO = struct.Struct("<BIQ")
+TRAMA = struct.Struct("<d")  # Voltaje que acompaña a la trama decodificada
+
+TIPO_BLOQUE = 0  # Bytes crudos tal como se leyeron del puerto
+TIPO_TRAMA = 1  # Trama decodificada: bits en texto + voltaje
+
+LARGO_MAXIMO = 1 << 24  # Largo máximo plausible de un registro
+CONFIRMACIONES = 8  # Registros encadenados que confirman un punto de sincronismo
+
+EXTENSION = ".rscap"
+VELOCIDADES_REPRODUCCION = ["1x", "10x", "100x", "Máx"]
+
+
+class GrabadorCaptura:
+    """Grabador de capturas con escrituras agrupadas.
+
+    Guarda cada bloque crudo leído del puerto y cada trama decodificada con
+    una marca de tiempo monotónica. Las escrituras pasan por un buffer
+    grande, de modo que el hilo lector solo copia memoria.
+    """
+
+    TAMANO_BUFFER = 1 << 20  # Bytes acumulados antes de escribir al disco
+
+    def __init__(self, ruta):
+        """Crea (o trunca) el archivo de captura.
+
+        Args:
+            ruta (str): Ruta del archivo
+        """
+        self.ruta = ruta
+        self.archivo = open(ruta, "wb", buffering=self.TAMANO_BUFFER)
+        self.archivo.write(CABECERA.pack(MAGIA, VERSION))
+        self._candado = threading.Lock()
+        self.bloques = 0
+        self.tramas = 0
+
+    def _escribir(self, tipo, contenido, instante=None):
+        """Anexa un registro al archivo.
+
+        Returns:
+            bool: False si la captura ya estaba cerrada (el lector puede
+                seguir entregando datos mientras se detiene)
+        """
+        instante = time.monotonic_ns() if instante is None else instante
+        with self._candado:
+            if self.archivo.closed:
+                return False
+            self.archivo.write(REGISTRO.pack(tipo, len(contenido), instante))
+            self.archivo.write(contenido)
+        return True
+
+    def registrar_bloque(self, datos, instante=None):
+        """Guarda un bloque de bytes crudos recibido del puerto."""
+        if self._escribir(TIPO_BLOQUE, datos, instante):
+            self.bloques += 1
+
+    def registrar_trama(self, trama, valor, instante=None):
+        """Guarda una trama decodificada y su voltaje."""
+        if self._escribir(TIPO_TRAMA, trama.encode() + TRAMA.pack(valor), instante):
+            self.tramas += 1
+
+    def envolver(self, parsear):
+        """Devuelve un parser que además graba lo que recibe y decodifica.
+
+        Args:
+            parsear (callable): Parser de tramas (bytes -> lista de (trama, valor))
+
+        Returns:
+            callable: Parser con el mismo contrato que `parsear`
+        """
+        def parsear_y_grabar(datos):
+            instante = time.monotonic_ns()
+            self.registrar_bloque(datos, instante)
+            tramas = parsear(datos)
+            for trama, valor in tramas:
+                self.registrar_trama(trama, valor, instante)
+            return tramas
+        return parsear_y_grabar
+
+    def cerrar(self):
+        """Vuelca el buffer y cierra el archivo; lo que llegue después se ignora."""
+        with self._candado:
+            if not self.archivo.closed:
+                self.archivo.close()
+
+
+def leer_captura(ruta, tipos=(TIPO_BLOQUE, TIPO_TRAMA), desde=None, hasta=None):
+    """Recorre los registros de una captura mapeada en memoria.
+
+    Args:
+        ruta (str): Ruta del archivo de captura
+        tipos (tuple): Tipos de registro a devolver
+        desde (int): Posición de un comienzo de registro (por defecto el primero)
+        hasta (int): Solo se leen los registros que empiezan antes de esta posición
+
+    Yields:
+        tuple: (tipo, instante en ns, contenido)
+    """
+    with open(ruta, "rb") as archivo:
+        with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            magia, version = CABECERA.unpack_from(mapa, 0)
+            if magia != MAGIA:
+                raise ValueError(f"{ruta} no es un archivo de captura")
+            posicion = CABECERA.size if desde is None else desde
+            fin = len(mapa) if hasta is None else min(hasta, len(mapa))
+            while posicion < fin and posicion + REGISTRO.size <= len(mapa):
+                tipo, largo, instante = REGISTRO.unpack_from(mapa, posicion)
+                posicion += REGISTRO.size
+                if posicion + largo > len(mapa):
+                    break  # Registro truncado al final de una captura interrumpida
+                if tipo in tipos:
+                    yield tipo, instante, mapa[posicion:posicion + largo]
+                posicion += largo
+
+
+def buscar_registro(mapa, desde, confirmaciones=CONFIRMACIONES):
+    """Primer comienzo de registro a partir de una posición cualquiera.
+
+    Sirve para partir una captura grande en tramos alineados a registros sin
+    recorrerla entera: una posición se acepta cuando a partir de ella se
+    encadenan `confirmaciones` cabeceras válidas con tiempos no decrecientes.
+
+    Args:
+        mapa (mmap.mmap): Captura mapeada en memoria
+        desde (int): Posición desde la que buscar
+        confirmaciones (int): Cabeceras encadenadas exigidas
+
+    Returns:
+        int: Posición del registro, o el largo del archivo si no hay ninguno
+    """
+    if desde <= CABECERA.size:
+        return CABECERA.size
+    for posicion in range(desde, len(mapa)):
+        if mapa[posicion] in (TIPO_BLOQUE, TIPO_TRAMA) and _encadena(mapa, posicion, confirmaciones):
+            return posicion
+    return len(mapa)
+
+
+def _encadena(mapa, posicion, confirmaciones):
+    """Indica si desde `posicion` se leen cabeceras válidas encadenadas."""
+    anterior = 0
+    for _ in range(confirmaciones):
+        if posicion == len(mapa):
+            return True
+        if posicion + REGISTRO.size > len(mapa):
+            return False
+        tipo, largo, instante = REGISTRO.unpack_from(mapa, posicion)
+        if tipo not in (TIPO_BLOQUE, TIPO_TRAMA) or largo > LARGO_MAXIMO or instante < anterior:
+            return False
+        anterior = instante
+        posicion += REGISTRO.size + largo
+    return True
+
+
+def decodificar_trama(contenido):
+    """Separa la trama y el voltaje de un registro TIPO_TRAMA.
+
+    Returns:
+        tuple: (trama, voltaje)
+    """
+    return contenido[:-TRAMA.size].decode(), TRAMA.unpack(contenido[-TRAMA.size:])[0]
+
+
+def velocidad_de_texto(texto):
+    """Convierte '10x' o 'Máx' en un factor (0 = máxima velocidad)."""
+    texto = texto.strip().lower()
+    if texto.startswith("m"):
+        return 0
+    return float(texto.rstrip("x"))
+
+
+class FuenteReproduccion:
+    """Fuente que reproduce una captura como si fuera el puerto serial.
+
+    Ofrece la parte de la interfaz de `serial.Serial` que usa el analizador
+    (`in_waiting`, `read`, `timeout`, `is_open`, `close`) y entrega los
+    bloques crudos respetando sus tiempos originales divididos por la
+    velocidad elegida, o tan rápido como se lean si la velocidad es 0.
+    """
+
+    LIMITE_PENDIENTE = 1 << 20  # Bytes liberados como máximo por adelantado
+
+    def __init__(self, ruta, velocidad=1.0):
+        """Prepara la reproducción.
+
+        Args:
+            ruta (str): Ruta del archivo de captura
+            velocidad (float): 1 = tiempo real, N = N veces más rápido, 0 = máxima
+        """
+        self.port = ruta
+        self.velocidad = velocidad
+        self.timeout = None
+        self.is_open = True
+        self._registros = leer_captura(ruta, tipos=(TIPO_BLOQUE,))
+        self._pendiente = bytearray()
+        self._siguiente = None  # (instante de entrega, bytes) del próximo bloque
+        self._origen_captura = None
+        self._origen_reproduccion = None
+        self.terminada = False
+        self._cargar_siguiente()
+
+    def _cargar_siguiente(self):
+        """Lee el próximo bloque de la captura y calcula cuándo entregarlo."""
+        try:
+            _, instante, contenido = next(self._registros)
+        except StopIteration:
+            self._siguiente = None
+            self.terminada = True
+            return
+        if self._origen_captura is None:
+            self._origen_captura = instante
+            self._origen_reproduccion = time.monotonic()
+        desfase = (instante - self._origen_captura) / 1e9
+        entrega = self._origen_reproduccion + (desfase / self.velocidad if self.velocidad else 0)
+        self._siguiente = (entrega, bytes(contenido))
+
+    def _liberar_vencidos(self):
+        """Pasa a la cola de lectura los bloques cuyo tiempo ya llegó."""
+        ahora = time.monotonic()
+        while (self._siguiente is not None and self._siguiente[0] <= ahora
+               and len(self._pendiente) < self.LIMITE_PENDIENTE):
+            self._pendiente.extend(self._siguiente[1])
+            self._cargar_siguiente()
+
+    @property
+    def in_waiting(self):
+        self._liberar_vencidos()
+        return len(self._pendiente)
+
+    def read(self, size=1):
+        """Lee hasta `size` bytes, esperando como mucho `timeout` segundos."""
+        self._liberar_vencidos()
+        if not self._pendiente and self._siguiente is not None:
+            espera = self._siguiente[0] - time.monotonic()
+            if self.timeout is not None:
+                espera = min(espera, self.timeout)
+            if espera > 0:
+                time.sleep(espera)
+            self._liberar_vencidos()
+        elif not self._pendiente and self.timeout:
+            # Captura terminada: comportarse como un puerto sin datos
+            time.sleep(self.timeout)
+        datos = bytes(self._pendiente[:size])
+        del self._pendiente[:size]
+        return datos
+
+    def write(self, datos):
+        return len(datos)
+
+    def close(self):
+        self.is_open = False
+        self._registros.close()
@@ -0,0 +1,204 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from encuadre_uart import VerificacionLote, VerificacionTrama, como_encuadre, obtener_encuadre
+
+VOLTAGE_RANGE = (-12, 12)  # Voltaje mínimo y máximo en V
+BITS_TRAMA = obtener_encuadre().largo  # Trama del encuadre predeterminado (8O1: 11 bits)
+
+# Marca `TX:` que se completa al escribir el lote en el puerto (ver
+# `sellar_envio`); tiene el ancho de un time.time_ns() para no cambiar el largo
+ENVIO_PENDIENTE = b"TX:" + b"-" * 19
+
+LoteTramas = namedtuple("LoteTramas", ["bytes_datos", "paridad", "bits"])
+
+
+def valor_a_byte(valor):
+    """Convierte un voltaje entre -12V y +12V en un byte (0-255).
+
+    Args:
+        valor (float): Voltaje del sensor
+
+    Returns:
+        int: Byte cuantizado
+    """
+    byte_valor = int((valor + 12) * 10)
+    return max(0, min(255, byte_valor))
+
+
+def construir_trama(valor, encuadre=None):
+    """Forma la trama RS-232 de un voltaje.
+
+    - 1 bit de inicio (0)
+    - 5 a 8 bits de datos (los más significativos del byte cuantizado)
+    - 1 bit de paridad, si el encuadre la usa
+    - 1, 1,5 o 2 bits de parada (1)
+
+    Args:
+        valor (float): Voltaje del sensor
+        encuadre (Encuadre): Encuadre o su nombre (por defecto 8O1)
+
+    Returns:
+        str: Trama de caracteres '0'/'1'
+    """
+    encuadre = como_encuadre(encuadre)
+    return encuadre.textos[encuadre.dato_de_byte[valor_a_byte(valor)]]
+
+
+def formatear_mensaje(trama, valor):
+    """Codifica el mensaje de texto que espera el analizador.
+
+    Args:
+        trama (str): Trama RS-232 en texto
+        valor (float): Voltaje del sensor
+
+    Returns:
+        bytes: Línea `<TRAMA:...|VOLT:...>` terminada en salto de línea
+    """
+    return f"<TRAMA:{trama}|VOLT:{valor}>\n".encode()
+
+
+def voltajes_a_bytes(voltajes):
+    """Cuantiza un arreglo de voltajes igual que `valor_a_byte`.
+
+    Args:
+        voltajes (array_like): Voltajes del sensor
+
+    Returns:
+        np.ndarray: Bytes cuantizados (uint8)
+    """
+    voltajes = np.asarray(voltajes, dtype=np.float64)
+    # astype trunca hacia cero, igual que int()
+    escalados = ((voltajes + 12) * 10).astype(np.int64)
+    return np.clip(escalados, 0, 255).astype(np.uint8)
+
+
+def codificar_lote(valores, son_bytes=False, encuadre=None):
+    """Codifica de una vez todas las tramas de un arreglo.
+
+    Args:
+        valores (array_like): Voltajes o bytes a codificar
+        son_bytes (bool): True si `valores` ya son bytes (0-255)
+        encuadre (Encuadre): Encuadre o su nombre (por defecto 8O1)
+
+    Returns:
+        LoteTramas: Dato de cada trama (los bits más significativos del
+            byte cuantizado), bit de paridad y matriz (N, largo) con los
+            bits inicio/datos/paridad/parada
+    """
+    encuadre = como_encuadre(encuadre)
+    if son_bytes:
+        bytes_datos = np.asarray(valores, dtype=np.uint8)
+    else:
+        bytes_datos = voltajes_a_bytes(valores)
+
+    datos = encuadre.dato_de_byte[bytes_datos]
+    return LoteTramas(datos, encuadre.tabla_paridad[datos], encuadre.bits[datos])
+
+
+def empaquetar_tramas(bits):
+    """Empaqueta la matriz de bits en 2 bytes por trama.
+
+    Args:
+        bits (np.ndarray): Matriz (N, largo) de `codificar_lote`
+
+    Returns:
+        np.ndarray: Matriz (N, 2) de uint8, primer bit en el bit más alto
+    """
+    return np.packbits(bits, axis=1)
+
+
+def tramas_texto(bits):
+    """Convierte la matriz de bits en las tramas de texto '0'/'1'.
+
+    Args:
+        bits (np.ndarray): Matriz (N, largo) de `codificar_lote`
+
+    Returns:
+        np.ndarray: Arreglo de bytes de `largo` caracteres por trama
+    """
+    texto = np.ascontiguousarray(bits + ord('0'), dtype=np.uint8)
+    return texto.view(f"S{bits.shape[1]}").ravel()
+
+
+def formatear_lote(valores, generados=None, envio=None, sensores=None, encuadre=None):
+    """Codifica un arreglo de voltajes como mensajes de texto concatenados.
+
+    Con marcas de tiempo cada registro agrega `|T:<ns>|TX:<ns>`: el
+    instante en que se generó su valor y el de escritura del lote en el
+    puerto (`time.time_ns()`). Sin `envio` queda ENVIO_PENDIENTE, que
+    `sellar_envio` completa justo antes de escribir. En un bus con varios sensores agrega al final
+    `|CH:<id>` con el sensor que produjo el valor. Los receptores que no
+    esperan estos campos los ignoran.
+
+    Args:
+        valores (array_like): Voltajes del sensor
+        generados (list): Instante de generación de cada valor, en ns
+        envio (int): Instante de escritura en el puerto, en ns; None para
+            sellarlo al escribir
+        sensores (list): Identificador del sensor de cada valor
+        encuadre (Encuadre): Encuadre o su nombre (por defecto 8O1)
+
+    Returns:
+        tuple: (bytes con todas las líneas, LoteTramas)
+    """
+    encuadre = como_encuadre(encuadre)
+    valores = np.asarray(valores, dtype=np.float64)
+    lote = codificar_lote(valores, encuadre=encuadre)
+    tramas = encuadre.texto[lote.bytes_datos]
+    # El voltaje se envía con la representación completa de float, como
+    # hace `formatear_mensaje`
+    formato = b"<TRAMA:%s|VOLT:%r"
+    columnas = [tramas.tolist(), valores.tolist()]
+    if generados is not None:
+        formato += b"|T:%d|" + (ENVIO_PENDIENTE if envio is None else b"TX:%d" % envio)
+        columnas.append(generados)
+    if sensores is not None:
+        formato += b"|CH:%d"
+        columnas.append(sensores)
+    formato += b">\n"
+    mensajes = [formato % campos for campos in zip(*columnas)]
+    return b"".join(mensajes), lote
+
+
+def sellar_envio(datos, instante=None):
+    """Completa la marca de envío pendiente de los registros de un lote.
+
+    Args:
+        datos (bytes): Registros de `formatear_lote` sin instante de envío
+        instante (int): time.time_ns() de la escritura (por defecto ahora)
+
+    Returns:
+        bytes: Registros con `TX:` del mismo largo que `datos`
+    """
+    if instante is None:
+        instante = time.time_ns()
+    return datos.replace(ENVIO_PENDIENTE, b"TX:%019d" % instante)
+
+
+def verificar_trama(trama, encuadre=None):
+    """Separa y verifica las partes de una trama recibida en texto.
+
+    Args:
+        trama (str): Trama de caracteres '0'/'1'
+        encuadre (Encuadre): Encuadre o su nombre (por defecto 8O1)
+
+    Returns:
+        VerificacionTrama: Bits de cada parte y si son correctos
+    """
+    return como_encuadre(encuadre).verificar_trama(trama)
+
+
+def verificar_lote(bits, encuadre=None):
+    """Verifica de una vez inicio, paridad y parada de un lote de tramas.
+
+    Args:
+        bits (np.ndarray): Matriz (N, largo) de bits
+        encuadre (Encuadre): Encuadre o su nombre (por defecto 8O1)
+
+    Returns:
+        VerificacionLote: Dato y máscaras de bits correctos
+    """
+    return como_encuadre(encuadre).verificar_lote(bits)
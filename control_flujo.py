@@ -0,0 +1,241 @@
+import threading
+import time
+from collections import deque
+
+import serial
+
+from codificador_tramas import sellar_envio
+
+XON = 0x11  # DC1: el receptor puede volver a recibir
+XOFF = 0x13  # DC3: el receptor pide que se deje de transmitir
+SIN_CONTROL = "Ninguno"
+MODOS_FLUJO = [SIN_CONTROL, "RTS/CTS", "XON/XOFF"]
+
+# Pin del DB-9 -> atributo de `serial.Serial` con su estado
+LINEAS_MODEM = {
+    "DCD": "cd",
+    "DTR": "dtr",
+    "DSR": "dsr",
+    "RTS": "rts",
+    "CTS": "cts",
+    "RI": "ri",
+}
+
+
+def leer_lineas(ser):
+    """Estado de las líneas de control del puerto.
+
+    Args:
+        ser (serial.Serial): Puerto abierto
+
+    Returns:
+        dict: Pin -> True/False, o None si el enlace no tiene esa línea
+            (pty, TCP) o no se pudo leer
+    """
+    estado = {}
+    for pin, atributo in LINEAS_MODEM.items():
+        try:
+            estado[pin] = bool(getattr(ser, atributo))
+        except (AttributeError, serial.SerialException, OSError, ValueError):
+            estado[pin] = None
+    return estado
+
+
+def opciones_puerto(modo):
+    """Opciones de `abrir_transporte` para el transmisor según el control de flujo.
+
+    Con RTS/CTS se pide además al controlador que respete CTS carácter a
+    carácter; XON/XOFF se atiende en el programa, que así ve y cuenta cada
+    pausa (el controlador las consumiría sin avisar).
+
+    Args:
+        modo (str): Uno de MODOS_FLUJO
+
+    Returns:
+        dict: Opciones adicionales de `serial.Serial`
+    """
+    return {"rtscts": True} if modo == "RTS/CTS" else {}
+
+
+def comprobar_modo(ser, modo):
+    """Verifica que el enlace admita el control de flujo pedido.
+
+    Args:
+        ser (serial.Serial): Puerto abierto
+        modo (str): Uno de MODOS_FLUJO
+
+    Raises:
+        ValueError: Si el modo no existe o el enlace no tiene las líneas necesarias
+    """
+    if modo not in MODOS_FLUJO:
+        raise ValueError(f"Control de flujo desconocido: {modo}")
+    if modo == "RTS/CTS" and leer_lineas(ser)["CTS"] is None:
+        raise ValueError(f"El enlace {ser.port} no tiene líneas RTS/CTS; use XON/XOFF")
+
+
+class ColaTransmision:
+    """Salida del transmisor con control de flujo y cola acotada.
+
+    Los lotes codificados esperan aquí mientras el receptor no acepta
+    datos (CTS inactivo o XOFF recibido). La cola tiene un límite en bytes:
+    si se llena se descartan los lotes más antiguos y se contabilizan, así
+    que una pausa larga no hace crecer la memoria y queda a la vista
+    cuánto se retuvo y cuánto se perdió.
+    """
+
+    CAPACIDAD = 16384  # Bytes retenidos como máximo mientras el receptor no acepta
+
+    def __init__(self, ser, modo=SIN_CONTROL, capacidad=None):
+        """Configura la salida.
+
+        Args:
+            ser (serial.Serial): Puerto abierto
+            modo (str): Uno de MODOS_FLUJO
+            capacidad (int): Bytes que puede retener la cola
+
+        Raises:
+            ValueError: Si el modo no existe o el enlace no lo admite
+        """
+        comprobar_modo(ser, modo)
+        self.ser = ser
+        self.modo = modo
+        self.capacidad = capacidad or self.CAPACIDAD
+        self.bloques = deque()  # (datos, tramas, sellar) en orden de generación
+        self.detenido = False  # El receptor pidió no transmitir
+
+        # Contadores observables desde la interfaz
+        self.pendientes = 0  # Bytes en cola
+        self.max_pendientes = 0
+        self.tramas_descartadas = 0
+        self.pausas = 0
+        self._tiempo_detenido = 0.0
+        self._detenido_desde = None
+
+    @property
+    def tiempo_detenido(self):
+        """Segundos acumulados con la salida detenida, incluida la pausa en curso."""
+        if self.detenido:
+            return self._tiempo_detenido + time.monotonic() - self._detenido_desde
+        return self._tiempo_detenido
+
+    def actualizar(self):
+        """Lee el estado del receptor (CTS o los XON/XOFF recibidos)."""
+        if self.modo == "RTS/CTS":
+            detenido = not self.ser.cts
+        elif self.modo == "XON/XOFF":
+            detenido = self.detenido
+            disponibles = self.ser.in_waiting
+            if disponibles:
+                recibido = self.ser.read(disponibles)
+                # Manda el último carácter de control recibido
+                ultimo_xon, ultimo_xoff = recibido.rfind(bytes([XON])), recibido.rfind(bytes([XOFF]))
+                if ultimo_xon != ultimo_xoff:
+                    detenido = ultimo_xoff > ultimo_xon
+        else:
+            return
+        if detenido != self.detenido:
+            ahora = time.monotonic()
+            if detenido:
+                self.pausas += 1
+                self._detenido_desde = ahora
+            else:
+                self._tiempo_detenido += ahora - self._detenido_desde
+            self.detenido = detenido
+
+    def encolar(self, datos, tramas, sellar=False):
+        """Agrega un lote, descartando los más antiguos si no hay lugar.
+
+        Args:
+            datos (bytes): Lote codificado
+            tramas (int): Tramas que contiene
+            sellar (bool): El lote lleva marcas de envío pendientes, que se
+                completan con el instante en que se escribe (`sellar_envio`)
+        """
+        self.bloques.append((datos, tramas, sellar))
+        self.pendientes += len(datos)
+        while self.pendientes > self.capacidad and len(self.bloques) > 1:
+            viejo, cantidad, _ = self.bloques.popleft()
+            self.pendientes -= len(viejo)
+            self.tramas_descartadas += cantidad
+        self.max_pendientes = max(self.max_pendientes, self.pendientes)
+
+    def enviar(self, maximo):
+        """Escribe lotes completos de la cola si el receptor acepta datos.
+
+        Args:
+            maximo (int): Bytes a escribir como máximo (siempre sale al menos un lote)
+
+        Returns:
+            tuple: (bytes escritos, tramas escritas)
+        """
+        if self.detenido or not self.bloques:
+            return 0, 0
+        partes, tramas, cantidad, sellar = [], 0, 0, False
+        while self.bloques and (not partes or cantidad + len(self.bloques[0][0]) <= maximo):
+            datos, n, pendiente = self.bloques.popleft()
+            partes.append(datos)
+            tramas += n
+            cantidad += len(datos)
+            sellar = sellar or pendiente
+        self.pendientes -= cantidad
+        datos = partes[0] if len(partes) == 1 else b"".join(partes)
+        # El instante de envío es el de esta escritura, no el de la codificación
+        self.ser.write(sellar_envio(datos) if sellar else datos)
+        return cantidad, tramas
+
+
+class ControlRecepcion:
+    """Pide al transmisor que pare cuando el receptor se atrasa.
+
+    Mira cuántos elementos esperan a la interfaz: al pasar la marca alta
+    desactiva RTS o envía XOFF, y al bajar de la marca baja vuelve a
+    activar RTS o envía XON. La histéresis evita alternar en cada trama.
+    """
+
+    def __init__(self, ser, modo, alto, bajo=None):
+        """Configura el control.
+
+        Args:
+            ser (serial.Serial): Puerto abierto
+            modo (str): Uno de MODOS_FLUJO
+            alto (int): Pendientes a partir de los cuales se detiene al transmisor
+            bajo (int): Pendientes por debajo de los cuales se lo reanuda
+                (por defecto la cuarta parte de `alto`)
+
+        Raises:
+            ValueError: Si el modo no existe o el enlace no lo admite
+        """
+        comprobar_modo(ser, modo)
+        self.ser = ser
+        self.modo = modo
+        self.alto = alto
+        self.bajo = alto // 4 if bajo is None else bajo
+        self.detenido = False
+        self.pausas = 0
+        # Lo llaman el hilo lector al encolar y la interfaz al vaciar
+        self._candado = threading.Lock()
+        if modo == "RTS/CTS":
+            ser.rts = True
+
+    def revisar(self, pendientes):
+        """Ajusta la línea según los elementos pendientes.
+
+        Args:
+            pendientes (int): Elementos que esperan a la interfaz
+        """
+        if self.modo == SIN_CONTROL:
+            return
+        with self._candado:
+            if not self.detenido and pendientes >= self.alto:
+                self.detenido = True
+                self.pausas += 1
+                self._senalar(False)
+            elif self.detenido and pendientes <= self.bajo:
+                self.detenido = False
+                self._senalar(True)
+
+    def _senalar(self, aceptar):
+        if self.modo == "RTS/CTS":
+            self.ser.rts = aceptar
+        else:
+            self.ser.write(bytes([XON if aceptar else XOFF]))
@@ -0,0 +1,294 @@
+import argparse
+import json
+import mmap
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from captura import TIPO_BLOQUE, TIPO_TRAMA, TRAMA, buscar_registro, leer_captura
+from codificador_tramas import VOLTAGE_RANGE
+from encuadre_uart import ENCUADRE_PREDETERMINADO, obtener_encuadre
+from parser_flujo import ParserFlujo
+from sintesis_senal import tramas_a_bits
+
+TRAMAS_POR_LOTE = 100_000  # Tramas verificadas de una vez con NumPy
+TRAMOS_POR_PROCESO = 4  # Tramos por proceso para repartir mejor la carga
+CUBETAS_VOLTAJE = 24  # Cubetas del histograma de voltajes (1 V cada una)
+
+
+class ResumenDecodificacion:
+    """Resultados acumulados de la decodificación de una captura.
+
+    Cada proceso decodifica su tramo en un resumen propio y luego se
+    combinan todos con `combinar`, de modo que solo viajan entre procesos
+    los contadores y los histogramas, nunca las tramas. Las tramas se
+    verifican con las tablas del encuadre indicado.
+    """
+
+    def __init__(self, encuadre=ENCUADRE_PREDETERMINADO):
+        """Args:
+            encuadre (str): Nombre del encuadre de las tramas (p. ej. "8E1")
+        """
+        # Se guarda el nombre: el resumen viaja entre procesos y las tablas
+        # se arman una vez en cada uno
+        self.encuadre = encuadre
+        self.tramas = 0
+        self.malformadas = 0
+        self.errores_inicio = 0
+        self.errores_paridad = 0
+        self.errores_parada = 0
+        self.histograma_bytes = np.zeros(256, dtype=np.int64)
+        self.histograma_voltajes = np.zeros(CUBETAS_VOLTAJE, dtype=np.int64)
+        self.suma_voltajes = 0.0
+        self.suma_cuadrados = 0.0
+        self.voltaje_minimo = np.inf
+        self.voltaje_maximo = -np.inf
+        self.primer_instante = None
+        self.ultimo_instante = None
+
+    def agregar(self, tramas, voltajes, instantes):
+        """Verifica un lote de tramas y acumula sus resultados.
+
+        Args:
+            tramas (list): Tramas en texto '0'/'1'
+            voltajes (list): Voltaje de cada trama
+            instantes (list): Marca de tiempo en ns de cada trama
+        """
+        if not tramas:
+            return
+        self._marcar_instantes(instantes[0], instantes[-1])
+
+        # Las tramas de largo incorrecto no se pueden verificar en bloque
+        encuadre = obtener_encuadre(self.encuadre)
+        validas = [i for i, trama in enumerate(tramas) if len(trama) == encuadre.largo]
+        self.malformadas += len(tramas) - len(validas)
+        if len(validas) < len(tramas):
+            tramas = [tramas[i] for i in validas]
+            voltajes = [voltajes[i] for i in validas]
+        if not tramas:
+            return
+
+        verificacion = encuadre.verificar_lote(tramas_a_bits(tramas))
+        self.tramas += len(tramas)
+        self.errores_inicio += int(np.count_nonzero(~verificacion.inicio_correcto))
+        self.errores_paridad += int(np.count_nonzero(~verificacion.paridad_correcta))
+        self.errores_parada += int(np.count_nonzero(~verificacion.parada_correcta))
+        self.histograma_bytes += np.bincount(verificacion.bytes_datos, minlength=256)
+
+        voltajes = np.asarray(voltajes, dtype=np.float64)
+        self.histograma_voltajes += np.histogram(voltajes, bins=CUBETAS_VOLTAJE,
+                                                 range=VOLTAGE_RANGE)[0]
+        self.suma_voltajes += float(voltajes.sum())
+        self.suma_cuadrados += float(np.dot(voltajes, voltajes))
+        self.voltaje_minimo = min(self.voltaje_minimo, float(voltajes.min()))
+        self.voltaje_maximo = max(self.voltaje_maximo, float(voltajes.max()))
+
+    def _marcar_instantes(self, primero, ultimo):
+        if self.primer_instante is None or primero < self.primer_instante:
+            self.primer_instante = primero
+        if self.ultimo_instante is None or ultimo > self.ultimo_instante:
+            self.ultimo_instante = ultimo
+
+    def combinar(self, otro):
+        """Suma a este resumen los resultados de otro tramo."""
+        for nombre in ("tramas", "malformadas", "errores_inicio", "errores_paridad",
+                       "errores_parada", "histograma_bytes", "histograma_voltajes",
+                       "suma_voltajes", "suma_cuadrados"):
+            setattr(self, nombre, getattr(self, nombre) + getattr(otro, nombre))
+        self.voltaje_minimo = min(self.voltaje_minimo, otro.voltaje_minimo)
+        self.voltaje_maximo = max(self.voltaje_maximo, otro.voltaje_maximo)
+        if otro.primer_instante is not None:
+            self._marcar_instantes(otro.primer_instante, otro.ultimo_instante)
+        return self
+
+    def informe(self):
+        """Resultados agregados listos para mostrar o serializar.
+
+        Returns:
+            dict: Tasas de error, distribución de valores y tramas por segundo
+        """
+        n = self.tramas
+        duracion = 0.0
+        if self.primer_instante is not None:
+            duracion = (self.ultimo_instante - self.primer_instante) / 1e9
+        media = self.suma_voltajes / n if n else 0.0
+        varianza = max(0.0, self.suma_cuadrados / n - media ** 2) if n else 0.0
+        bordes = np.linspace(*VOLTAGE_RANGE, CUBETAS_VOLTAJE + 1)
+        return {
+            "tramas": n,
+            "tramas_malformadas": self.malformadas,
+            "errores_inicio": self.errores_inicio,
+            "errores_paridad": self.errores_paridad,
+            "errores_parada": self.errores_parada,
+            "tasa_error_paridad": self.errores_paridad / n if n else 0.0,
+            "duracion_s": duracion,
+            "tramas_por_segundo": n / duracion if duracion > 0 else 0.0,
+            "voltaje": {
+                "minimo": self.voltaje_minimo if n else None,
+                "maximo": self.voltaje_maximo if n else None,
+                "media": media,
+                "desviacion": varianza ** 0.5,
+            },
+            "histograma_voltajes": {f"{a:+.0f}..{b:+.0f}": int(c) for a, b, c in
+                                    zip(bordes[:-1], bordes[1:], self.histograma_voltajes)},
+            "histograma_bytes": self.histograma_bytes.tolist(),
+        }
+
+
+def dividir_captura(ruta, tramos):
+    """Parte una captura en tramos alineados a registros.
+
+    Args:
+        ruta (str): Ruta del archivo de captura
+        tramos (int): Cantidad de tramos deseada
+
+    Returns:
+        list: Pares (desde, hasta) de posiciones de comienzo de registro
+    """
+    with open(ruta, "rb") as archivo:
+        with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            tamano = len(mapa)
+            cortes = sorted({buscar_registro(mapa, tamano * i // tramos) for i in range(tramos)})
+    cortes.append(tamano)
+    return [(a, b) for a, b in zip(cortes, cortes[1:]) if a < b]
+
+
+def decodificar_tramo(ruta, desde, hasta, encuadre=ENCUADRE_PREDETERMINADO):
+    """Decodifica los registros de trama de un tramo de la captura.
+
+    Args:
+        ruta (str): Ruta del archivo de captura
+        desde (int): Posición del primer registro del tramo
+        hasta (int): Posición donde empieza el tramo siguiente
+        encuadre (str): Nombre del encuadre de las tramas
+
+    Returns:
+        ResumenDecodificacion: Resultados del tramo
+    """
+    resumen = ResumenDecodificacion(encuadre)
+    tramas, voltajes, instantes = [], [], []
+    for _, instante, contenido in leer_captura(ruta, (TIPO_TRAMA,), desde, hasta):
+        tramas.append(contenido[:-TRAMA.size].decode("ascii", "replace"))
+        voltajes.append(TRAMA.unpack_from(contenido, len(contenido) - TRAMA.size)[0])
+        instantes.append(instante)
+        if len(tramas) >= TRAMAS_POR_LOTE:
+            resumen.agregar(tramas, voltajes, instantes)
+            tramas, voltajes, instantes = [], [], []
+    resumen.agregar(tramas, voltajes, instantes)
+    return resumen
+
+
+def decodificar_bloques(ruta, encuadre=ENCUADRE_PREDETERMINADO):
+    """Decodifica una captura sin registros de trama desde sus bytes crudos.
+
+    El parser conserva estado entre bloques (líneas partidas, modo texto o
+    binario), así que este recorrido es secuencial.
+
+    Args:
+        ruta (str): Ruta del archivo de captura
+        encuadre (str): Nombre del encuadre de las tramas
+
+    Returns:
+        ResumenDecodificacion: Resultados de toda la captura
+    """
+    resumen = ResumenDecodificacion(encuadre)
+    parser = ParserFlujo(encuadre)
+    tramas, voltajes, instantes = [], [], []
+    for _, instante, contenido in leer_captura(ruta, (TIPO_BLOQUE,)):
+        for trama, valor in parser.alimentar(bytes(contenido)):
+            tramas.append(trama)
+            voltajes.append(valor)
+            instantes.append(instante)
+        if len(tramas) >= TRAMAS_POR_LOTE:
+            resumen.agregar(tramas, voltajes, instantes)
+            tramas, voltajes, instantes = [], [], []
+    resumen.agregar(tramas, voltajes, instantes)
+    return resumen
+
+
+def decodificar_captura(ruta, procesos=None, encuadre=ENCUADRE_PREDETERMINADO):
+    """Decodifica una captura completa repartiéndola entre procesos.
+
+    Args:
+        ruta (str): Ruta del archivo de captura
+        procesos (int): Procesos a usar (por defecto uno por núcleo)
+        encuadre (str): Nombre del encuadre de las tramas
+
+    Returns:
+        ResumenDecodificacion: Resultados de toda la captura
+
+    Raises:
+        ValueError: Si el encuadre no es válido
+    """
+    obtener_encuadre(encuadre)
+    procesos = max(1, procesos or os.cpu_count() or 1)
+    tramos = dividir_captura(ruta, procesos * TRAMOS_POR_PROCESO)
+    resumen = ResumenDecodificacion(encuadre)
+    if procesos == 1:
+        for desde, hasta in tramos:
+            resumen.combinar(decodificar_tramo(ruta, desde, hasta, encuadre))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            futuros = [ejecutor.submit(decodificar_tramo, ruta, desde, hasta, encuadre)
+                       for desde, hasta in tramos]
+            for futuro in futuros:
+                resumen.combinar(futuro.result())
+
+    if resumen.tramas == 0 and resumen.malformadas == 0:
+        # Captura grabada sin tramas decodificadas: volver a los bytes crudos
+        resumen = decodificar_bloques(ruta, encuadre)
+    return resumen
+
+
+def mostrar_informe(informe):
+    """Imprime el informe en texto legible."""
+    print(f"Tramas decodificadas: {informe['tramas']}")
+    print(f"Tramas malformadas:   {informe['tramas_malformadas']}")
+    print(f"Errores de inicio:    {informe['errores_inicio']}")
+    print(f"Errores de paridad:   {informe['errores_paridad']} "
+          f"({informe['tasa_error_paridad']:.4%})")
+    print(f"Errores de parada:    {informe['errores_parada']}")
+    print(f"Duración:             {informe['duracion_s']:.3f} s")
+    print(f"Tramas por segundo:   {informe['tramas_por_segundo']:.1f}")
+    voltaje = informe["voltaje"]
+    if informe["tramas"]:
+        print(f"Voltaje: mín {voltaje['minimo']:.2f} V, máx {voltaje['maximo']:.2f} V, "
+              f"media {voltaje['media']:.2f} V, desviación {voltaje['desviacion']:.2f} V")
+        print("Distribución de voltajes:")
+        mayor = max(informe["histograma_voltajes"].values()) or 1
+        for cubeta, cantidad in informe["histograma_voltajes"].items():
+            print(f"  {cubeta:>8} V {cantidad:>10} {'#' * round(40 * cantidad / mayor)}")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Decodifica una captura .rscap sin interfaz gráfica")
+    parser.add_argument("captura", help="Archivo de captura grabado por el analizador")
+    parser.add_argument("-j", "--procesos", type=int, default=None,
+                        help="Procesos a usar (por defecto uno por núcleo)")
+    parser.add_argument("--json", action="store_true",
+                        help="Imprimir el informe en JSON")
+    parser.add_argument("-e", "--encuadre", default=ENCUADRE_PREDETERMINADO,
+                        help="Encuadre con que se grabaron las tramas, p. ej. 8E1 o 7O2")
+    argumentos = parser.parse_args(argumentos)
+
+    try:
+        resumen = decodificar_captura(argumentos.captura, argumentos.procesos,
+                                      argumentos.encuadre)
+    except (OSError, ValueError) as e:
+        print(f"Error al leer la captura: {e}")
+        return 1
+
+    informe = resumen.informe()
+    if argumentos.json:
+        json.dump(informe, sys.stdout, indent=2)
+        print()
+    else:
+        mostrar_informe(informe)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import argparse
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from encuadre_uart import ENCUADRE_PREDETERMINADO, como_encuadre
+
+UMBRAL = 0.0  # V; los receptores RS-232 deciden por el signo de la tensión
+
+DecodificacionUart = namedtuple("DecodificacionUart", [
+    "inicios", "bits", "bytes_datos", "paridad_correcta", "parada_correcta", "consumidas"])
+
+
+def niveles_logicos(muestras, umbral=UMBRAL, invertida=True):
+    """Convierte tensiones en niveles lógicos.
+
+    Args:
+        muestras (array_like): Tensiones de la línea
+        umbral (float): Tensión que separa los dos niveles
+        invertida (bool): True para RS-232 (marca '1' = tensión negativa),
+            False para señales lógicas ('1' = tensión positiva)
+
+    Returns:
+        np.ndarray: Niveles 0/1 (bool)
+    """
+    muestras = np.asarray(muestras, dtype=np.float64)
+    return muestras < umbral if invertida else muestras > umbral
+
+
+def decodificar_senal(muestras, muestras_por_bit, umbral=UMBRAL, invertida=True,
+                      lsb_primero=True, encuadre=None):
+    """Decodifica las tramas UART de una señal sobremuestreada.
+
+    Busca los flancos de bajada lógicos (reposo '1' a bit de inicio '0'),
+    descarta los que no siguen en '0' a mitad del bit de inicio y toma una
+    muestra a mitad de cada bit. Las tramas no se solapan: la búsqueda del
+    siguiente inicio se reanuda en la mitad del primer bit de parada, como
+    en un UART real, que tampoco mira los siguientes. Todo el trabajo por
+    muestra es vectorizado; solo el encadenamiento de tramas recorre los
+    inicios candidatos.
+
+    Args:
+        muestras (array_like): Tensiones de la línea
+        muestras_por_bit (float): Muestras por bit (frecuencia de muestreo / baudios)
+        umbral (float): Tensión que separa los dos niveles
+        invertida (bool): True para RS-232 (marca '1' = tensión negativa)
+        lsb_primero (bool): Orden de los bits de datos en la línea
+        encuadre (Encuadre): Encuadre o su nombre (por defecto 8O1)
+
+    Returns:
+        DecodificacionUart: Muestra de inicio de cada trama, matriz de bits
+            hasta el primero de parada en orden de línea, dato, máscaras de
+            paridad y parada correctas, y cantidad de muestras ya analizadas (para
+            continuar con el bloque siguiente sin perder tramas partidas)
+    """
+    encuadre = como_encuadre(encuadre)
+    logica = niveles_logicos(muestras, umbral, invertida)
+    paso = float(muestras_por_bit)
+    if paso < 2:
+        raise ValueError("Se necesitan al menos 2 muestras por bit")
+
+    # Desplazamiento de la mitad de cada bit respecto del flanco de inicio
+    centros = np.round((np.arange(encuadre.largo_verificado) + 0.5) * paso - 0.5).astype(np.int64)
+    largo = int(centros[-1]) + 1  # Muestras necesarias para leer una trama entera
+
+    # Flancos de bajada con el bit de inicio todavía en '0' a su mitad
+    flancos = np.flatnonzero(logica[:-1] & ~logica[1:]) + 1
+    flancos = flancos[flancos + largo <= logica.size]
+    flancos = flancos[~logica[flancos + centros[0]]]
+
+    # Encadenar tramas: cada una empieza en el primer flanco posterior a la
+    # mitad del bit de parada de la anterior
+    siguientes = np.searchsorted(flancos, flancos + largo).tolist()
+    elegidos = []
+    i = 0
+    while i < len(siguientes):
+        elegidos.append(i)
+        i = siguientes[i]
+    inicios = flancos[elegidos]
+
+    bits = logica[inicios[:, None] + centros].astype(np.uint8)
+    # Las tablas del encuadre esperan los datos en el orden de la trama de texto
+    verificacion = encuadre.verificar_lote(bits[:, encuadre.orden_lsb[:bits.shape[1]]]
+                                           if lsb_primero else bits)
+
+    if inicios.size:
+        consumidas = int(inicios[-1]) + largo
+    else:
+        # Sin tramas: conservar lo suficiente para una trama que recién empieza
+        consumidas = max(0, logica.size - largo)
+    return DecodificacionUart(inicios, bits, verificacion.bytes_datos,
+                              verificacion.paridad_correcta,
+                              verificacion.parada_correcta, consumidas)
+
+
+def cargar_muestras(ruta):
+    """Lee una forma de onda exportada.
+
+    Acepta arreglos `.npy` y archivos de texto/CSV; en estos se usa la
+    última columna, que en los osciloscopios suele ser la tensión.
+
+    Args:
+        ruta (str): Ruta del archivo
+
+    Returns:
+        np.ndarray: Tensiones
+    """
+    if ruta.endswith(".npy"):
+        return np.load(ruta, mmap_mode="r")
+    datos = np.loadtxt(ruta, delimiter="," if ruta.endswith(".csv") else None, ndmin=2)
+    return datos[:, -1]
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Decodifica tramas UART de una forma de onda sobremuestreada")
+    parser.add_argument("archivo", help="Forma de onda (.npy, .csv o texto)")
+    parser.add_argument("-m", "--muestras-por-bit", type=float, required=True,
+                        help="Frecuencia de muestreo dividida por los baudios")
+    parser.add_argument("-u", "--umbral", type=float, default=UMBRAL,
+                        help="Tensión de decisión en V")
+    parser.add_argument("--logica", action="store_true",
+                        help="Señal no invertida ('1' = tensión positiva)")
+    parser.add_argument("--msb-primero", action="store_true",
+                        help="Bits de datos del más al menos significativo")
+    parser.add_argument("-e", "--encuadre", default=ENCUADRE_PREDETERMINADO,
+                        help="Bits de datos, paridad (N/E/O/M/S) y parada, p. ej. 8N1 o 7E1.5")
+    argumentos = parser.parse_args(argumentos)
+
+    try:
+        muestras = cargar_muestras(argumentos.archivo)
+        resultado = decodificar_senal(muestras, argumentos.muestras_por_bit,
+                                      argumentos.umbral, not argumentos.logica,
+                                      not argumentos.msb_primero, argumentos.encuadre)
+    except (OSError, ValueError) as e:
+        print(f"Error al decodificar la señal: {e}")
+        return 1
+
+    n = resultado.inicios.size
+    print(f"Muestras analizadas: {len(muestras)}")
+    print(f"Tramas decodificadas: {n}")
+    print(f"Errores de paridad: {int(np.count_nonzero(~resultado.paridad_correcta))}")
+    print(f"Errores de parada: {int(np.count_nonzero(~resultado.parada_correcta))}")
+    if n:
+        print("Primeros bytes: " + " ".join(f"{b:02X}" for b in resultado.bytes_datos[:16]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+import functools
+from collections import namedtuple
+
+import numpy as np
+import serial
+
+BITS_DATOS = [5, 6, 7, 8]
+# Letra de la paridad -> constante de pyserial
+PARIDADES = {
+    "N": serial.PARITY_NONE,
+    "E": serial.PARITY_EVEN,
+    "O": serial.PARITY_ODD,
+    "M": serial.PARITY_MARK,
+    "S": serial.PARITY_SPACE,
+}
+NOMBRES_PARIDAD = {"N": "ninguna", "E": "par", "O": "impar", "M": "marca", "S": "espacio"}
+BITS_PARADA = {
+    "1": serial.STOPBITS_ONE,
+    "1.5": serial.STOPBITS_ONE_POINT_FIVE,
+    "2": serial.STOPBITS_TWO,
+}
+# El simulador siempre puso el bit de paridad en '1' con una cantidad par de
+# unos en los datos, es decir, paridad impar: el predeterminado es 8O1 para
+# que las tramas (y las capturas ya grabadas) no cambien
+ENCUADRE_PREDETERMINADO = "8O1"
+ENCUADRES_COMUNES = ["8O1", "8E1", "8N1", "8N2", "7E1", "7O1", "7N2", "6N1", "5N1.5", "8M1", "8S1"]
+# Los registros `<TRAMA:...>` son ASCII: la línea nunca usa menos de 7 bits
+MIN_BITS_LINEA = 7
+# Largo de las tramas de texto posibles: 5N1 (7) a 8x2 (12)
+LARGO_MINIMO = 1 + min(BITS_DATOS) + 1
+LARGO_MAXIMO = 1 + max(BITS_DATOS) + 1 + 2
+
+VerificacionTrama = namedtuple("VerificacionTrama", [
+    "bit_inicio", "bits_datos", "bit_paridad", "bit_parada",
+    "inicio_correcto", "paridad_correcta", "parada_correcta"])
+VerificacionLote = namedtuple("VerificacionLote", [
+    "bytes_datos", "inicio_correcto", "paridad_correcta", "parada_correcta"])
+
+
+@functools.lru_cache(maxsize=None)
+def obtener_encuadre(nombre=None):
+    """Encuadre de un nombre como "8E1" o "7O1.5", con sus tablas ya armadas.
+
+    Cada configuración se construye una sola vez y se comparte.
+
+    Args:
+        nombre (str): Bits de datos, letra de paridad (N/E/O/M/S) y bits de
+            parada; None para ENCUADRE_PREDETERMINADO
+
+    Returns:
+        Encuadre: Encuadre de la configuración
+
+    Raises:
+        ValueError: Si el nombre no describe un encuadre válido
+    """
+    nombre = (nombre or ENCUADRE_PREDETERMINADO).strip().upper()
+    try:
+        return Encuadre(int(nombre[0]), nombre[1], nombre[2:])
+    except (IndexError, ValueError) as e:
+        raise ValueError(f"Encuadre inválido: {nombre!r} ({e})") from None
+
+
+def como_encuadre(encuadre):
+    """Acepta un Encuadre, su nombre o None (predeterminado)."""
+    return encuadre if isinstance(encuadre, Encuadre) else obtener_encuadre(encuadre)
+
+
+class Encuadre:
+    """Formato de carácter UART y sus tablas de codificación y verificación.
+
+    La trama de texto se escribe como la muestra el transmisor: bit de
+    inicio, bits de datos del más al menos significativo, bit de paridad
+    (si hay) y bits de parada. 1,5 bits de parada se escriben como dos '1'
+    (en la línea el segundo dura medio bit). Todas las conversiones usan
+    tablas precalculadas al crear el encuadre, indexadas por el dato o por
+    la trama leída como número, así que el costo por trama es el mismo con
+    cualquier configuración:
+    - `bits` y `texto`: trama de cada dato posible
+    - `tabla_paridad`: bit de paridad esperado de cada dato
+    - `datos`, `inicio_ok`, `paridad_ok`, `parada_ok`: lo que resulta de
+      verificar cada trama posible en bits (hasta 2^11 con 8 datos y
+      paridad, mirando solo el primer bit de parada como un UART real)
+    - `verificaciones`: trama de texto -> VerificacionTrama, para las 2^largo
+      tramas posibles (aquí sí cuentan todos los bits de parada)
+    """
+
+    def __init__(self, bits_datos=8, paridad="O", parada="1"):
+        """Arma el encuadre y sus tablas (usar `obtener_encuadre` para compartirlas).
+
+        Args:
+            bits_datos (int): Uno de BITS_DATOS
+            paridad (str): Letra de PARIDADES
+            parada (str): Clave de BITS_PARADA
+
+        Raises:
+            ValueError: Si algún campo no es válido
+        """
+        if bits_datos not in BITS_DATOS:
+            raise ValueError(f"Bits de datos inválidos: {bits_datos}")
+        if paridad not in PARIDADES:
+            raise ValueError(f"Paridad inválida: {paridad}")
+        if parada not in BITS_PARADA:
+            raise ValueError(f"Bits de parada inválidos: {parada}")
+        self.bits_datos = bits_datos
+        self.paridad = paridad
+        self.parada = parada
+        self.nombre = f"{bits_datos}{paridad}{parada}"
+
+        # Posiciones de cada campo en la trama de texto
+        self.tiene_paridad = paridad != "N"
+        self.posicion_paridad = 1 + bits_datos if self.tiene_paridad else None
+        self.posicion_parada = 1 + bits_datos + self.tiene_paridad
+        self.largo = self.posicion_parada + (1 if parada == "1" else 2)
+        self.largo_verificado = self.posicion_parada + 1  # Hasta el primer bit de parada
+        # Tiempo de bit que ocupa la trama en la línea
+        self.bits_por_trama = self.posicion_parada + float(parada)
+        # Los registros viajan como caracteres de la línea, que nunca tienen
+        # menos de MIN_BITS_LINEA bits de datos
+        self.bits_datos_linea = max(bits_datos, MIN_BITS_LINEA)
+        self.bits_por_caracter = 1 + self.bits_datos_linea + self.tiene_paridad + float(parada)
+        # Columnas para pasar del orden de línea (LSB primero) al de la trama de
+        # texto: el bloque de datos invertido (la permutación es su propia inversa)
+        self.orden_lsb = np.r_[0, bits_datos:0:-1, bits_datos + 1:self.largo]
+
+        self._armar_tablas()
+
+    def _armar_tablas(self):
+        n = self.bits_datos
+        datos = np.arange(1 << n)
+        unos = np.unpackbits(datos.astype(np.uint8)[:, None], axis=1).sum(axis=1)
+        self.tabla_paridad = {
+            "N": np.zeros(1 << n, dtype=np.uint8),
+            "E": (unos % 2).astype(np.uint8),
+            "O": (1 - unos % 2).astype(np.uint8),
+            "M": np.ones(1 << n, dtype=np.uint8),
+            "S": np.zeros(1 << n, dtype=np.uint8),
+        }[self.paridad]
+        # Byte cuantizado (0-255) -> dato: los n bits más significativos
+        self.dato_de_byte = (np.arange(256) >> (8 - n)).astype(np.uint8)
+
+        # Codificación: dato -> trama
+        self.bits = np.ones((1 << n, self.largo), dtype=np.uint8)
+        self.bits[:, 0] = 0
+        self.bits[:, 1:1 + n] = (datos[:, None] >> np.arange(n - 1, -1, -1)) & 1
+        if self.tiene_paridad:
+            self.bits[:, self.posicion_paridad] = self.tabla_paridad
+        texto = np.ascontiguousarray(self.bits + ord('0'), dtype=np.uint8)
+        self.texto = texto.view(f"S{self.largo}").ravel()
+        self.textos = [trama.decode() for trama in self.texto.tolist()]
+
+        # Verificación: primeros `largo_verificado` bits leídos como número -> resultado
+        self.pesos = 1 << np.arange(self.largo_verificado - 1, -1, -1)
+        indices = np.arange(1 << self.largo_verificado)
+        campos = (indices[:, None] >> self.pesos.size - 1 - np.arange(self.pesos.size)) & 1
+        self.datos = ((indices >> self.pesos.size - 1 - n) & ((1 << n) - 1)).astype(np.uint8)
+        self.inicio_ok = campos[:, 0] == 0
+        self.parada_ok = campos[:, self.posicion_parada] == 1
+        if self.tiene_paridad:
+            self.paridad_ok = campos[:, self.posicion_paridad] == self.tabla_paridad[self.datos]
+        else:
+            self.paridad_ok = np.ones(indices.size, dtype=bool)
+
+        self.verificaciones = {}
+        for indice in range(1 << self.largo):
+            trama = format(indice, f"0{self.largo}b")
+            verificado = indice >> (self.largo - self.largo_verificado)
+            bit_parada = trama[self.posicion_parada:]
+            self.verificaciones[trama] = VerificacionTrama(
+                trama[0], trama[1:1 + n], trama[self.posicion_paridad] if self.tiene_paridad else "",
+                bit_parada, bool(self.inicio_ok[verificado]), bool(self.paridad_ok[verificado]),
+                "0" not in bit_parada)
+
+        # Paquete binario: (control de 3 bits, dato) -> trama de texto
+        self.tramas_paquete = []
+        for control in range(8):
+            inicio, paridad, parada = control & 1, (control >> 1) & 1, (control >> 2) & 1
+            prefijo = str(inicio)
+            sufijo = (str(paridad) if self.tiene_paridad else "") + str(parada) * (self.largo - self.posicion_parada)
+            self.tramas_paquete.extend(f"{prefijo}{dato:0{n}b}{sufijo}" for dato in range(1 << n))
+
+    def __repr__(self):
+        return f"Encuadre({self.nombre})"
+
+    def opciones_serial(self):
+        """Parámetros de `serial.Serial` para abrir el puerto con este encuadre.
+
+        Paridad y bits de parada son los del encuadre. El tamaño de carácter
+        también, salvo con 5 o 6 bits de datos: los registros de texto son
+        ASCII y necesitan 7, así que solo la trama simulada usa ese tamaño.
+
+        Returns:
+            dict: bytesize, parity y stopbits
+        """
+        return {
+            "bytesize": self.bits_datos_linea,
+            "parity": PARIDADES[self.paridad],
+            "stopbits": BITS_PARADA[self.parada],
+        }
+
+    def verificar_trama(self, trama):
+        """Separa y verifica las partes de una trama de texto.
+
+        Args:
+            trama (str): Trama de `largo` caracteres '0'/'1'
+
+        Returns:
+            VerificacionTrama: Bits de cada parte y si son correctos; una
+                trama de otro largo se marca incorrecta en todo
+        """
+        verificacion = self.verificaciones.get(trama)
+        if verificacion is None:
+            paridad = trama[self.posicion_paridad:self.posicion_paridad + 1] if self.tiene_paridad else ""
+            verificacion = VerificacionTrama(trama[:1], trama[1:1 + self.bits_datos], paridad,
+                                             trama[self.posicion_parada:], False, False, False)
+        return verificacion
+
+    def verificar_lote(self, bits):
+        """Verifica de una vez inicio, paridad y parada de un lote de tramas.
+
+        Args:
+            bits (np.ndarray): Matriz (N, largo) de bits en el orden de la
+                trama de texto; alcanza con los `largo_verificado` primeros
+
+        Returns:
+            VerificacionLote: Dato y máscaras de bits correctos
+        """
+        bits = np.asarray(bits, dtype=np.uint8)
+        if bits.ndim != 2 or not self.largo_verificado <= bits.shape[1] <= self.largo:
+            raise ValueError(f"Las tramas {self.nombre} tienen {self.largo} bits")
+        indices = bits[:, :self.largo_verificado] @ self.pesos
+        parada = self.parada_ok[indices]
+        if bits.shape[1] > self.largo_verificado:
+            parada &= bits[:, self.largo_verificado:].all(axis=1)
+        return VerificacionLote(self.datos[indices], self.inicio_ok[indices],
+                                self.paridad_ok[indices], parada)
+
+    def trama_de_paquete(self, dato, control):
+        """Trama de texto de un paquete binario (dato y bits de control)."""
+        return self.tramas_paquete[((control & 7) << self.bits_datos) | (dato & ((1 << self.bits_datos) - 1))]
@@ -0,0 +1,186 @@
+import numpy as np
+
+from codificador_tramas import codificar_lote
+from encuadre_uart import como_encuadre
+
+# Paquete binario de tamaño fijo (6 bytes):
+# - 1 byte de sincronismo (0xA5)
+# - 1 byte de datos de la trama (5 a 8 bits según el encuadre)
+# - 1 byte de control: bit 0 inicio, bit 1 paridad (0 sin paridad), bit 2 parada
+# - 2 bytes de voltaje en milivoltios (int16, little-endian)
+# - 1 byte de CRC-8 (polinomio 0x07) sobre los 4 bytes anteriores
+SYNC = 0xA5
+DTYPE_PAQUETE = np.dtype([
+    ("sync", "u1"),
+    ("dato", "u1"),
+    ("control", "u1"),
+    ("milivoltios", "<i2"),
+    ("crc", "u1"),
+])
+TAMANO_PAQUETE = DTYPE_PAQUETE.itemsize
+
+# Mensajes de texto con los que el transmisor anuncia el formato de la línea
+ANUNCIO_BINARIO = b"<MODO:BINARIO>\n"
+ANUNCIO_TEXTO = b"<MODO:TEXTO>\n"
+FORMATOS = ["Texto", "Binario"]
+
+
+def _tabla_crc8(polinomio=0x07):
+    """Precalcula el CRC-8 de cada byte posible."""
+    tabla = np.zeros(256, dtype=np.uint8)
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ polinomio) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        tabla[byte] = crc
+    return tabla
+
+
+TABLA_CRC8 = _tabla_crc8()
+
+
+def crc8(datos):
+    """Calcula el CRC-8 de una secuencia de bytes.
+
+    Args:
+        datos (bytes): Bytes a proteger
+
+    Returns:
+        int: CRC-8 de los datos
+    """
+    crc = 0
+    for byte in datos:
+        crc = int(TABLA_CRC8[crc ^ byte])
+    return crc
+
+
+def paquetes_consecutivos(buffer, inicio, maximo):
+    """Cuenta los paquetes válidos seguidos a partir de una posición.
+
+    Args:
+        buffer (bytearray): Bytes recibidos
+        inicio (int): Posición del primer byte de sincronismo
+        maximo (int): Paquetes a revisar como máximo
+
+    Returns:
+        int: Paquetes completos con sincronismo y CRC-8 correctos
+    """
+    cantidad = 0
+    while cantidad < maximo:
+        paquete = buffer[inicio:inicio + TAMANO_PAQUETE]
+        if (len(paquete) < TAMANO_PAQUETE or paquete[0] != SYNC
+                or crc8(paquete[1:TAMANO_PAQUETE - 1]) != paquete[-1]):
+            break
+        cantidad += 1
+        inicio += TAMANO_PAQUETE
+    return cantidad
+
+
+def _crc8_columnas(columnas):
+    """CRC-8 vectorizado de varios paquetes a la vez.
+
+    Args:
+        columnas (np.ndarray): Matriz (N, k) con los bytes de cada paquete
+
+    Returns:
+        np.ndarray: CRC-8 de cada fila
+    """
+    crc = np.zeros(columnas.shape[0], dtype=np.uint8)
+    for i in range(columnas.shape[1]):
+        crc = TABLA_CRC8[crc ^ columnas[:, i]]
+    return crc
+
+
+def codificar_paquetes(valores, encuadre=None):
+    """Codifica un arreglo de voltajes como paquetes binarios.
+
+    Args:
+        valores (array_like): Voltajes del sensor
+        encuadre (Encuadre): Encuadre o su nombre (por defecto 8O1)
+
+    Returns:
+        bytes: Paquetes concatenados
+    """
+    encuadre = como_encuadre(encuadre)
+    valores = np.asarray(valores, dtype=np.float64)
+    lote = codificar_lote(valores, encuadre=encuadre)
+
+    paquetes = np.empty(valores.size, dtype=DTYPE_PAQUETE)
+    paquetes["sync"] = SYNC
+    paquetes["dato"] = lote.bytes_datos
+    paquetes["control"] = (lote.bits[:, 0]
+                           | (lote.paridad << 1 if encuadre.tiene_paridad else 0)
+                           | (lote.bits[:, encuadre.posicion_parada] << 2))
+    milivoltios = np.clip(np.round(valores * 1000), -32768, 32767)
+    paquetes["milivoltios"] = milivoltios.astype(np.int16)
+
+    columnas = paquetes.view(np.uint8).reshape(-1, TAMANO_PAQUETE)
+    paquetes["crc"] = _crc8_columnas(columnas[:, 1:TAMANO_PAQUETE - 1])
+    return paquetes.tobytes()
+
+
+def trama_de_paquete(dato, control, encuadre=None):
+    """Reconstruye la trama de texto de un paquete binario.
+
+    Args:
+        dato (int): Byte de datos
+        control (int): Byte de control con inicio, paridad y parada
+        encuadre (Encuadre): Encuadre o su nombre (por defecto 8O1)
+
+    Returns:
+        str: Trama de caracteres '0'/'1'
+    """
+    return como_encuadre(encuadre).trama_de_paquete(dato, control)
+
+
+def decodificar_paquetes(buffer, encuadre=None):
+    """Extrae los paquetes válidos de un buffer y descarta el resto.
+
+    Los bytes consumidos se eliminan del buffer; un paquete incompleto al
+    final queda para la siguiente lectura. Ante basura o un CRC incorrecto
+    se avanza un byte hasta el siguiente sincronismo.
+
+    Args:
+        buffer (bytearray): Bytes recibidos pendientes de procesar
+        encuadre (Encuadre): Encuadre o su nombre (por defecto 8O1)
+
+    Returns:
+        tuple: (lista de (trama, voltaje), bytes descartados)
+    """
+    encuadre = como_encuadre(encuadre)
+    paquetes = []
+    descartados = 0
+    inicio = 0
+    datos = np.frombuffer(bytes(buffer), dtype=np.uint8)
+    while len(buffer) - inicio >= TAMANO_PAQUETE:
+        if buffer[inicio] != SYNC:
+            siguiente = buffer.find(bytes([SYNC]), inicio)
+            if siguiente < 0:
+                siguiente = len(buffer)
+            descartados += siguiente - inicio
+            inicio = siguiente
+            continue
+
+        # Camino rápido: validar de una vez todos los paquetes alineados
+        cantidad = (len(buffer) - inicio) // TAMANO_PAQUETE
+        fin = inicio + cantidad * TAMANO_PAQUETE
+        bloque = datos[inicio:fin].view(DTYPE_PAQUETE)
+        columnas = bloque.view(np.uint8).reshape(-1, TAMANO_PAQUETE)
+        validos = ((bloque["sync"] == SYNC)
+                   & (_crc8_columnas(columnas[:, 1:TAMANO_PAQUETE - 1]) == bloque["crc"]))
+        malos = np.flatnonzero(~validos)
+        buenos = cantidad if malos.size == 0 else int(malos[0])
+
+        for dato, control, milivoltios in zip(bloque["dato"][:buenos].tolist(),
+                                              bloque["control"][:buenos].tolist(),
+                                              bloque["milivoltios"][:buenos].tolist()):
+            paquetes.append((encuadre.trama_de_paquete(dato, control), milivoltios / 1000))
+        inicio += buenos * TAMANO_PAQUETE
+
+        if buenos < cantidad:
+            # Paquete corrupto: resincronizar desde el byte siguiente
+            descartados += 1
+            inicio += 1
+
+    del buffer[:inicio]
+    return paquetes, descartados
@@ -0,0 +1,305 @@
+import argparse
+import json
+import math
+import sys
+import time
+
+import numpy as np
+import serial
+
+from codificador_tramas import formatear_lote, sellar_envio
+from encuadre_uart import ENCUADRE_PREDETERMINADO, como_encuadre
+from formato_binario import ANUNCIO_BINARIO, ANUNCIO_TEXTO, FORMATOS, TAMANO_PAQUETE, codificar_paquetes
+from transporte import abrir_transporte
+
+# Parámetros de cada patrón (además de la duración, que va siempre al final)
+PATRONES = {
+    "constante": ["tasa"],  # tramas/s fijas
+    "rafagas": ["tamano", "periodo"],  # ráfagas de N tramas seguidas cada P s
+    "rampa": ["desde", "hasta"],  # tasa que crece (o baja) linealmente
+    "continuo": [],  # tramas una tras otra, sin pausa entre ellas
+}
+MAX_LOTE = 512  # Tramas por llamada a write()
+ESPERA = 0.001  # s; pausa cuando no hay tramas vencidas
+TAMANO_RESERVA = 4096  # Registros precodificados que se reutilizan en rotación
+INTERVALO_INFORME = 1.0  # s entre líneas de avance
+
+
+class Etapa:
+    """Tramo del guion de carga: un patrón de tráfico durante un tiempo.
+
+    El patrón se expresa como la cantidad acumulada de tramas que deberían
+    haberse enviado a cada instante; el generador envía la diferencia con
+    lo ya enviado, así que los atrasos se recuperan sin acumular deriva.
+    """
+
+    def __init__(self, patron, parametros, duracion):
+        """Args:
+            patron (str): Una de las claves de PATRONES
+            parametros (list): Valores de los parámetros del patrón
+            duracion (float): Segundos que dura la etapa
+        """
+        if patron not in PATRONES:
+            raise ValueError(f"Patrón desconocido: {patron} (use {', '.join(PATRONES)})")
+        if len(parametros) != len(PATRONES[patron]):
+            raise ValueError(f"El patrón {patron} espera: {' '.join(PATRONES[patron] + ['duracion'])}")
+        if duracion <= 0 or any(valor < 0 for valor in parametros):
+            raise ValueError(f"Parámetros inválidos para {patron}: {parametros} {duracion}")
+        self.patron = patron
+        self.parametros = dict(zip(PATRONES[patron], parametros))
+        self.duracion = duracion
+
+    @classmethod
+    def de_texto(cls, partes):
+        """Crea la etapa desde `patron param... duracion` (línea de comandos)."""
+        try:
+            numeros = [float(parte) for parte in partes[1:]]
+        except ValueError:
+            raise ValueError(f"Etapa inválida: {' '.join(partes)}")
+        if not numeros:
+            raise ValueError(f"Falta la duración de la etapa {partes[0]}")
+        return cls(partes[0], numeros[:-1], numeros[-1])
+
+    def objetivo(self, t):
+        """Tramas que deberían haberse enviado a los `t` segundos."""
+        p = self.parametros
+        if self.patron == "constante":
+            return p["tasa"] * t
+        if self.patron == "rafagas":
+            # Cada ráfaga vence entera al comienzo de su período
+            return p["tamano"] * (math.floor(t / p["periodo"]) + 1) if p["periodo"] else math.inf
+        if self.patron == "rampa":
+            return p["desde"] * t + (p["hasta"] - p["desde"]) * t * t / (2 * self.duracion)
+        return math.inf
+
+    def tasa_objetivo(self):
+        """Tasa media que pide la etapa en tramas/s (None si es continua)."""
+        total = self.objetivo(self.duracion)
+        if self.patron == "rafagas":
+            # La ráfaga que vencería justo al terminar no llega a enviarse
+            total = self.parametros["tamano"] * math.ceil(self.duracion / self.parametros["periodo"])
+        return None if math.isinf(total) else total / self.duracion
+
+    def descripcion(self):
+        partes = [self.patron] + [f"{nombre}={valor:g}" for nombre, valor in self.parametros.items()]
+        return " ".join(partes + [f"{self.duracion:g}s"])
+
+
+class GeneradorCarga:
+    """Escribe en un puerto el tráfico de un guion de etapas.
+
+    Usa el mismo encuadre que el transmisor (registros de texto o paquetes
+    binarios, con anuncio de formato), precodifica una reserva de
+    registros para que la codificación no limite la tasa, y mide para cada
+    etapa la tasa lograda frente a la pedida.
+    """
+
+    def __init__(self, ser, formato="Texto", marcas_tiempo=False, sensores=0, semilla=0,
+                 informar=print, encuadre=None):
+        """Configura el generador.
+
+        Args:
+            ser (serial.Serial): Puerto abierto
+            formato (str): "Texto" o "Binario"
+            marcas_tiempo (bool): Agregar `|T:...|TX:...` a cada registro de texto
+            sensores (int): Si es mayor que 0, agregar `|CH:<id>` repartido entre
+                esa cantidad de sensores
+            semilla (int): Semilla de los voltajes
+            informar (callable): Recibe las líneas de avance (None para callar)
+            encuadre (Encuadre): Encuadre de las tramas, o su nombre (por defecto 8O1)
+        """
+        encuadre = como_encuadre(encuadre)
+        if formato == "Binario" and (marcas_tiempo or sensores):
+            raise ValueError("El formato binario no lleva marcas de tiempo ni sensores")
+        if formato == "Binario" and encuadre.bits_datos_linea < 8:
+            raise ValueError(f"El formato binario necesita 8 bits de datos en la línea "
+                             f"(encuadre {encuadre.nombre})")
+        self.ser = ser
+        self.formato = formato
+        self.encuadre = encuadre
+        self.marcas_tiempo = marcas_tiempo
+        self.informar = informar
+        self.valores = np.random.default_rng(semilla).uniform(-12, 12, TAMANO_RESERVA)
+        self.ids = (np.arange(TAMANO_RESERVA) % sensores + 1).tolist() if sensores else None
+        if formato == "Binario":
+            datos = codificar_paquetes(self.valores, encuadre)
+            self.reserva = [datos[i:i + TAMANO_PAQUETE] for i in range(0, len(datos), TAMANO_PAQUETE)]
+        else:
+            self.reserva = formatear_lote(self.valores, sensores=self.ids, encuadre=encuadre)[0].splitlines(keepends=True)
+        self.posicion = 0
+
+    def _registros(self, cantidad):
+        """Devuelve `cantidad` registros listos para escribir."""
+        indices = (self.posicion + np.arange(cantidad)) % TAMANO_RESERVA
+        self.posicion = int(indices[-1]) + 1
+        if self.marcas_tiempo:
+            # Las marcas cambian en cada lote: codificar en el momento
+            ahora = time.time_ns()
+            sensores = None if self.ids is None else [self.ids[i] for i in indices.tolist()]
+            return formatear_lote(self.valores[indices], [ahora] * cantidad, None, sensores,
+                                  self.encuadre)[0]
+        return b"".join([self.reserva[i] for i in indices.tolist()])
+
+    def anunciar(self):
+        """Anuncia el formato para que el analizador lo negocie."""
+        self.ser.write(ANUNCIO_BINARIO if self.formato == "Binario" else ANUNCIO_TEXTO)
+
+    def ejecutar(self, etapas):
+        """Ejecuta el guion completo.
+
+        Args:
+            etapas (list): Etapa en orden
+
+        Returns:
+            list: Informe (dict) de cada etapa
+        """
+        self.anunciar()
+        return [self.ejecutar_etapa(etapa) for etapa in etapas]
+
+    def ejecutar_etapa(self, etapa):
+        """Envía el tráfico de una etapa y mide lo logrado.
+
+        Returns:
+            dict: Tramas y tasas pedidas y logradas, atraso máximo y la serie
+                por intervalo de INTERVALO_INFORME
+        """
+        enviadas = 0
+        bytes_enviados = 0
+        atraso_maximo = 0  # Tramas vencidas sin enviar, en el peor momento
+        serie = []
+        inicio = time.monotonic()
+        proximo_informe = INTERVALO_INFORME
+        enviadas_informe = 0
+
+        while True:
+            t = time.monotonic() - inicio
+            if t >= etapa.duracion:
+                break
+            if t >= proximo_informe:
+                hasta = etapa.objetivo(proximo_informe)
+                pedidas = hasta - etapa.objetivo(proximo_informe - INTERVALO_INFORME)
+                punto = {"t": round(proximo_informe, 3), "tasa_objetivo": None if math.isinf(hasta)
+                         else pedidas / INTERVALO_INFORME,
+                         "tasa_lograda": (enviadas - enviadas_informe) / INTERVALO_INFORME}
+                serie.append(punto)
+                self._informar_avance(etapa, punto)
+                enviadas_informe = enviadas
+                proximo_informe += INTERVALO_INFORME
+
+            faltan = etapa.objetivo(t) - enviadas
+            if faltan < 1:
+                time.sleep(ESPERA)
+                continue
+            cantidad = int(min(faltan, MAX_LOTE))
+            datos = self._registros(cantidad)
+            if self.marcas_tiempo:
+                datos = sellar_envio(datos)
+            self.ser.write(datos)
+            enviadas += cantidad
+            bytes_enviados += len(datos)
+            if not math.isinf(faltan):
+                atraso_maximo = max(atraso_maximo, int(faltan) - cantidad)
+
+        # Lo escrito puede seguir en el buffer del puerto: esperar que salga
+        self.ser.flush()
+        duracion = time.monotonic() - inicio
+        tasa_objetivo = etapa.tasa_objetivo()
+        tasa_lograda = enviadas / duracion
+        return {
+            "etapa": etapa.descripcion(),
+            "duracion_s": duracion,
+            "tramas": enviadas,
+            "bytes": bytes_enviados,
+            "tasa_objetivo": tasa_objetivo,
+            "tasa_lograda": tasa_lograda,
+            "cumplimiento": tasa_lograda / tasa_objetivo if tasa_objetivo else None,
+            "bytes_por_segundo": bytes_enviados / duracion,
+            "atraso_maximo": atraso_maximo,
+            "serie": serie,
+        }
+
+    def _informar_avance(self, etapa, punto):
+        if self.informar is None:
+            return
+        objetivo = "máx" if punto["tasa_objetivo"] is None else f"{punto['tasa_objetivo']:.0f}/s"
+        self.informar(f"  [{etapa.patron}] t={punto['t']:6.1f} s  objetivo {objetivo:>10}  "
+                      f"logrado {punto['tasa_lograda']:8.0f}/s")
+
+
+def mostrar_informe(etapas):
+    """Imprime la tabla final de objetivo frente a lo logrado."""
+    print(f"{'Etapa':<40} {'Tramas':>9} {'Objetivo/s':>11} {'Logrado/s':>10} "
+          f"{'Cumpl.':>7} {'Atraso máx':>10}")
+    for informe in etapas:
+        objetivo = "máx" if informe["tasa_objetivo"] is None else f"{informe['tasa_objetivo']:.0f}"
+        cumplimiento = "-" if informe["cumplimiento"] is None else f"{informe['cumplimiento']:.1%}"
+        print(f"{informe['etapa']:<40} {informe['tramas']:>9} {objetivo:>11} "
+              f"{informe['tasa_lograda']:>10.0f} {cumplimiento:>7} {informe['atraso_maximo']:>10}")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Genera tráfico RS-232 con patrones programados, sin interfaz gráfica",
+        epilog="Etapas: " + "; ".join(f"-e {patron} {' '.join(parametros + ['duracion'])}"
+                                      for patron, parametros in PATRONES.items()))
+    parser.add_argument("puerto", help="Puerto o URL (COM6, /dev/ttyS1, pty://, socket://host:puerto...)")
+    parser.add_argument("-b", "--baudios", type=int, default=115200, help="Velocidad de la línea")
+    parser.add_argument("-e", "--etapa", nargs="+", action="append", metavar="PATRON",
+                        help="Patrón, sus parámetros y la duración en s (se puede repetir)")
+    parser.add_argument("-f", "--formato", choices=FORMATOS, default=FORMATOS[0])
+    parser.add_argument("--encuadre", default=ENCUADRE_PREDETERMINADO,
+                        help="Bits de datos, paridad (N/E/O/M/S) y parada de la línea, p. ej. 8N1")
+    parser.add_argument("--marcas", action="store_true",
+                        help="Agregar marcas de tiempo para medir la latencia en el analizador")
+    parser.add_argument("--sensores", type=int, default=0,
+                        help="Repartir los registros entre N sensores (campo CH)")
+    parser.add_argument("--espera", type=float, default=0.0,
+                        help="Segundos a esperar tras abrir el puerto (p. ej. para conectar el receptor)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("-o", "--salida", help="Guardar el informe en JSON")
+    parser.add_argument("-q", "--silencioso", action="store_true", help="No mostrar el avance")
+    argumentos = parser.parse_args(argumentos)
+
+    try:
+        etapas = [Etapa.de_texto(partes) for partes in argumentos.etapa or [["constante", "100", "10"]]]
+        encuadre = como_encuadre(argumentos.encuadre)
+        ser = abrir_transporte(argumentos.puerto, baudrate=argumentos.baudios, timeout=1,
+                               **encuadre.opciones_serial())
+        generador = GeneradorCarga(ser, argumentos.formato, argumentos.marcas, argumentos.sensores,
+                                   argumentos.semilla, None if argumentos.silencioso else print,
+                                   encuadre)
+    except (ValueError, serial.SerialException) as e:
+        print(f"Error de configuración: {e}")
+        return 1
+
+    try:
+        print(f"Generando carga en {ser.port} a {argumentos.baudios} baudios "
+              f"({argumentos.formato}, {encuadre.nombre})")
+        if argumentos.espera:
+            time.sleep(argumentos.espera)
+        # Etapa por etapa para conservar lo medido si se interrumpe
+        resultados = []
+        generador.anunciar()
+        for etapa in etapas:
+            if not argumentos.silencioso:
+                print(f"Etapa: {etapa.descripcion()}")
+            resultados.append(generador.ejecutar_etapa(etapa))
+    except KeyboardInterrupt:
+        print("Interrumpido")
+    except (serial.SerialException, OSError) as e:
+        print(f"Error de comunicación serial: {e}")
+        return 1
+    finally:
+        ser.close()
+
+    mostrar_informe(resultados)
+    if argumentos.salida:
+        with open(argumentos.salida, "w") as archivo:
+            json.dump({"puerto": ser.port, "baudios": argumentos.baudios, "formato": argumentos.formato,
+                       "encuadre": encuadre.nombre, "etapas": resultados}, archivo, indent=2)
+        print(f"Informe guardado en {argumentos.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
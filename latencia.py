@@ -0,0 +1,219 @@
+import json
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Etapas del camino de cada trama, en orden, y su nombre para la interfaz
+ETAPAS = ["generacion_envio", "envio_lectura", "lectura_parseo", "parseo_pantalla", "total"]
+NOMBRES_ETAPAS = {
+    "generacion_envio": "Generación → envío",
+    "envio_lectura": "Envío → lectura",
+    "lectura_parseo": "Lectura → parseo",
+    "parseo_pantalla": "Parseo → pantalla",
+    "total": "Generación → pantalla",
+}
+PERCENTILES = (50, 95, 99)
+
+
+class HistogramaLatencia:
+    """Histograma acumulado de latencias con cubetas logarítmicas.
+
+    Ocupa memoria fija sin importar cuántas muestras reciba y permite
+    estimar cualquier percentil con un error relativo menor que el ancho
+    de una cubeta (~6 % con 40 cubetas por década).
+    """
+
+    MINIMO_NS = 1_000  # 1 µs
+    DECADAS = 9  # Hasta 1000 s
+    CUBETAS_POR_DECADA = 40
+
+    def __init__(self):
+        self.bordes = np.logspace(np.log10(self.MINIMO_NS),
+                                  np.log10(self.MINIMO_NS) + self.DECADAS,
+                                  self.DECADAS * self.CUBETAS_POR_DECADA + 1)
+        self.limpiar()
+
+    def limpiar(self):
+        # Cubeta 0: menos de MINIMO_NS (incluye negativas por relojes
+        # desfasados); la última: más que el borde superior
+        self.cuentas = np.zeros(self.bordes.size + 1, dtype=np.int64)
+        self.cantidad = 0
+        self.negativas = 0
+        self.maximo = 0
+
+    def registrar(self, latencias, pesos=None):
+        """Suma latencias al histograma.
+
+        Args:
+            latencias (array_like): Latencias en ns
+            pesos (array_like): Cantidad de tramas con cada latencia
+        """
+        latencias = np.asarray(latencias, dtype=np.int64).ravel()
+        if latencias.size == 0:
+            return
+        pesos = np.ones(latencias.size, dtype=np.int64) if pesos is None \
+            else np.asarray(pesos, dtype=np.int64).ravel()
+        indices = np.searchsorted(self.bordes, latencias, side='right')
+        self.cuentas += np.bincount(indices, weights=pesos,
+                                    minlength=self.cuentas.size).astype(np.int64)
+        self.cantidad += int(pesos.sum())
+        self.negativas += int(pesos[latencias < 0].sum())
+        self.maximo = max(self.maximo, int(latencias.max()))
+
+    def percentil(self, p):
+        """Latencia en ns bajo la que queda el p % de las tramas.
+
+        Devuelve el centro geométrico de la cubeta correspondiente.
+        """
+        if not self.cantidad:
+            return 0.0
+        acumuladas = np.cumsum(self.cuentas)
+        i = int(np.searchsorted(acumuladas, self.cantidad * p / 100, side='left'))
+        if i == 0:
+            return 0.0
+        if i >= self.bordes.size:
+            return float(self.maximo)
+        return float(np.sqrt(self.bordes[i - 1] * self.bordes[i]))
+
+
+class MedidorLatencia:
+    """Latencias por etapa de las tramas que llegan al analizador.
+
+    El hilo lector informa cada lectura parseada con `registrar_recepcion`
+    (con las marcas de tiempo que trae cada registro, si las hay) y la
+    interfaz informa cuántas tramas mostró con `registrar_pantalla`. Las
+    marcas usan `time.time_ns()`, así que las etapas que cruzan del
+    transmisor al analizador requieren que ambos compartan el reloj (la
+    misma máquina o relojes sincronizados).
+    """
+
+    def __init__(self):
+        self.histogramas = {etapa: HistogramaLatencia() for etapa in ETAPAS}
+        self._pendientes = deque()  # [parseo, cantidad, generados o None]
+        self._candado = threading.Lock()
+        self.inicio = time.time()
+
+    def limpiar(self):
+        """Descarta lo acumulado."""
+        with self._candado:
+            for histograma in self.histogramas.values():
+                histograma.limpiar()
+            self._pendientes.clear()
+            self.inicio = time.time()
+
+    def envolver(self, parser):
+        """Devuelve la función de parseo de `parser` midiendo cada lectura.
+
+        Args:
+            parser (ParserFlujo): Parser cuyas `marcas` se registran
+
+        Returns:
+            callable: Parser con el mismo contrato que `parser.alimentar`
+        """
+        def parsear_y_medir(datos):
+            # El lector llama al parser apenas vuelve la lectura
+            lectura = time.time_ns()
+            tramas = parser.alimentar(datos)
+            self.registrar_recepcion(parser.marcas, lectura, time.time_ns())
+            return tramas
+        return parsear_y_medir
+
+    def registrar_recepcion(self, marcas, lectura, parseo):
+        """Registra las tramas parseadas de una lectura.
+
+        Args:
+            marcas (list): (generación, envío) en ns de cada trama, o None
+            lectura (int): Instante de la lectura en ns
+            parseo (int): Instante en que terminó el parseo en ns
+        """
+        if not marcas:
+            return
+        conocidas = np.array([marca for marca in marcas if marca is not None],
+                             dtype=np.int64).reshape(-1, 2)
+        with self._candado:
+            self.histogramas["lectura_parseo"].registrar([parseo - lectura], [len(marcas)])
+            if conocidas.size:
+                self.histogramas["generacion_envio"].registrar(conocidas[:, 1] - conocidas[:, 0])
+                self.histogramas["envio_lectura"].registrar(lectura - conocidas[:, 1])
+            self._pendientes.append([parseo, len(marcas),
+                                     conocidas[:, 0] if len(conocidas) == len(marcas) else None])
+
+    def registrar_pantalla(self, cantidad, descartadas=0):
+        """Registra que las siguientes tramas ya se ven en pantalla.
+
+        Args:
+            cantidad (int): Tramas mostradas en este refresco
+            descartadas (int): Tramas que el lector descartó desde el
+                último refresco sin mostrarlas (se quitan antes)
+        """
+        pantalla = time.time_ns()
+        with self._candado:
+            self._consumir(descartadas)
+            for parseo, n, generados in self._consumir(cantidad):
+                self.histogramas["parseo_pantalla"].registrar([pantalla - parseo], [n])
+                if generados is not None:
+                    self.histogramas["total"].registrar(pantalla - generados)
+
+    def _consumir(self, cantidad):
+        """Retira de los pendientes las primeras `cantidad` tramas.
+
+        Returns:
+            list: [parseo, cantidad, generados] de cada tramo retirado
+        """
+        retirados = []
+        while cantidad > 0 and self._pendientes:
+            pendiente = self._pendientes[0]
+            parseo, n, generados = pendiente
+            if n <= cantidad:
+                retirados.append(self._pendientes.popleft())
+            else:
+                # Lectura mostrada en parte: dividirla
+                retirados.append([parseo, cantidad,
+                                  None if generados is None else generados[:cantidad]])
+                pendiente[1] = n - cantidad
+                pendiente[2] = None if generados is None else generados[cantidad:]
+                n = cantidad
+            cantidad -= n
+        return retirados
+
+    def resumen(self, percentiles=PERCENTILES):
+        """Percentiles de cada etapa.
+
+        Returns:
+            dict: Por etapa, cantidad de tramas y percentiles en ms
+        """
+        with self._candado:
+            return {etapa: {"tramas": histograma.cantidad,
+                            **{f"p{p}": histograma.percentil(p) / 1e6 for p in percentiles},
+                            "maximo": histograma.maximo / 1e6}
+                    for etapa, histograma in self.histogramas.items()}
+
+    def texto(self):
+        """Resumen de una línea por etapa para el panel de información."""
+        lineas = []
+        for etapa, datos in self.resumen().items():
+            if datos["tramas"]:
+                lineas.append(f"{NOMBRES_ETAPAS[etapa]}: p50 {datos['p50']:.2f} ms, "
+                              f"p95 {datos['p95']:.2f} ms, p99 {datos['p99']:.2f} ms")
+            else:
+                lineas.append(f"{NOMBRES_ETAPAS[etapa]}: sin datos")
+        return "\n".join(lineas)
+
+    def volcar(self, ruta):
+        """Guarda los percentiles y los histogramas completos en JSON.
+
+        Args:
+            ruta (str): Archivo de salida
+        """
+        with self._candado:
+            histogramas = {etapa: {"cuentas": histograma.cuentas.tolist(),
+                                   "negativas": histograma.negativas}
+                           for etapa, histograma in self.histogramas.items()}
+            bordes = self.histogramas["total"].bordes.tolist()
+        informe = {"inicio": self.inicio, "fin": time.time(), "unidad": "ms",
+                   "etapas": self.resumen(), "bordes_ns": bordes,
+                   "histogramas": histogramas}
+        with open(ruta, "w") as archivo:
+            json.dump(informe, archivo, indent=2)
@@ -0,0 +1,111 @@
+import queue
+import threading
+
+import serial
+
+
+class LectorSerial(threading.Thread):
+    """Hilo lector dueño del puerto serial.
+
+    Lee todo lo que llega al puerto con lecturas bloqueantes con timeout,
+    lo pasa por el parser y deja cada elemento en una cola acotada. Si la
+    interfaz no alcanza a vaciarla se descartan los elementos más antiguos
+    y se contabilizan, de modo que la lectura nunca se detiene por un
+    redibujado lento. Con un `ControlRecepcion` además pide al transmisor
+    que pare antes de que la cola se llene.
+    """
+
+    TAMANO_COLA = 10000  # Elementos máximos pendientes para la interfaz
+    TIMEOUT_LECTURA = 0.05  # s; acota la espera al detener el hilo
+
+    def __init__(self, ser, parsear, tamano_cola=None, flujo=None):
+        """Configura el lector.
+
+        Args:
+            ser (serial.Serial): Puerto abierto; el lector lo cierra al terminar
+            parsear (callable): Recibe bytes y devuelve los elementos completos
+            tamano_cola (int): Capacidad de la cola de salida
+            flujo (ControlRecepcion): Control de flujo según lo pendiente en la cola
+        """
+        super().__init__(name="LectorSerial", daemon=True)
+        self.ser = ser
+        self.ser.timeout = self.TIMEOUT_LECTURA
+        self.parsear = parsear
+        self.cola = queue.Queue(maxsize=tamano_cola or self.TAMANO_COLA)
+        self.flujo = flujo
+        self._detener = threading.Event()
+
+        # Contadores observables desde la interfaz
+        self.bytes_leidos = 0
+        self.elementos_leidos = 0
+        self.descartados = 0
+        self.error = None
+
+    def detener(self, timeout=1.0):
+        """Solicita la parada del lector y espera a que cierre el puerto."""
+        self._detener.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def drenar(self, maximo=None):
+        """Retira los elementos pendientes de la cola sin bloquear.
+
+        Args:
+            maximo (int): Cantidad máxima a retirar (todos si es None)
+
+        Returns:
+            list: Elementos en orden de llegada
+        """
+        elementos = []
+        while maximo is None or len(elementos) < maximo:
+            try:
+                elementos.append(self.cola.get_nowait())
+            except queue.Empty:
+                break
+        if self.flujo is not None:
+            self.flujo.revisar(self.cola.qsize())
+        return elementos
+
+    def _encolar(self, elemento):
+        """Agrega un elemento descartando el más antiguo si la cola está llena."""
+        while True:
+            try:
+                self.cola.put_nowait(elemento)
+                return
+            except queue.Full:
+                try:
+                    self.cola.get_nowait()
+                    self.descartados += 1
+                except queue.Empty:
+                    pass
+
+    def procesar(self, datos):
+        """Parsea un bloque leído y encola sus elementos.
+
+        Lo usa el propio hilo y también `MultiplexorPuertos`, que lee varios
+        puertos desde un solo hilo sin arrancar los lectores.
+
+        Args:
+            datos (bytes): Bytes leídos del puerto
+        """
+        self.bytes_leidos += len(datos)
+        for elemento in self.parsear(datos):
+            self.elementos_leidos += 1
+            self._encolar(elemento)
+        if self.flujo is not None:
+            self.flujo.revisar(self.cola.qsize())
+
+    def run(self):
+        """Bucle de lectura del puerto."""
+        try:
+            while not self._detener.is_set():
+                # Bloquea hasta el timeout si no hay nada pendiente
+                datos = self.ser.read(max(1, self.ser.in_waiting))
+                if datos:
+                    self.procesar(datos)
+        except (serial.SerialException, OSError) as e:
+            self.error = e
+            print(f"Error de comunicación serial: {e}")
+        finally:
+            if self.ser.is_open:
+                self.ser.close()
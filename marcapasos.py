@@ -0,0 +1,182 @@
+import threading
+import time
+
+from latencia import HistogramaLatencia
+
+
+class Marcapasos:
+    """Ritmo de envío con vencimientos absolutos y balde de fichas.
+
+    Combina dos límites:
+    - Una tasa objetivo opcional: el envío k vence en `inicio + k / tasa`,
+      calculado siempre desde el inicio, así que el tiempo que tarda cada
+      escritura no se acumula como en un `sleep` o un `after` que se
+      vuelve a programar después del trabajo.
+    - La velocidad de la línea: un balde de fichas (caracteres) que se
+      llena a baudios / bits por carácter. Lo escrito se descuenta después
+      de escribirlo y el siguiente envío espera a que el balde deje de
+      estar en deuda, como si los bytes tuvieran que salir por el cable.
+
+    Las esperas largas duermen y los últimos ESPERA_ACTIVA segundos se
+    esperan activamente, porque la resolución de `sleep` (~0,1-1 ms) es
+    del orden de un carácter a alta velocidad. Registra el retraso de
+    cada envío respecto de su vencimiento (jitter) y la tasa lograda;
+    `informe` puede consultarse desde otro hilo mientras se envía.
+    """
+
+    ESPERA_ACTIVA = 0.0005  # s finales de cada espera que no se duermen
+    MAX_PENDIENTES = 1000  # Retrasos que se juntan antes de pasarlos al histograma
+    MAX_ATRASO = 1.0  # s; más atrás que esto se resincroniza en lugar de recuperar
+
+    def __init__(self, baudrate=None, bits_por_caracter=11, tasa=None, rafaga=None,
+                 espera_activa=ESPERA_ACTIVA, max_atraso=MAX_ATRASO):
+        """Configura el marcapasos.
+
+        Args:
+            baudrate (int): Velocidad de la línea (None: sin límite de línea)
+            bits_por_caracter (int): Bits que ocupa cada carácter en la línea
+            tasa (float): Envíos por segundo (None: tan rápido como la línea)
+            rafaga (float): Caracteres que la línea acepta de una vez
+                (capacidad del balde; por defecto un carácter)
+            espera_activa (float): Segundos finales de espera activa (0 para dormir siempre)
+            max_atraso (float): Atraso que dispara una resincronización
+        """
+        if tasa is not None and tasa <= 0:
+            raise ValueError(f"Tasa inválida: {tasa}")
+        self.caracteres_por_segundo = baudrate / bits_por_caracter if baudrate else None
+        self.capacidad = max(1.0, rafaga or 1.0)
+        self.periodo = 1.0 / tasa if tasa else None
+        self.espera_activa = espera_activa
+        self.max_atraso = max_atraso
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Vuelve a empezar el cronograma y las estadísticas."""
+        self.inicio = None
+        self.ciclos = 0  # Envíos liberados desde el inicio del cronograma
+        self.fichas = self.capacidad
+        self.fichas_instante = None
+        self.enviados = 0
+        self.caracteres = 0
+        self.primero = None
+        self.ultimo = None
+        self.resincronizaciones = 0
+        self.jitter = HistogramaLatencia()
+        self._pendientes = []
+        self._candado = threading.Lock()
+
+    def _fichas_en(self, instante):
+        if self.caracteres_por_segundo is None:
+            return self.capacidad
+        return min(self.capacidad,
+                   self.fichas + (instante - self.fichas_instante) * self.caracteres_por_segundo)
+
+    def esperar(self, evento=None):
+        """Bloquea hasta que toque el próximo envío.
+
+        Args:
+            evento (threading.Event): Si se activa, la espera se interrumpe
+
+        Returns:
+            bool: False si la espera se interrumpió por `evento`
+        """
+        ahora = time.monotonic()
+        if self.inicio is None:
+            self.inicio = self.fichas_instante = ahora
+
+        objetivo = ahora
+        if self.periodo is not None:
+            objetivo = self.inicio + self.ciclos * self.periodo
+            if ahora - objetivo > self.max_atraso:
+                # Demasiado atrás (p. ej. el puerto se bloqueó): no intentar recuperar
+                self.inicio = ahora - self.ciclos * self.periodo
+                objetivo = ahora
+                self.resincronizaciones += 1
+        if self.caracteres_por_segundo is not None and self.fichas < 0:
+            # El balde sale de la deuda cuando la línea terminó de enviar lo escrito
+            objetivo = max(objetivo, self.fichas_instante - self.fichas / self.caracteres_por_segundo)
+
+        if not self._dormir_hasta(objetivo, evento):
+            return False
+        liberado = time.monotonic()
+        self._pendientes.append(int((liberado - objetivo) * 1e9))
+        if len(self._pendientes) >= self.MAX_PENDIENTES:
+            self._volcar_jitter()
+        self.ciclos += 1
+        return True
+
+    def _volcar_jitter(self):
+        with self._candado:
+            pendientes, self._pendientes = self._pendientes, []
+            if pendientes:
+                self.jitter.registrar(pendientes)
+
+    def _dormir_hasta(self, objetivo, evento):
+        while True:
+            resto = objetivo - time.monotonic()
+            if resto <= 0:
+                return True
+            if resto > self.espera_activa:
+                dormir = resto - self.espera_activa
+                if evento is not None:
+                    if evento.wait(dormir):
+                        return False
+                else:
+                    time.sleep(dormir)
+            elif evento is not None and evento.is_set():
+                return False
+
+    def ocupar(self, caracteres):
+        """Descuenta del balde bytes escritos que no cuentan como envío (p. ej. un anuncio).
+
+        Args:
+            caracteres (int): Bytes escritos en la línea
+
+        Returns:
+            float: time.monotonic() del descuento
+        """
+        ahora = time.monotonic()
+        if self.fichas_instante is None:
+            self.inicio = self.fichas_instante = ahora
+        self.fichas = self._fichas_en(ahora) - caracteres
+        self.fichas_instante = ahora
+        return ahora
+
+    def registrar(self, caracteres):
+        """Descuenta del balde lo recién escrito y lo cuenta como envío.
+
+        Args:
+            caracteres (int): Bytes escritos en la línea
+        """
+        ahora = self.ocupar(caracteres)
+        self.enviados += 1
+        self.caracteres += caracteres
+        if self.primero is None:
+            self.primero = ahora
+        self.ultimo = ahora
+
+    def tasa_lograda(self):
+        """Envíos por segundo entre el primero y el último."""
+        if self.enviados < 2 or self.ultimo <= self.primero:
+            return 0.0
+        return (self.enviados - 1) / (self.ultimo - self.primero)
+
+    def informe(self):
+        """Tasas y jitter en un diccionario.
+
+        Returns:
+            dict: Envíos, tasa objetivo y lograda (envíos/s), caracteres/s y
+                jitter p50/p99/máximo en ms
+        """
+        self._volcar_jitter()
+        transcurrido = (self.ultimo - self.primero) if self.enviados > 1 else 0.0
+        return {
+            "envios": self.enviados,
+            "tasa_objetivo": 1 / self.periodo if self.periodo else None,
+            "tasa_lograda": self.tasa_lograda(),
+            "caracteres_por_segundo": self.caracteres / transcurrido if transcurrido else 0.0,
+            "jitter_p50_ms": self.jitter.percentil(50) / 1e6,
+            "jitter_p99_ms": self.jitter.percentil(99) / 1e6,
+            "jitter_max_ms": self.jitter.maximo / 1e6,
+            "resincronizaciones": self.resincronizaciones,
+        }
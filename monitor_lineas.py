@@ -0,0 +1,200 @@
+import itertools
+import os
+import struct
+import threading
+import time
+from collections import deque
+
+import serial
+
+from control_flujo import leer_lineas
+
+try:
+    import fcntl
+    import termios
+except ImportError:  # Windows: sin ioctl de módem
+    fcntl = termios = None
+
+LINEAS_ENTRADA = ["CTS", "DSR", "DCD", "RI"]  # Líneas que maneja el otro extremo
+
+
+def crear_monitor(ser):
+    """Crea el monitor adecuado para el enlace, o None si no tiene líneas de control.
+
+    Args:
+        ser (serial.Serial): Puerto abierto
+
+    Returns:
+        MonitorLineas: Monitor sin arrancar, o None (pty, TCP, `loop://`,
+            reproducciones: sus líneas no existen o son fijas)
+    """
+    if hasattr(ser, "esperar_lineas"):
+        return MonitorLineas(ser, "memoria")
+    if not isinstance(ser, serial.Serial):
+        return None
+    if fcntl is not None and hasattr(termios, "TIOCMIWAIT") and hasattr(termios, "TIOCGICOUNT"):
+        try:
+            MonitorLineas.contadores_ioctl(ser.fileno())
+            return MonitorLineas(ser, "ioctl")
+        except (OSError, AttributeError, ValueError):
+            pass  # El controlador no cuenta transiciones: se sondea
+    return MonitorLineas(ser, "sondeo")
+
+
+class MonitorLineas(threading.Thread):
+    """Hilo que registra los cambios de CTS, DSR, DCD y RI con su instante.
+
+    En Linux espera con TIOCMIWAIT, que despierta con cada cambio de línea,
+    y lee con TIOCGICOUNT cuántas transiciones contó el controlador desde
+    la última vez: un pulso más corto de lo que tarda el hilo en despertar
+    igual queda registrado como dos transiciones que vuelven al mismo
+    estado. Esa espera no se puede interrumpir, así que el hilo espera
+    sobre un duplicado propio del descriptor: cerrar el puerto no lo deja
+    con un número de descriptor que otro archivo pueda reutilizar, y al
+    despertar después de `detener` termina sin registrar nada. Los tubos
+    `mem://` se esperan con su condición. Donde el controlador no cuenta
+    transiciones (o en Windows) se sondea el estado cada INTERVALO_SONDEO
+    en este hilo, nunca desde el bucle de Tk.
+    """
+
+    MAX_EVENTOS = 10000  # Cambios conservados para la línea de tiempo
+    INTERVALO_SONDEO = 0.001  # s entre lecturas cuando no hay espera por eventos
+    TIMEOUT_ESPERA = 0.1  # s; acota la espera al detener (tubos en memoria)
+    MASCARAS = {"CTS": "TIOCM_CTS", "DSR": "TIOCM_DSR", "DCD": "TIOCM_CAR", "RI": "TIOCM_RNG"}
+    CAMPOS_ICOUNT = "4i"  # cts, dsr, rng, dcd al inicio de serial_icounter_struct
+    TAMANO_ICOUNT = 80  # Bytes de serial_icounter_struct
+
+    def __init__(self, ser, metodo, max_eventos=None):
+        """Prepara el monitor (ver `crear_monitor`).
+
+        Args:
+            ser (serial.Serial): Puerto abierto
+            metodo (str): "ioctl", "memoria" o "sondeo"
+            max_eventos (int): Cambios conservados como máximo
+        """
+        super().__init__(name="MonitorLineas", daemon=True)
+        self.ser = ser
+        self.metodo = metodo
+        self.eventos = deque(maxlen=max_eventos or self.MAX_EVENTOS)  # (instante, pin, estado, transiciones)
+        self.transiciones = dict.fromkeys(LINEAS_ENTRADA, 0)
+        self.estado = self._leer_estado()
+        self.inicio = time.monotonic()
+        self.error = None
+        self._candado = threading.Lock()
+        self._detener = threading.Event()
+
+    @staticmethod
+    def contadores_ioctl(descriptor):
+        """Transiciones contadas por el controlador (TIOCGICOUNT)."""
+        datos = fcntl.ioctl(descriptor, termios.TIOCGICOUNT, bytes(MonitorLineas.TAMANO_ICOUNT))
+        cts, dsr, rng, dcd = struct.unpack_from(MonitorLineas.CAMPOS_ICOUNT, datos)
+        return {"CTS": cts, "DSR": dsr, "DCD": dcd, "RI": rng}
+
+    def _leer_estado(self, descriptor=None):
+        if self.metodo == "ioctl":
+            if descriptor is None:
+                descriptor = self.ser.fileno()
+            datos = fcntl.ioctl(descriptor, termios.TIOCMGET, struct.pack("I", 0))
+            bits = struct.unpack("I", datos)[0]
+            return {pin: bool(bits & getattr(termios, mascara)) for pin, mascara in self.MASCARAS.items()}
+        lineas = leer_lineas(self.ser)
+        return {pin: lineas[pin] for pin in LINEAS_ENTRADA}
+
+    def detener(self, timeout=1.0):
+        """Detiene el monitor y espera a que termine (antes de cerrar el puerto).
+
+        Una espera TIOCMIWAIT no se puede interrumpir: ese hilo (daemon) no
+        se espera y termina con el próximo cambio de línea o al salir del
+        programa, sin registrar nada más.
+        """
+        self._detener.set()
+        if self.metodo != "ioctl" and self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def eventos_desde(self, instante):
+        """Cambios registrados a partir de `instante`.
+
+        Args:
+            instante (float): time.monotonic() desde el que interesan
+
+        Returns:
+            list: Tuplas (instante, pin, estado, transiciones) en orden
+        """
+        with self._candado:
+            recientes = []
+            for evento in reversed(self.eventos):
+                if evento[0] < instante:
+                    break
+                recientes.append(evento)
+        recientes.reverse()
+        return recientes
+
+    def ultimos(self, cantidad):
+        """Los últimos `cantidad` cambios registrados, en orden."""
+        with self._candado:
+            recientes = list(itertools.islice(reversed(self.eventos), cantidad))
+        recientes.reverse()
+        return recientes
+
+    def _registrar(self, instante, estado, nuevos=None, previos=None):
+        """Agrega un evento por cada línea que cambió o tuvo transiciones."""
+        with self._candado:
+            for pin in LINEAS_ENTRADA:
+                cambio = estado[pin] != self.estado[pin]
+                transiciones = max(0, nuevos[pin] - previos[pin]) if nuevos is not None else int(cambio)
+                # Sin contador (o si el contador no vio el cambio) vale el estado leído
+                if cambio and transiciones % 2 == 0:
+                    transiciones += 1
+                if transiciones > 0:
+                    self.transiciones[pin] += transiciones
+                    self.eventos.append((instante, pin, estado[pin], transiciones))
+            self.estado = estado
+
+    def run(self):
+        """Registra los cambios hasta que se detiene el monitor o se cierra el puerto."""
+        try:
+            if self.metodo == "ioctl":
+                self._esperar_ioctl()
+            elif self.metodo == "memoria":
+                self._esperar_memoria()
+            else:
+                self._sondear()
+        except (serial.SerialException, OSError, ValueError) as e:
+            # Cerrar el puerto al detener también termina la espera
+            if not self._detener.is_set() and self.ser.is_open:
+                self.error = e
+                print(f"Error en el monitor de líneas de {self.ser.port}: {e}")
+
+    def _esperar_ioctl(self):
+        mascara = 0
+        for nombre in self.MASCARAS.values():
+            mascara |= getattr(termios, nombre)
+        descriptor = os.dup(self.ser.fileno())
+        try:
+            previos = self.contadores_ioctl(descriptor)
+            while not self._detener.is_set():
+                fcntl.ioctl(descriptor, termios.TIOCMIWAIT, mascara)
+                instante = time.monotonic()
+                if self._detener.is_set():
+                    break
+                # Los pulsos que ocurren entre dos esperas solo quedan en los contadores
+                nuevos = self.contadores_ioctl(descriptor)
+                if nuevos != previos:
+                    self._registrar(instante, self._leer_estado(descriptor), nuevos, previos)
+                    previos = nuevos
+        finally:
+            os.close(descriptor)
+
+    def _esperar_memoria(self):
+        previos = self.ser.contadores_lineas()
+        while not self._detener.is_set() and self.ser.is_open:
+            nuevos = self.ser.esperar_lineas(previos, self.TIMEOUT_ESPERA)
+            if nuevos != previos:
+                self._registrar(time.monotonic(), self._leer_estado(), nuevos, previos)
+                previos = nuevos
+
+    def _sondear(self):
+        while not self._detener.wait(self.INTERVALO_SONDEO) and self.ser.is_open:
+            estado = self._leer_estado()
+            if estado != self.estado:
+                self._registrar(time.monotonic(), estado)
@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import deque
+
+from control_flujo import SIN_CONTROL, ColaTransmision
+from codificador_tramas import construir_trama, formatear_lote
+from encuadre_uart import como_encuadre
+from formato_binario import ANUNCIO_BINARIO, ANUNCIO_TEXTO, codificar_paquetes
+from marcapasos import Marcapasos
+
+
+class MotorTransmision(threading.Thread):
+    """Motor de transmisión RS-232 fuera del hilo de Tk.
+
+    Genera valores del sensor, los codifica y los escribe en el puerto
+    tan rápido como lo permiten la velocidad y el formato de carácter
+    elegidos, manteniendo la línea saturada. Con una tasa fija envía un
+    registro por vencimiento, y con un planificador de bus las muestras
+    de cada sensor a medida que vencen. El ritmo lo lleva un `Marcapasos`
+    (vencimientos absolutos y balde de fichas con la velocidad de la
+    línea) y lo generado pasa por una `ColaTransmision`, que lo retiene
+    mientras el control de flujo detiene la salida. La interfaz gráfica
+    solo lo inicia, lo detiene y observa sus contadores.
+    """
+
+    BITS_POR_CARACTER = como_encuadre(None).bits_por_caracter  # 8O1: inicio + 8 datos + paridad + parada
+    VENTANA_LOTE = 0.02  # Segundos de línea que se escriben por llamada a write()
+    MAX_RECIENTES = 1000  # Valores recientes que conserva para la interfaz
+    BYTES_POR_MENSAJE = 40  # Estimación inicial del largo de cada línea
+    FIFO_UART = 16  # Caracteres que acepta de una vez el FIFO de una UART 16550
+    ESPERA_FLUJO = 0.002  # s entre consultas mientras el receptor tiene detenida la salida
+
+    def __init__(self, ser, generar_valor, baudrate, bits_por_caracter=None,
+                 formato="Texto", marcas_tiempo=False, planificador=None, tasa=None,
+                 flujo=SIN_CONTROL, encuadre=None):
+        """Configura el motor.
+
+        Args:
+            ser (serial.Serial): Puerto abierto sobre el que se escribe
+            generar_valor (callable): Devuelve el siguiente voltaje del sensor
+            baudrate (int): Velocidad de la línea en baudios
+            bits_por_caracter (float): Bits que ocupa cada carácter en la línea
+                (por defecto los del encuadre)
+            formato (str): "Texto" o "Binario" (ver formato_binario)
+            marcas_tiempo (bool): Agregar a cada registro de texto los instantes
+                de generación y de envío, para medir la latencia en el analizador
+            planificador (PlanificadorSensores): Bus de varios sensores; si se
+                indica, reemplaza a `generar_valor` y cada registro lleva el
+                sensor de origen (solo formato Texto)
+            tasa (float): Registros por segundo; None para saturar la línea
+                (con planificador manda el de cada sensor y se ignora)
+            flujo (str): Control de flujo de la salida (ver MODOS_FLUJO)
+            encuadre (Encuadre): Encuadre de las tramas y de la línea, o su
+                nombre (por defecto 8O1)
+        """
+        encuadre = como_encuadre(encuadre)
+        if planificador is not None and formato == "Binario":
+            raise ValueError("El formato binario no lleva identificador de sensor; use Texto")
+        if flujo == "XON/XOFF" and formato == "Binario":
+            # Un paquete binario puede contener los bytes de XON y XOFF
+            raise ValueError("El formato binario no admite XON/XOFF; use RTS/CTS")
+        if formato == "Binario" and encuadre.bits_datos_linea < 8:
+            raise ValueError(f"El formato binario necesita 8 bits de datos en la línea "
+                             f"(encuadre {encuadre.nombre}); use Texto")
+        super().__init__(name="MotorTransmision", daemon=True)
+        self.ser = ser
+        self.generar_valor = generar_valor
+        self.baudrate = baudrate
+        self.encuadre = encuadre
+        self.bits_por_caracter = bits_por_caracter or encuadre.bits_por_caracter
+        self.formato = formato
+        self.marcas_tiempo = marcas_tiempo
+        self.planificador = planificador
+        self.tasa = tasa if planificador is None else None
+        # Con tasa fija se escribe un registro por vencimiento y la línea
+        # acepta un FIFO por adelantado; si no, lotes de una ventana que el
+        # balde deja salir al ritmo de la línea
+        rafaga = self.FIFO_UART if self.tasa else self.caracteres_por_segundo * self.VENTANA_LOTE
+        self.marcapasos = Marcapasos(baudrate, self.bits_por_caracter, tasa=self.tasa,
+                                     rafaga=rafaga)
+        self.cola = ColaTransmision(ser, flujo)
+        self._detener = threading.Event()
+
+        # Contadores observables desde la interfaz
+        self.tramas_enviadas = 0
+        self.bytes_enviados = 0
+        self.ultima_trama = None
+        self.ultimo_valor = None
+        self.error = None
+        self.inicio = None
+        self.inicio_ns = None  # time.time_ns() al iniciar, para las marcas del bus
+        self.valores_recientes = deque(maxlen=self.MAX_RECIENTES)
+        self._bytes_por_mensaje = self.BYTES_POR_MENSAJE
+
+    @property
+    def caracteres_por_segundo(self):
+        """Caracteres por segundo que admite la línea."""
+        return self.baudrate / self.bits_por_caracter
+
+    def tasa_tramas(self):
+        """Tramas por segundo alcanzadas desde el inicio."""
+        if not self.inicio:
+            return 0.0
+        transcurrido = time.monotonic() - self.inicio
+        return self.tramas_enviadas / transcurrido if transcurrido > 0 else 0.0
+
+    def detener(self, timeout=1.0):
+        """Solicita la parada del motor y espera a que termine."""
+        self._detener.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def generar_lote(self):
+        """Codifica los mensajes que caben en una ventana de línea.
+
+        Returns:
+            tuple: (mensajes concatenados listos para escribir, cantidad)
+        """
+        capacidad = self.caracteres_por_segundo * self.VENTANA_LOTE
+        cantidad = 1 if self.tasa else max(1, int(capacidad / self._bytes_por_mensaje))
+        generados = None
+        sensores = None
+        if self.planificador is not None:
+            # Solo las muestras ya vencidas; la generación es su vencimiento
+            sensores, valores, vencimientos = self.planificador.vencidas(
+                time.monotonic() - self.inicio, cantidad)
+            if not valores:
+                return b"", 0
+            cantidad = len(valores)
+            if self.marcas_tiempo:
+                generados = [self.inicio_ns + int(vencimiento * 1e9) for vencimiento in vencimientos]
+        elif self.marcas_tiempo:
+            # Marcar cada valor en el momento en que lo entrega el sensor
+            valores, generados = [], []
+            for _ in range(cantidad):
+                valores.append(self.generar_valor())
+                generados.append(time.time_ns())
+        else:
+            valores = [self.generar_valor() for _ in range(cantidad)]
+        if self.formato == "Binario":
+            # Los paquetes binarios tienen largo fijo y no llevan marcas
+            datos = codificar_paquetes(valores, self.encuadre)
+            self.ultima_trama = construir_trama(valores[-1], self.encuadre)
+        else:
+            # El instante de envío se sella al escribir el lote (ColaTransmision)
+            datos, lote = formatear_lote(valores, generados, None, sensores, self.encuadre)
+            self.ultima_trama = self.encuadre.textos[lote.bytes_datos[-1]]
+
+        self._bytes_por_mensaje = len(datos) / cantidad
+        self.valores_recientes.extend(valores)
+        self.ultimo_valor = valores[-1]
+        return datos, cantidad
+
+    def run(self):
+        """Bucle de transmisión al ritmo del marcapasos."""
+        self.inicio = time.monotonic()
+        self.inicio_ns = time.time_ns()
+        marcapasos = self.marcapasos
+        try:
+            # Anunciar el formato para que el analizador lo negocie; ocupa
+            # la línea como cualquier otro envío
+            anuncio = ANUNCIO_BINARIO if self.formato == "Binario" else ANUNCIO_TEXTO
+            self.ser.write(anuncio)
+            self.bytes_enviados += len(anuncio)
+            marcapasos.ocupar(len(anuncio))
+
+            cola = self.cola
+            maximo = int(self.caracteres_por_segundo * self.VENTANA_LOTE) or 1
+            # A velocidad de línea solo se genera cuando lo anterior ya salió;
+            # con tasa fija o bus las muestras se generan cuando vencen
+            por_vencimiento = self.tasa or self.planificador is not None
+            while marcapasos.esperar(self._detener):
+                cola.actualizar()
+                if por_vencimiento or not cola.bloques:
+                    datos, cantidad = self.generar_lote()
+                    if cantidad:
+                        cola.encolar(datos, cantidad, self.marcas_tiempo and self.formato != "Binario")
+                    elif not cola.bloques:
+                        # Ningún sensor del bus tiene una muestra vencida todavía
+                        proximo = self.inicio + self.planificador.proximo()
+                        self._detener.wait(max(0.0, proximo - time.monotonic()))
+                        continue
+                if cola.detenido:
+                    # El receptor pidió parar: lo generado queda en la cola
+                    self._detener.wait(self.ESPERA_FLUJO)
+                    continue
+                escritos, tramas = cola.enviar(maximo)
+                marcapasos.registrar(escritos)
+                self.tramas_enviadas += tramas
+                self.bytes_enviados += escritos
+        except Exception as e:
+            self.error = e
+            print(f"Error en el motor de transmisión: {e}")
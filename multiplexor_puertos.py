@@ -0,0 +1,187 @@
+import io
+import re
+import selectors
+import threading
+from collections import deque
+
+import serial
+
+from control_flujo import SIN_CONTROL, ControlRecepcion
+from latencia import MedidorLatencia
+from lector_serial import LectorSerial
+from monitor_lineas import crear_monitor
+from parser_flujo import DemultiplexorSensores, ParserFlujo
+
+
+def nombre_para_archivo(puerto):
+    """Convierte el nombre de un puerto (/dev/ttyUSB0, COM6, mem://a) en parte de un nombre de archivo."""
+    return re.sub(r"[^\w.-]+", "_", puerto).strip("_")
+
+
+class CanalPuerto:
+    """Estado de un puerto monitoreado.
+
+    Cada puerto tiene su propio parser, demultiplexor de sensores, lector
+    (cola acotada y contadores), medidor de latencia y los últimos voltajes
+    recibidos para dibujar una tira pequeña en el resumen de puertos.
+    La captura y la tira reciben todas las tramas; el filtro de sensor solo
+    cambia lo que `drenar` entrega para el detalle.
+    Con control de flujo el transmisor se detiene cuando la cola del
+    lector llega a la mitad, en lugar de perder tramas al llenarse. Si el
+    enlace tiene líneas de control, un `MonitorLineas` registra sus cambios.
+    """
+
+    TRAMAS_TIRA = 120  # Voltajes conservados para la tira del resumen
+
+    def __init__(self, ser, medir=True, grabador=None, flujo=SIN_CONTROL, encuadre=None):
+        """Prepara el canal.
+
+        Args:
+            ser (serial.Serial): Puerto abierto; se cierra al detener el canal
+            medir (bool): Medir la latencia de las tramas
+            grabador (GrabadorCaptura): Grabación opcional de lo recibido
+            flujo (str): Control de flujo hacia el transmisor (ver MODOS_FLUJO)
+            encuadre (Encuadre): Encuadre de las tramas, o su nombre (por defecto 8O1)
+        """
+        self.nombre = ser.port
+        self.parser = ParserFlujo(encuadre)
+        # El grabador va sobre el parser: graba lo recibido antes de separar sensores
+        self.grabador = grabador
+        parsear = self.parser.alimentar
+        if grabador is not None:
+            parsear = grabador.envolver(parsear)
+        self.demultiplexor = DemultiplexorSensores(self.parser, parsear)
+        self.latencia = MedidorLatencia()
+        parsear = self.latencia.envolver(self.demultiplexor) if medir else self.demultiplexor.alimentar
+        self.flujo = None
+        if flujo != SIN_CONTROL:
+            self.flujo = ControlRecepcion(ser, flujo, LectorSerial.TAMANO_COLA // 2)
+        self.lector = LectorSerial(ser, parsear, flujo=self.flujo)
+        self.monitor = crear_monitor(ser)
+        self.voltajes = deque(maxlen=self.TRAMAS_TIRA)
+        self.ultima = None  # Última trama (trama, voltaje) recibida
+        self.descartadas_vistas = 0  # Descartes del lector ya informados al medidor
+        self.drenadas = 0  # Tramas retiradas en el último `drenar`, filtradas o no
+
+    @property
+    def ser(self):
+        return self.lector.ser
+
+    def drenar(self, maximo=None):
+        """Retira las tramas pendientes y guarda sus voltajes para la tira.
+
+        Args:
+            maximo (int): Cantidad máxima a retirar (todas si es None)
+
+        Returns:
+            list: Tuplas (trama, voltaje) del sensor elegido en el
+                demultiplexor (o de todos), en orden de llegada
+        """
+        tramas = self.lector.drenar(maximo)
+        self.drenadas = len(tramas)
+        if tramas:
+            self.voltajes.extend(valor for _, valor, _ in tramas[-self.TRAMAS_TIRA:])
+            self.ultima = tramas[-1][:2]
+        return self.demultiplexor.filtrar(tramas)
+
+    def registrar_pantalla(self):
+        """Informa al medidor las tramas del último `drenar` y las descartadas por cola llena.
+
+        Las que no pasan el filtro de sensor también cuentan como mostradas:
+        ya están en la tira y en la tabla de sensores.
+        """
+        descartadas = self.lector.descartados - self.descartadas_vistas
+        self.descartadas_vistas = self.lector.descartados
+        if self.drenadas or descartadas:
+            self.latencia.registrar_pantalla(self.drenadas, descartadas)
+
+
+class MultiplexorPuertos(threading.Thread):
+    """Hilo único que lee varios puertos con `selectors`.
+
+    Los puertos que exponen un descriptor (dispositivos POSIX, `socket://`
+    y `pty://`) se esperan todos juntos en un solo `select`, así que el
+    costo de un puerto más es un descriptor más y no un hilo que despierta
+    cada TIMEOUT_LECTURA. Los que no lo tienen (puertos de Windows,
+    `loop://`, `mem://`, reproducciones) caen a su propio `LectorSerial`,
+    con el mismo contrato de cola y contadores.
+    """
+
+    TIMEOUT_SELECT = LectorSerial.TIMEOUT_LECTURA  # s; acota la espera al detener
+
+    def __init__(self):
+        super().__init__(name="MultiplexorPuertos", daemon=True)
+        self.selector = selectors.DefaultSelector()
+        self.canales = []
+        self.en_hilo_propio = []  # Canales sin descriptor, con lector propio
+        self._detener = threading.Event()
+
+    def agregar(self, canal):
+        """Agrega un canal; si el multiplexor ya corre, se lee desde ya.
+
+        Args:
+            canal (CanalPuerto): Canal con el puerto abierto
+        """
+        self.canales.append(canal)
+        if canal.monitor is not None:
+            canal.monitor.start()
+        try:
+            descriptor = canal.ser.fileno()
+            canal.ser.timeout = 0  # El select ya esperó: leer sin bloquear
+            self.selector.register(descriptor, selectors.EVENT_READ, canal)
+        except (AttributeError, io.UnsupportedOperation, OSError, ValueError,
+                serial.SerialException):
+            canal.ser.timeout = LectorSerial.TIMEOUT_LECTURA
+            self.en_hilo_propio.append(canal)
+            canal.lector.start()
+
+    def detener(self, timeout=1.0):
+        """Detiene la lectura y cierra todos los puertos."""
+        self._detener.set()
+        for canal in self.canales:
+            if canal.monitor is not None:
+                canal.monitor.detener(timeout)
+        for canal in self.en_hilo_propio:
+            canal.lector.detener(timeout)
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+        elif self.ident is None:
+            # Nunca arrancó: cerrar aquí lo que habría cerrado el hilo
+            self._cerrar()
+
+    def run(self):
+        """Bucle de lectura de los puertos con descriptor."""
+        try:
+            while not self._detener.is_set():
+                if not self.selector.get_map():
+                    self._detener.wait(self.TIMEOUT_SELECT)
+                    continue
+                for clave, _ in self.selector.select(self.TIMEOUT_SELECT):
+                    self._leer(clave)
+        finally:
+            self._cerrar()
+
+    def _leer(self, clave):
+        """Lee lo disponible en un puerto listo; un error solo afecta a ese puerto."""
+        canal = clave.data
+        lector = canal.lector
+        try:
+            datos = lector.ser.read(max(1, lector.ser.in_waiting))
+            if not datos:
+                # Listo para leer pero sin datos: el otro extremo cerró el enlace
+                raise serial.SerialException("El enlace se cerró")
+            lector.procesar(datos)
+        except (serial.SerialException, OSError) as e:
+            lector.error = e
+            print(f"Error de comunicación serial en {canal.nombre}: {e}")
+            self._quitar(clave)
+
+    def _quitar(self, clave):
+        self.selector.unregister(clave.fileobj)
+        if clave.data.ser.is_open:
+            clave.data.ser.close()
+
+    def _cerrar(self):
+        for clave in list(self.selector.get_map().values()):
+            self._quitar(clave)
+        self.selector.close()
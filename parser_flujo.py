@@ -0,0 +1,334 @@
+import re
+
+from encuadre_uart import LARGO_MAXIMO, LARGO_MINIMO, como_encuadre
+from formato_binario import (ANUNCIO_BINARIO, ANUNCIO_TEXTO, SYNC, TAMANO_PAQUETE,
+                             decodificar_paquetes, paquetes_consecutivos)
+
+# Registro de texto completo: '<' + contenido sin delimitadores + '>'
+MAX_REGISTRO = 128  # Largo máximo de un registro antes de darlo por basura
+PATRON_REGISTRO = re.compile(rb"<([^<>\r\n]{1,%d})>" % MAX_REGISTRO)
+SEPARADORES = b"\r\n"
+# Paquetes binarios válidos seguidos que hacen pasar a binario sin anuncio
+PAQUETES_DETECCION = 4
+
+REGISTRO_BINARIO = ANUNCIO_BINARIO.strip()[1:-1]
+REGISTRO_TEXTO = ANUNCIO_TEXTO.strip()[1:-1]
+
+
+class ParserFlujo:
+    """Parser incremental del flujo recibido por el analizador.
+
+    Acumula los bytes leídos en un `bytearray`, extrae todos los registros
+    `<TRAMA:...|VOLT:...>` completos (con las marcas de tiempo opcionales
+    `|T:...|TX:...` del transmisor), conserva los registros parciales para
+    la siguiente lectura y se resincroniza ante basura. También sigue los
+    anuncios de formato y decodifica los paquetes binarios cuando el
+    transmisor negocia ese modo. Si el anuncio se perdió (el analizador
+    arrancó después o se reconectó), pasa a binario al encontrar
+    PAQUETES_DETECCION paquetes válidos seguidos: el byte de sincronismo
+    0xA5 nunca aparece en los registros de texto, que son ASCII. Acepta
+    tramas de texto de cualquier encuadre; el encuadre configurado solo se
+    usa para reconstruir las tramas de los paquetes binarios, que no las
+    llevan escritas.
+    """
+
+    def __init__(self, encuadre=None):
+        """Inicializa el buffer y los contadores.
+
+        Args:
+            encuadre (Encuadre): Encuadre o su nombre (por defecto 8O1)
+        """
+        self.encuadre = como_encuadre(encuadre)
+        self.buffer = bytearray()
+        self.modo_binario = False
+        self.registros = 0
+        self.errores = 0
+        self.bytes_descartados = 0
+        # Marcas (generación, envío) en ns de cada trama de la última llamada
+        # a `alimentar`, o None si el registro no las trae
+        self.marcas = []
+        # Sensor (campo CH) de cada trama de la última llamada, o None
+        self.sensores = []
+
+    def reiniciar(self):
+        """Descarta el estado acumulado y vuelve al formato de texto."""
+        self.__init__(self.encuadre)
+
+    def alimentar(self, datos):
+        """Procesa un bloque de bytes recibidos.
+
+        Args:
+            datos (bytes): Bytes leídos del puerto
+
+        Returns:
+            list: Tuplas (trama, voltaje) de cada registro completo
+        """
+        self.buffer.extend(datos)
+        self.marcas = []
+        self.sensores = []
+        tramas = []
+        # Un anuncio puede cambiar el formato a mitad del bloque
+        while self.buffer:
+            if self.modo_binario:
+                cambio = self._procesar_binario(tramas)
+            else:
+                cambio = self._procesar_texto(tramas)
+            if not cambio:
+                break
+        return tramas
+
+    def _procesar_texto(self, tramas):
+        """Extrae los registros de texto del buffer.
+
+        Returns:
+            bool: True si se pasó a formato binario (anunciado o detectado)
+        """
+        buffer = self.buffer
+        binario = self._detectar_binario()
+        posicion = 0
+        cambio = False
+        for coincidencia in PATRON_REGISTRO.finditer(buffer, 0, len(buffer) if binario < 0 else binario):
+            self._descartar(buffer[posicion:coincidencia.start()])
+            posicion = coincidencia.end()
+
+            contenido = coincidencia.group(1)
+            if contenido == REGISTRO_BINARIO:
+                # Lo que sigue al anuncio ya son paquetes binarios; si su salto
+                # de línea todavía no llegó se espera a la próxima lectura, para
+                # no tomarlo después como basura delante del primer paquete
+                if posicion == len(buffer):
+                    posicion = coincidencia.start()
+                    break
+                if buffer[posicion:posicion + 1] == b"\n":
+                    posicion += 1
+                self.modo_binario = True
+                cambio = True
+                break
+            if contenido == REGISTRO_TEXTO:
+                continue
+            self._interpretar(contenido, tramas)
+
+        if not cambio and binario >= 0:
+            # Paquetes sin anuncio: lo anterior que no era un registro es basura
+            self._descartar(buffer[posicion:binario])
+            posicion = binario
+            self.modo_binario = True
+            cambio = True
+        elif not cambio:
+            # Conservar solo un posible registro parcial al final, o el
+            # comienzo de paquetes binarios que todavía no alcanzan para
+            # detectarlos (llegaron en lecturas cortas)
+            resto = buffer[posicion:]
+            parcial = resto.rfind(b"<")
+            if (parcial < 0 or len(resto) - parcial > MAX_REGISTRO + 1
+                    or b"\n" in resto[parcial:]):
+                parcial = len(resto)
+            paquetes = self._binario_parcial(posicion)
+            if paquetes >= 0:
+                parcial = min(parcial, paquetes - posicion)
+            self._descartar(resto[:parcial])
+            posicion += parcial
+
+        del buffer[:posicion]
+        return cambio
+
+    def _detectar_binario(self):
+        """Posición del primer tramo de PAQUETES_DETECCION paquetes válidos, o -1."""
+        buffer = self.buffer
+        inicio = buffer.find(SYNC)
+        while 0 <= inicio <= len(buffer) - TAMANO_PAQUETE * PAQUETES_DETECCION:
+            if paquetes_consecutivos(buffer, inicio, PAQUETES_DETECCION) == PAQUETES_DETECCION:
+                return inicio
+            inicio = buffer.find(SYNC, inicio + 1)
+        return -1
+
+    def _binario_parcial(self, desde):
+        """Posición de un tramo corto de paquetes válidos al final del buffer, o -1."""
+        buffer = self.buffer
+        inicio = buffer.find(SYNC, max(desde, len(buffer) - TAMANO_PAQUETE * PAQUETES_DETECCION))
+        while inicio >= 0:
+            completos = (len(buffer) - inicio) // TAMANO_PAQUETE
+            if paquetes_consecutivos(buffer, inicio, completos) == completos:
+                return inicio
+            inicio = buffer.find(SYNC, inicio + 1)
+        return -1
+
+    def _procesar_binario(self, tramas):
+        """Decodifica los paquetes binarios del buffer.
+
+        Returns:
+            bool: True si se encontró un anuncio de formato de texto
+        """
+        anuncio = self.buffer.find(ANUNCIO_TEXTO)
+        if anuncio >= 0:
+            segmento = self.buffer[:anuncio]
+            del self.buffer[:anuncio + len(ANUNCIO_TEXTO)]
+            paquetes, descartados = decodificar_paquetes(segmento, self.encuadre)
+            descartados += len(segmento)
+            self.modo_binario = False
+        else:
+            # Un anuncio puede haber llegado a medias al final del buffer
+            reservados = self._prefijo_anuncio()
+            segmento = self.buffer[:len(self.buffer) - reservados]
+            del self.buffer[:len(segmento)]
+            paquetes, descartados = decodificar_paquetes(segmento, self.encuadre)
+            self.buffer[:0] = segmento
+        self.bytes_descartados += descartados
+        self.registros += len(paquetes)
+        tramas.extend(paquetes)
+        self.marcas.extend([None] * len(paquetes))
+        self.sensores.extend([None] * len(paquetes))
+        return anuncio >= 0
+
+    def _prefijo_anuncio(self):
+        """Largo del comienzo de un anuncio de texto al final del buffer."""
+        for largo in range(min(len(ANUNCIO_TEXTO) - 1, len(self.buffer)), 0, -1):
+            if self.buffer.endswith(ANUNCIO_TEXTO[:largo]):
+                return largo
+        return 0
+
+    def _interpretar(self, contenido, tramas):
+        """Interpreta el contenido de un registro `TRAMA:...|VOLT:...`."""
+        try:
+            partes = contenido.split(b"|")
+            trama = partes[0].split(b":")[1].decode()
+            valor = float(partes[1].split(b":")[1])
+            if not LARGO_MINIMO <= len(trama) <= LARGO_MAXIMO or trama.strip("01"):
+                raise ValueError(f"Trama inválida: {trama}")
+        except (ValueError, IndexError, UnicodeDecodeError):
+            # Sin imprimir: con basura en la línea serían miles de mensajes por
+            # segundo; quien lo necesite consulta `errores`
+            self.errores += 1
+            return
+        self.registros += 1
+        tramas.append((trama, valor))
+        if len(partes) > 2:
+            campos = dict(parte.partition(b":")[::2] for parte in partes[2:])
+            self.marcas.append(self._marcas_tiempo(campos))
+            self.sensores.append(self._sensor(campos))
+        else:
+            self.marcas.append(None)
+            self.sensores.append(None)
+
+    def _marcas_tiempo(self, campos):
+        """Lee los campos opcionales `T:` y `TX:` de un registro.
+
+        Returns:
+            tuple: (generación, envío) en ns, o None si faltan
+        """
+        try:
+            return int(campos[b"T"]), int(campos[b"TX"])
+        except (KeyError, ValueError):
+            return None
+
+    def _sensor(self, campos):
+        """Lee el campo opcional `CH:` (sensor de origen) de un registro."""
+        try:
+            return int(campos[b"CH"])
+        except (KeyError, ValueError):
+            return None
+
+    def _descartar(self, basura):
+        """Contabiliza los bytes que no forman parte de ningún registro."""
+        if basura:
+            self.bytes_descartados += len(basura) - sum(basura.count(c) for c in SEPARADORES)
+
+
+class DemultiplexorSensores:
+    """Separa por sensor las tramas de un bus multiplexado.
+
+    Envuelve a un `ParserFlujo` con su mismo contrato (`alimentar` y
+    `marcas`), así que se puede pasar a `MedidorLatencia.envolver`. Lleva
+    por sensor la cantidad de registros y el último voltaje. `alimentar`
+    devuelve todas las tramas con su sensor, para que la captura y la tira
+    del resumen no pierdan ninguna; el filtro por sensor se aplica después,
+    al mostrar, con `filtrar`.
+    """
+
+    def __init__(self, parser, parsear=None):
+        """Args:
+            parser (ParserFlujo): Parser del puerto
+            parsear (callable): Función que parsea con `parser` (por
+                ejemplo envuelta por un grabador); por defecto `parser.alimentar`
+        """
+        self.parser = parser
+        self.parsear = parsear or parser.alimentar
+        self.filtro = None  # Sensor cuyas tramas devuelve `filtrar` (None: todas)
+        self.estadisticas = {}  # Sensor -> [registros, último voltaje]
+        self.marcas = []
+
+    def alimentar(self, datos):
+        """Procesa un bloque de bytes recibidos.
+
+        Args:
+            datos (bytes): Bytes leídos del puerto
+
+        Returns:
+            list: Tuplas (trama, voltaje, sensor) de todos los registros;
+                sensor es None si el registro no lo indica
+        """
+        tramas = self.parsear(datos)
+        sensores = self.parser.sensores
+        estadisticas = self.estadisticas
+        for sensor, (_, valor) in zip(sensores, tramas):
+            if sensor is None:
+                continue
+            estadistica = estadisticas.get(sensor)
+            if estadistica is None:
+                estadisticas[sensor] = [1, valor]
+            else:
+                estadistica[0] += 1
+                estadistica[1] = valor
+        self.marcas = self.parser.marcas
+        return [(trama, valor, sensor) for (trama, valor), sensor in zip(tramas, sensores)]
+
+    def filtrar(self, tramas):
+        """Deja las tramas del sensor de `filtro`.
+
+        Args:
+            tramas (list): Tuplas (trama, voltaje, sensor) de `alimentar`
+
+        Returns:
+            list: Tuplas (trama, voltaje) que pasan el filtro
+        """
+        filtro = self.filtro
+        if filtro is None:
+            return [(trama, valor) for trama, valor, _ in tramas]
+        return [(trama, valor) for trama, valor, sensor in tramas if sensor == filtro]
+
+
+class SeparadorLineas:
+    """Separador incremental de líneas de texto.
+
+    Conserva la línea parcial entre lecturas y devuelve solo las líneas
+    completas, decodificadas y sin espacios en los extremos. Una línea
+    parcial de más de MAX_LINEA bytes se descarta, para que un enlace que
+    nunca envía fin de línea no haga crecer la memoria.
+    """
+
+    MAX_LINEA = 4096  # Bytes máximos de una línea sin terminar
+
+    def __init__(self):
+        """Inicializa el buffer."""
+        self.buffer = bytearray()
+        self.bytes_descartados = 0
+
+    def alimentar(self, datos):
+        """Procesa un bloque de bytes recibidos.
+
+        Args:
+            datos (bytes): Bytes leídos del puerto
+
+        Returns:
+            list: Líneas completas recibidas
+        """
+        self.buffer.extend(datos)
+        fin = self.buffer.rfind(b"\n")
+        if fin < 0:
+            if len(self.buffer) > self.MAX_LINEA:
+                self.bytes_descartados += len(self.buffer)
+                self.buffer.clear()
+            return []
+        lineas = self.buffer[:fin].decode(errors='replace').split("\n")
+        del self.buffer[:fin + 1]
+        return [linea.strip() for linea in lineas]
@@ -0,0 +1,296 @@
+import cProfile
+import csv
+import functools
+import io
+import os
+import pstats
+import time
+import tracemalloc
+
+from latencia import HistogramaLatencia
+
+VARIABLE_ENTORNO = "RS232_PERFIL"  # Si vale algo distinto de "" o "0" se mide desde el inicio
+INTERVALO_REPORTE = 60  # s; cada cuánto se reescribe el reporte con la variable activa
+SEGUNDOS_CAPTURA = 30  # Duración por defecto de las capturas de cProfile/tracemalloc
+LINEAS_TRACEMALLOC = 50  # Líneas con más crecimiento de memoria en el reporte
+FRAMES_TRACEMALLOC = 10  # Profundidad de las pilas guardadas por tracemalloc
+
+
+class _Estadistica:
+    """Tiempos acumulados de una función."""
+
+    MAX_PENDIENTES = 1000  # Duraciones que se juntan antes de pasarlas al histograma
+
+    def __init__(self):
+        self.histograma = HistogramaLatencia()
+        self.pendientes = []
+        self.llamadas = 0
+        self.total = 0
+        self.maximo = 0
+        self.minutos = {}  # Minuto desde el inicio -> [llamadas, total, máximo]
+
+    def agregar(self, duracion, minuto):
+        self.llamadas += 1
+        self.total += duracion
+        self.maximo = max(self.maximo, duracion)
+        tramo = self.minutos.get(minuto)
+        if tramo is None:
+            self.minutos[minuto] = [1, duracion, duracion]
+        else:
+            tramo[0] += 1
+            tramo[1] += duracion
+            tramo[2] = max(tramo[2], duracion)
+        self.pendientes.append(duracion)
+        if len(self.pendientes) >= self.MAX_PENDIENTES:
+            self.volcar()
+
+    def volcar(self):
+        """Pasa las duraciones pendientes al histograma de una vez."""
+        if self.pendientes:
+            self.histograma.registrar(self.pendientes)
+            self.pendientes = []
+
+
+class Perfilador:
+    """Medición opcional de los métodos críticos de una interfaz.
+
+    Al activarse reemplaza, solo en la instancia, cada método indicado por
+    una versión cronometrada con `time.perf_counter_ns`; al desactivarse
+    los vuelve a dejar como estaban, así que sin perfil no hay costo
+    alguno. Además toma capturas de cProfile o de tracemalloc durante una
+    ventana de N segundos y escribe reportes ordenables (CSV y `.prof`).
+    """
+
+    def __init__(self, objeto, nombres, programar, prefijo="perfil"):
+        """Prepara el perfilador.
+
+        Args:
+            objeto: Instancia cuyos métodos se miden
+            nombres (list): Nombres de los métodos a medir
+            programar (callable): `programar(ms, funcion)`, p. ej. `tk.Tk.after`
+            prefijo (str): Prefijo de los archivos de reporte
+        """
+        self.objeto = objeto
+        self.nombres = list(nombres)
+        self.programar = programar
+        self.prefijo = prefijo
+        self.activo = False
+        self.inicio = time.perf_counter_ns()
+        self.estadisticas = {nombre: _Estadistica() for nombre in self.nombres}
+        self.perfil = None
+        self.memoria_inicial = None
+        self._reporte_periodico = False
+
+    def activar(self):
+        """Empieza a cronometrar los métodos."""
+        if self.activo:
+            return
+        self.activo = True
+        for nombre in self.nombres:
+            setattr(self.objeto, nombre, self._cronometrar(nombre, getattr(self.objeto, nombre)))
+
+    def desactivar(self):
+        """Deja los métodos originales; lo medido se conserva."""
+        self.activo = False
+        for nombre in self.nombres:
+            self.objeto.__dict__.pop(nombre, None)
+
+    def alternar(self):
+        """Activa o desactiva la medición (para un menú)."""
+        if self.activo:
+            self.desactivar()
+        else:
+            self.activar()
+
+    def activar_desde_entorno(self):
+        """Activa la medición si lo pide la variable de entorno.
+
+        En ese caso el reporte se reescribe cada INTERVALO_REPORTE segundos,
+        de modo que siempre haya uno reciente en disco.
+
+        Returns:
+            bool: True si se activó
+        """
+        if os.environ.get(VARIABLE_ENTORNO, "") in ("", "0"):
+            return False
+        self.activar()
+        self._reporte_periodico = True
+        self.programar(INTERVALO_REPORTE * 1000, self._reportar_periodicamente)
+        print(f"Perfil activo ({VARIABLE_ENTORNO}); reporte en {self.ruta_reporte()}")
+        return True
+
+    def _reportar_periodicamente(self):
+        if not self._reporte_periodico:
+            return
+        self.guardar_reporte()
+        self.programar(INTERVALO_REPORTE * 1000, self._reportar_periodicamente)
+
+    def _cronometrar(self, nombre, funcion):
+        estadistica = self.estadisticas[nombre]
+
+        @functools.wraps(funcion)
+        def cronometrada(*args, **kwargs):
+            # Una llamada ya programada (p. ej. con after) puede llegar
+            # después de desactivar: pasar de largo
+            if not self.activo:
+                return funcion(*args, **kwargs)
+            comienzo = time.perf_counter_ns()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                fin = time.perf_counter_ns()
+                estadistica.agregar(fin - comienzo, (fin - self.inicio) // 60_000_000_000)
+        return cronometrada
+
+    def filas_reporte(self):
+        """Filas del reporte: una total por función y una por minuto.
+
+        Returns:
+            list: Diccionarios con tiempos en ms
+        """
+        filas = []
+        for nombre, estadistica in self.estadisticas.items():
+            estadistica.volcar()
+            llamadas = estadistica.llamadas
+            filas.append({
+                "funcion": nombre, "minuto": "total", "llamadas": llamadas,
+                "total_ms": estadistica.total / 1e6,
+                "media_ms": estadistica.total / llamadas / 1e6 if llamadas else 0.0,
+                "p50_ms": estadistica.histograma.percentil(50) / 1e6,
+                "p95_ms": estadistica.histograma.percentil(95) / 1e6,
+                "p99_ms": estadistica.histograma.percentil(99) / 1e6,
+                "max_ms": estadistica.maximo / 1e6,
+            })
+            # La evolución por minuto muestra qué llamada se vuelve lenta con el tiempo
+            for minuto, (cantidad, total, maximo) in sorted(estadistica.minutos.items()):
+                filas.append({
+                    "funcion": nombre, "minuto": minuto, "llamadas": cantidad,
+                    "total_ms": total / 1e6, "media_ms": total / cantidad / 1e6,
+                    "p50_ms": "", "p95_ms": "", "p99_ms": "", "max_ms": maximo / 1e6,
+                })
+        return filas
+
+    def ruta_reporte(self):
+        return f"{self.prefijo}_{os.getpid()}.csv"
+
+    def guardar_reporte(self, ruta=None):
+        """Escribe el reporte de tiempos en CSV.
+
+        Args:
+            ruta (str): Archivo de salida (por defecto `ruta_reporte()`)
+
+        Returns:
+            str: Ruta escrita
+        """
+        ruta = ruta or self.ruta_reporte()
+        filas = self.filas_reporte()
+        with open(ruta, "w", newline="") as archivo:
+            escritor = csv.DictWriter(archivo, fieldnames=["funcion", "minuto", "llamadas", "total_ms",
+                                                           "media_ms", "p50_ms", "p95_ms", "p99_ms",
+                                                           "max_ms"])
+            escritor.writeheader()
+            escritor.writerows(filas)
+        return ruta
+
+    def capturar_cprofile(self, segundos=SEGUNDOS_CAPTURA, al_terminar=None):
+        """Perfila con cProfile el hilo actual durante `segundos`.
+
+        Al terminar escribe `<prefijo>_cprofile_<fecha>.prof` (se puede
+        ordenar por cualquier columna con `pstats`) y un `.txt` ordenado por
+        tiempo acumulado.
+
+        Args:
+            segundos (float): Duración de la captura
+            al_terminar (callable): Recibe la ruta del `.txt` al finalizar
+        """
+        if self.perfil is not None:
+            return
+        self.perfil = cProfile.Profile()
+        self.perfil.enable()
+
+        def terminar():
+            self.perfil.disable()
+            base = time.strftime(f"{self.prefijo}_cprofile_%Y%m%d_%H%M%S")
+            self.perfil.dump_stats(f"{base}.prof")
+            texto = io.StringIO()
+            pstats.Stats(self.perfil, stream=texto).sort_stats("cumulative").print_stats(60)
+            with open(f"{base}.txt", "w") as archivo:
+                archivo.write(texto.getvalue())
+            self.perfil = None
+            if al_terminar:
+                al_terminar(f"{base}.txt")
+        self.programar(int(segundos * 1000), terminar)
+
+    def capturar_tracemalloc(self, segundos=SEGUNDOS_CAPTURA, al_terminar=None):
+        """Mide con tracemalloc cuánta memoria crece durante `segundos`.
+
+        Escribe `<prefijo>_tracemalloc_<fecha>.txt` con las líneas de código
+        cuyas asignaciones vivas más crecieron en la ventana.
+
+        Args:
+            segundos (float): Duración de la captura
+            al_terminar (callable): Recibe la ruta del reporte al finalizar
+        """
+        if self.memoria_inicial is not None:
+            return
+        iniciado_aqui = not tracemalloc.is_tracing()
+        if iniciado_aqui:
+            tracemalloc.start(FRAMES_TRACEMALLOC)
+        self.memoria_inicial = tracemalloc.take_snapshot()
+
+        def terminar():
+            final = tracemalloc.take_snapshot()
+            diferencias = final.compare_to(self.memoria_inicial, "lineno")
+            actual, pico = tracemalloc.get_traced_memory()
+            if iniciado_aqui:
+                tracemalloc.stop()
+            self.memoria_inicial = None
+            ruta = time.strftime(f"{self.prefijo}_tracemalloc_%Y%m%d_%H%M%S.txt")
+            with open(ruta, "w") as archivo:
+                archivo.write(f"Ventana: {segundos} s | Memoria trazada: {actual / 1e6:.1f} MB "
+                              f"| Pico: {pico / 1e6:.1f} MB\n")
+                archivo.write("Crecimiento por línea (mayor primero):\n")
+                for diferencia in diferencias[:LINEAS_TRACEMALLOC]:
+                    archivo.write(f"{diferencia}\n")
+            if al_terminar:
+                al_terminar(ruta)
+        self.programar(int(segundos * 1000), terminar)
+
+
+def agregar_menu_perfil(ventana, perfilador):
+    """Agrega a una ventana de Tk el menú "Perfil".
+
+    Args:
+        ventana (tk.Tk): Ventana principal
+        perfilador (Perfilador): Perfilador de la ventana
+    """
+    import tkinter as tk
+    from tkinter import messagebox, simpledialog
+
+    def informar(ruta):
+        messagebox.showinfo("Perfil", f"Reporte guardado en {os.path.abspath(ruta)}")
+
+    def pedir_segundos():
+        return simpledialog.askinteger("Perfil", "Segundos de captura:", parent=ventana,
+                                       initialvalue=SEGUNDOS_CAPTURA, minvalue=1)
+
+    def capturar(metodo):
+        segundos = pedir_segundos()
+        if segundos:
+            metodo(segundos, informar)
+
+    medir_var = tk.BooleanVar(value=perfilador.activo)
+    menu = tk.Menu(ventana, tearoff=0)
+    menu.add_checkbutton(label="Medir funciones", variable=medir_var,
+                         command=perfilador.alternar)
+    menu.add_command(label="Guardar reporte de tiempos",
+                     command=lambda: informar(perfilador.guardar_reporte()))
+    menu.add_separator()
+    menu.add_command(label="Capturar cProfile...",
+                     command=lambda: capturar(perfilador.capturar_cprofile))
+    menu.add_command(label="Capturar tracemalloc...",
+                     command=lambda: capturar(perfilador.capturar_tracemalloc))
+
+    barra = tk.Menu(ventana)
+    barra.add_cascade(label="Perfil", menu=menu)
+    ventana.config(menu=barra)
@@ -0,0 +1,184 @@
+import numpy as np
+
+
+class _NivelMinMax:
+    """Nivel de la pirámide: un bloque (tiempo inicial, mínimo, máximo) por
+    cada `tamano_bloque` muestras, en un anillo con escritura doble igual
+    que `BufferCircular`."""
+
+    def __init__(self, tamano_bloque, capacidad):
+        self.tamano_bloque = tamano_bloque
+        self.capacidad = capacidad
+        self.tiempos = np.zeros(2 * capacidad, dtype=np.float64)
+        self.minimos = np.zeros(2 * capacidad, dtype=np.float64)
+        self.maximos = np.zeros(2 * capacidad, dtype=np.float64)
+        self.completos = 0  # Bloques cerrados desde el inicio
+        self._escritura = 0
+
+    def extender(self, tiempos, minimos, maximos):
+        n = min(tiempos.size, self.capacidad)
+        posiciones = (self._escritura + np.arange(n)) % self.capacidad
+        for datos, bloque in ((self.tiempos, tiempos), (self.minimos, minimos),
+                              (self.maximos, maximos)):
+            datos[posiciones] = bloque[-n:]
+            datos[posiciones + self.capacidad] = bloque[-n:]
+        self._escritura = (self._escritura + n) % self.capacidad
+        self.completos += tiempos.size
+
+    def ultimos(self, n):
+        n = min(n, self.completos, self.capacidad)
+        fin = self._escritura + self.capacidad
+        return (self.tiempos[fin - n:fin], self.minimos[fin - n:fin],
+                self.maximos[fin - n:fin])
+
+
+class PiramideMinMax:
+    """Pirámide de decimación mínimo/máximo sobre un `BufferCircular`.
+
+    Cada nivel resume `factor` bloques del nivel anterior guardando su
+    mínimo y su máximo, de modo que un pico de una sola muestra sobrevive
+    en todos los niveles. Se construye de forma incremental con
+    `actualizar()` después de agregar muestras, y `consultar()` devuelve
+    como máximo unos dos puntos por píxel para cualquier rango de tiempo.
+
+    Cada nivel conserva al menos BLOQUES_NIVEL bloques, así que los niveles
+    gruesos abarcan mucho más que el historial crudo: con `cobertura` se
+    agregan niveles hasta resumir esa cantidad de muestras, y las muestras
+    que el historial ya descartó se siguen viendo decimadas.
+    """
+
+    FACTOR = 4  # Bloques del nivel anterior que resume cada bloque
+    BLOQUES_NIVEL = 1 << 14  # Bloques conservados como mínimo por nivel (~0,8 MB)
+
+    def __init__(self, buffer, factor=None, cobertura=None):
+        """Crea los niveles necesarios para cubrir el historial y la cobertura.
+
+        Args:
+            buffer (BufferCircular): Historial de muestras a resumir
+            factor (int): Reducción entre niveles consecutivos
+            cobertura (int): Muestras que deben seguir visibles, decimadas,
+                en el nivel más grueso (por defecto la capacidad del historial)
+        """
+        self.buffer = buffer
+        self.factor = int(factor or self.FACTOR)
+        cobertura = max(int(cobertura or 0), buffer.capacidad)
+        self.niveles = []
+        tamano = self.factor
+        # Hasta que un bloque abarque todo el historial crudo y el nivel más
+        # grueso conserve la cobertura
+        while True:
+            capacidad = max(buffer.capacidad // tamano + 1, self.BLOQUES_NIVEL)
+            self.niveles.append(_NivelMinMax(tamano, capacidad))
+            cubiertas = tamano * capacidad
+            tamano *= self.factor
+            if tamano >= buffer.capacidad and cubiertas >= cobertura:
+                break
+        self.limpiar()
+
+    def limpiar(self):
+        """Descarta los resúmenes (por ejemplo tras limpiar el historial)."""
+        self.procesadas = 0
+        for nivel in self.niveles:
+            nivel.completos = 0
+            nivel._escritura = 0
+
+    def actualizar(self):
+        """Resume las muestras agregadas al historial desde la última llamada."""
+        total = self.buffer.total
+        if total < self.procesadas:
+            self.limpiar()
+        if not self.niveles:
+            return
+
+        # Nivel 1 desde las muestras crudas
+        primero = self.niveles[0]
+        self._avanzar(primero, total, len(self.buffer), self._leer_muestras)
+        self.procesadas = total
+
+        # Niveles superiores desde el nivel anterior
+        for anterior, nivel in zip(self.niveles, self.niveles[1:]):
+            self._avanzar(nivel, anterior.completos,
+                          min(anterior.completos, anterior.capacidad), anterior.ultimos)
+
+    @property
+    def primer_tiempo(self):
+        """Tiempo más antiguo que todavía se puede consultar (crudo o decimado)."""
+        primero = self.buffer.primer_tiempo
+        for nivel in self.niveles:
+            if nivel.completos:
+                primero = min(primero, nivel.ultimos(nivel.capacidad)[0][0])
+        return primero
+
+    def _leer_muestras(self, n):
+        """Últimas n muestras crudas como bloques de una muestra."""
+        tiempos, valores = self.buffer.ultimos(n)
+        return tiempos, valores, valores
+
+    def _avanzar(self, nivel, disponibles, conservados, leer):
+        """Cierra los bloques del nivel que ya tienen todos sus elementos.
+
+        Args:
+            nivel (_NivelMinMax): Nivel a completar
+            disponibles (int): Elementos del nivel inferior desde el inicio
+            conservados (int): Elementos del nivel inferior que siguen guardados
+            leer (callable): Devuelve (tiempos, mínimos, máximos) de los últimos n
+        """
+        grupo = nivel.tamano_bloque if nivel is self.niveles[0] else self.factor
+        bloques = disponibles // grupo
+        if bloques <= nivel.completos:
+            return
+        # Si el historial ya sobrescribió elementos, saltar al primer bloque entero
+        desde = max(nivel.completos * grupo, disponibles - conservados)
+        desde += -desde % grupo
+        nivel.completos = max(nivel.completos, desde // grupo)
+        cantidad = bloques * grupo - desde
+        if cantidad <= 0:
+            return
+        tiempos, minimos, maximos = leer(disponibles - desde)
+        nivel.extender(tiempos[:cantidad:grupo],
+                       minimos[:cantidad].reshape(-1, grupo).min(axis=1),
+                       maximos[:cantidad].reshape(-1, grupo).max(axis=1))
+
+    def consultar(self, t_inicio, t_fin, ancho_pixeles):
+        """Puntos a dibujar para un rango de tiempo.
+
+        Args:
+            t_inicio (float): Tiempo inicial en ms
+            t_fin (float): Tiempo final en ms
+            ancho_pixeles (int): Ancho del gráfico en píxeles
+
+        Returns:
+            tuple: (tiempos, voltajes) con a lo sumo ~2 puntos por píxel
+        """
+        ancho_pixeles = max(1, int(ancho_pixeles))
+        tiempos, valores = self.buffer.ventana(t_inicio, t_fin)
+        crudo_completo = len(self.buffer) == 0 or self.buffer.primer_tiempo <= t_inicio
+        if (crudo_completo or not self.niveles) and tiempos.size <= 2 * ancho_pixeles:
+            return tiempos, valores
+
+        # Nivel más fino que conserva el comienzo del rango y cuyos bloques
+        # en el rango caben en el ancho; si ninguno, el más grueso
+        for nivel in self.niveles:
+            t_bloques, minimos, maximos = nivel.ultimos(nivel.capacidad)
+            a = max(0, np.searchsorted(t_bloques, t_inicio, side='right') - 1)
+            b = np.searchsorted(t_bloques, t_fin, side='right')
+            # Un nivel que nunca se llenó conserva todo desde el comienzo
+            completo = nivel.completos <= nivel.capacidad or t_bloques[0] <= t_inicio
+            if b - a <= ancho_pixeles and completo:
+                break
+        t_bloques, minimos, maximos = t_bloques[a:b], minimos[a:b], maximos[a:b]
+
+        # Muestras recientes que todavía no completan un bloque de este nivel
+        pendientes = min(self.buffer.total - nivel.completos * nivel.tamano_bloque, len(self.buffer))
+        if pendientes > 0:
+            t_cola, v_cola = self.buffer.ultimos(pendientes)
+            visibles = (t_cola >= t_inicio) & (t_cola <= t_fin)
+            if visibles.any():
+                t_bloques = np.append(t_bloques, t_cola[visibles][0])
+                minimos = np.append(minimos, v_cola[visibles].min())
+                maximos = np.append(maximos, v_cola[visibles].max())
+
+        # Cada bloque se dibuja como un segmento vertical de su mínimo a su máximo
+        x = np.repeat(t_bloques, 2)
+        y = np.column_stack((minimos, maximos)).ravel()
+        return x, y
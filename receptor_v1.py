@@ -1,13 +1,22 @@
 import serial
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
+import sys
 import time
+from encuadre_uart import obtener_encuadre
+from lector_serial import LectorSerial
+from parser_flujo import SeparadorLineas
+from transporte import abrir_transporte
+
+FRECUENCIA_REFRESCO = 30  # Hz a los que se redibuja la gráfica
 
 
 try:
-    # Configurar el puerto serial virtual
-    ser = serial.Serial('/tmp/ttyS2', 9600, timeout=1)
-    print("Receptor conectado al puerto virtual /tmp/ttyS2")
+    # Configurar el puerto serial virtual (o el indicado, p. ej. pty:// o servidor://)
+    puerto = sys.argv[1] if len(sys.argv) > 1 else '/tmp/ttyS2'
+    # Con el encuadre predeterminado, el mismo que usan el transmisor y el analizador
+    ser = abrir_transporte(puerto, 9600, timeout=1, **obtener_encuadre().opciones_serial())
+    print(f"Receptor conectado al puerto virtual {ser.port}")
 
 
     # Configurar la gráfica
@@ -20,19 +29,27 @@ try:
     ax.set_ylabel("Mensajes")
 
 
-    # Recibir y graficar datos en tiempo real
+    # El hilo lector es dueño del puerto y entrega líneas completas
+    lector = LectorSerial(ser, SeparadorLineas().alimentar)
+    lector.start()
+
+
+    # Graficar a frecuencia fija lo que haya recibido el lector
     while True:
-        if ser.in_waiting > 0:
-            mensaje = ser.readline().decode().strip()
+        mensajes = lector.drenar()
+        for mensaje in mensajes:
             print(f"Recibido: {mensaje}")
             datos.append(mensaje)
+        if lector.error is not None:
+            raise lector.error
             
+        if mensajes:
             # Actualizar gráfica
             linea.set_data(range(len(datos)), [i for i in range(len(datos))])
             ax.relim()
             ax.autoscale_view()
             plt.draw()
-            plt.pause(0.1)
+        plt.pause(1 / FRECUENCIA_REFRESCO)
 
 
 except serial.SerialException as e:
@@ -42,7 +59,9 @@ except KeyboardInterrupt:
 except Exception as e:
     print(f"Error: {e}")
 finally:
-    # Cerrar el puerto serial si está abierto
+    # Detener el lector y cerrar el puerto serial si está abierto
+    if 'lector' in locals():
+        lector.detener()
     if 'ser' in locals() and ser.is_open:
         ser.close()
         print("Puerto serial cerrado")
@@ -0,0 +1,252 @@
+import argparse
+import sys
+import threading
+import time
+from collections import deque
+
+import serial
+
+from encuadre_uart import ENCUADRE_PREDETERMINADO, obtener_encuadre
+from lector_serial import LectorSerial
+from parser_flujo import ParserFlujo, SeparadorLineas
+from transporte import abrir_transporte
+
+MODOS = ["registros", "lineas"]  # Registros <TRAMA:...> (texto o binario) o líneas de texto libres
+
+
+class ContadorDeslizante:
+    """Mensajes y bytes por segundo sobre una ventana deslizante.
+
+    Guarda un casillero por segundo en un anillo de tamaño fijo, así que la
+    memoria no depende del tiempo que lleve corriendo ni del tráfico.
+    """
+
+    def __init__(self, ventana=10):
+        """Args:
+            ventana (int): Segundos que abarca la tasa
+        """
+        self.ventana = ventana
+        self.casilleros = deque(maxlen=ventana + 1)  # [segundo, mensajes, bytes]
+        self._candado = threading.Lock()
+
+    def agregar(self, mensajes, cantidad_bytes, ahora=None):
+        segundo = int(time.monotonic() if ahora is None else ahora)
+        with self._candado:
+            if self.casilleros and self.casilleros[-1][0] == segundo:
+                casillero = self.casilleros[-1]
+                casillero[1] += mensajes
+                casillero[2] += cantidad_bytes
+            else:
+                self.casilleros.append([segundo, mensajes, cantidad_bytes])
+
+    def tasas(self, ahora=None):
+        """Mensajes/s y bytes/s de los últimos `ventana` segundos completos.
+
+        Returns:
+            tuple: (mensajes por segundo, bytes por segundo)
+        """
+        segundo = int(time.monotonic() if ahora is None else ahora)
+        with self._candado:
+            # El segundo en curso todavía no terminó: no se cuenta
+            elegidos = [c for c in self.casilleros if segundo - self.ventana <= c[0] < segundo]
+        return (sum(c[1] for c in elegidos) / self.ventana,
+                sum(c[2] for c in elegidos) / self.ventana)
+
+    def por_segundo(self, ahora=None):
+        """Mensajes de cada uno de los últimos `ventana` segundos completos (0 si no hubo)."""
+        segundo = int(time.monotonic() if ahora is None else ahora)
+        with self._candado:
+            cuentas = {c[0]: c[1] for c in self.casilleros}
+        return [cuentas.get(s, 0) for s in range(segundo - self.ventana, segundo)]
+
+
+class EstadisticasRecepcion:
+    """Contadores del receptor, actualizados desde el hilo lector.
+
+    La función `parsear` reemplaza a la del parser en el `LectorSerial`:
+    procesa cada bloque, actualiza los contadores y no encola nada, de modo
+    que el hilo principal no necesita despertar para vaciar una cola.
+    """
+
+    def __init__(self, modo="registros", ventana=10, puntos=1000, encuadre=None):
+        """Args:
+            modo (str): Uno de MODOS
+            ventana (int): Segundos de la ventana de las tasas
+            puntos (int): Voltajes recientes que se conservan para la gráfica
+            encuadre (Encuadre): Encuadre de las tramas, o su nombre (por defecto 8O1)
+        """
+        self.modo = modo
+        self.parser = ParserFlujo(encuadre) if modo == "registros" else SeparadorLineas()
+        self.contador = ContadorDeslizante(ventana)
+        self.recientes = deque(maxlen=puntos)  # Voltajes recientes (modo registros)
+        self.mensajes = 0
+        self.bytes = 0
+        self.ultimo = None  # Último mensaje recibido
+        self.ultima_llegada = None  # time.monotonic() del último mensaje
+
+    def parsear(self, datos):
+        mensajes = self.parser.alimentar(datos)
+        ahora = time.monotonic()
+        self.bytes += len(datos)
+        self.contador.agregar(len(mensajes), len(datos), ahora)
+        if mensajes:
+            self.mensajes += len(mensajes)
+            self.ultimo = mensajes[-1]
+            self.ultima_llegada = ahora
+            if self.modo == "registros":
+                self.recientes.extend(valor for _, valor in mensajes[-self.recientes.maxlen:])
+        return []
+
+    @property
+    def errores(self):
+        return getattr(self.parser, "errores", 0)
+
+    def resumen(self):
+        """Línea de resumen para imprimir periódicamente."""
+        mensajes_s, bytes_s = self.contador.tasas()
+        texto = (f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] Mensajes: {self.mensajes} ({mensajes_s:.1f}/s) "
+                 f"| Bytes: {self.bytes} ({bytes_s:.0f} B/s) | Errores: {self.errores} "
+                 f"| Bytes descartados: {self.parser.bytes_descartados}")
+        if self.ultima_llegada is None:
+            return texto + " | Sin datos"
+        silencio = time.monotonic() - self.ultima_llegada
+        if self.modo == "registros":
+            texto += f" | Último: {self.ultimo[1]:.2f}V"
+        else:
+            texto += f" | Último: {self.ultimo[:40]!r}"
+        if silencio >= self.contador.ventana:
+            texto += f" | Sin datos hace {silencio:.0f} s"
+        return texto
+
+
+class GraficaRecepcion:
+    """Gráfica opcional limitada en frecuencia y en cantidad de puntos.
+
+    Dibuja los mensajes por segundo de la ventana y, en modo registros, los
+    últimos voltajes; cada refresco cuesta lo mismo sin importar cuánto
+    tiempo lleve corriendo el receptor.
+    """
+
+    def __init__(self, estadisticas):
+        import matplotlib.pyplot as plt
+        self.plt = plt
+        self.estadisticas = estadisticas
+        plt.ion()
+        filas = 2 if estadisticas.modo == "registros" else 1
+        self.fig, ejes = plt.subplots(filas, 1, squeeze=False)
+        self.ax_tasa = ejes[0][0]
+        self.ax_tasa.set_title("Datos recibidos por RS-232")
+        self.ax_tasa.set_ylabel("Mensajes/s")
+        self.linea_tasa, = self.ax_tasa.plot([], [], 'b-')
+        self.linea_voltaje = None
+        if filas == 2:
+            self.ax_voltaje = ejes[1][0]
+            self.ax_voltaje.set_ylabel("Voltaje (V)")
+            self.ax_voltaje.set_ylim(-12, 12)
+            self.linea_voltaje, = self.ax_voltaje.plot([], [], 'g-')
+
+    def actualizar(self):
+        cuentas = self.estadisticas.contador.por_segundo()
+        self.linea_tasa.set_data(range(-len(cuentas), 0), cuentas)
+        self.ax_tasa.set_xlim(-len(cuentas), 0)
+        self.ax_tasa.set_ylim(0, max(cuentas + [1]) * 1.1)
+        if self.linea_voltaje is not None:
+            voltajes = list(self.estadisticas.recientes)
+            self.linea_voltaje.set_data(range(len(voltajes)), voltajes)
+            self.ax_voltaje.set_xlim(0, max(1, self.estadisticas.recientes.maxlen))
+        self.fig.canvas.draw_idle()
+
+    def esperar(self, segundos):
+        """Atiende la ventana durante `segundos` (reemplaza a `time.sleep`)."""
+        self.plt.pause(segundos)
+
+    def cerrar(self):
+        self.plt.ioff()
+        self.plt.close('all')
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Receptor RS-232 sin interfaz gráfica, con memoria acotada y resúmenes periódicos")
+    parser.add_argument("puerto", nargs="?", default="/tmp/ttyS2",
+                        help="Puerto o URL (COM7, /dev/ttyS1, pty://, servidor://host:puerto...)")
+    parser.add_argument("-b", "--baudios", type=int, default=9600, help="Velocidad de la línea")
+    parser.add_argument("-e", "--encuadre", default=ENCUADRE_PREDETERMINADO,
+                        help="Bits de datos, paridad (N/E/O/M/S) y parada de la línea, p. ej. 8N1")
+    parser.add_argument("-m", "--modo", choices=MODOS, default=MODOS[0],
+                        help="Registros del transmisor o líneas de texto libres")
+    parser.add_argument("-i", "--intervalo", type=float, default=10.0,
+                        help="Segundos entre resúmenes")
+    parser.add_argument("-w", "--ventana", type=int, default=10,
+                        help="Segundos de la ventana de las tasas")
+    parser.add_argument("-d", "--duracion", type=float, help="Terminar tras N segundos")
+    parser.add_argument("-g", "--grafica", action="store_true", help="Mostrar una gráfica")
+    parser.add_argument("--hz", type=float, default=2.0, help="Refrescos por segundo de la gráfica")
+    parser.add_argument("--puntos", type=int, default=1000,
+                        help="Voltajes recientes que se grafican")
+    argumentos = parser.parse_args(argumentos)
+    if argumentos.ventana < 1 or argumentos.intervalo <= 0 or argumentos.hz <= 0:
+        print("Error de configuración: la ventana, el intervalo y --hz deben ser positivos")
+        return 1
+
+    try:
+        encuadre = obtener_encuadre(argumentos.encuadre)
+    except ValueError as e:
+        print(f"Error de configuración: {e}")
+        return 1
+
+    try:
+        # La línea usa la misma paridad y bits de parada que el transmisor
+        ser = abrir_transporte(argumentos.puerto, argumentos.baudios, timeout=1,
+                               **encuadre.opciones_serial())
+    except serial.SerialException as e:
+        print(f"Error al abrir el puerto serial: {e}")
+        return 1
+    print(f"Receptor conectado a {ser.port}", flush=True)
+
+    estadisticas = EstadisticasRecepcion(argumentos.modo, argumentos.ventana, argumentos.puntos,
+                                         encuadre)
+    grafica = GraficaRecepcion(estadisticas) if argumentos.grafica else None
+    # El hilo lector bloquea en cada lectura hasta que llegan datos o vence
+    # el timeout; el hilo principal solo despierta para resumir o graficar
+    lector = LectorSerial(ser, estadisticas.parsear)
+    lector.start()
+
+    inicio = time.monotonic()
+    proximo_resumen = inicio + argumentos.intervalo
+    proxima_grafica = inicio
+    try:
+        while lector.is_alive():
+            ahora = time.monotonic()
+            if argumentos.duracion is not None and ahora - inicio >= argumentos.duracion:
+                break
+            if ahora >= proximo_resumen:
+                print(estadisticas.resumen(), flush=True)
+                proximo_resumen += argumentos.intervalo
+            if grafica is not None and ahora >= proxima_grafica:
+                grafica.actualizar()
+                proxima_grafica = ahora + 1 / argumentos.hz
+
+            siguiente = proximo_resumen if grafica is None else min(proximo_resumen, proxima_grafica)
+            if argumentos.duracion is not None:
+                siguiente = min(siguiente, inicio + argumentos.duracion)
+            espera = max(0.0, siguiente - time.monotonic())
+            if grafica is not None:
+                grafica.esperar(max(espera, 0.001))
+            else:
+                lector.join(espera)
+        if lector.error is not None:
+            print(f"Error de comunicación serial: {lector.error}")
+    except KeyboardInterrupt:
+        print("\nRecepción terminada por el usuario")
+    finally:
+        lector.detener()
+        print(estadisticas.resumen())
+        print("Puerto serial cerrado")
+        if grafica is not None:
+            grafica.cerrar()
+    return 0 if lector.error is None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import numpy as np
+
+
+class RenderizadorSenal:
+    """Renderizador de la forma de onda con blitting de Agg.
+
+    Crea una sola vez los ejes, las líneas de referencia y la línea de la
+    señal. En cada actualización solo cambia los datos de la línea,
+    restaura el fondo cacheado y dibuja ese artista. El eje X muestra el
+    tiempo relativo al inicio de la ventana visible, con límites fijos
+    (0, ancho): la señal en vivo avanza sin tocar los límites y el
+    redibujado completo queda para cuando cambia el ancho (zoom) o la
+    ventana. El tiempo absoluto del inicio se muestra en un texto que
+    también se dibuja aparte.
+    """
+
+    LIMITES_Y = (-13, 13)
+    TOLERANCIA_ANCHO = 1e-6  # Cambio relativo del ancho que obliga a redibujar
+
+    def __init__(self, ax, canvas, titulo="Análisis de Señal RS-232"):
+        """Configura los artistas del gráfico.
+
+        Args:
+            ax (matplotlib.axes.Axes): Ejes sobre los que se dibuja
+            canvas (FigureCanvasAgg): Canvas de la figura (Agg o TkAgg)
+            titulo (str): Título del gráfico
+        """
+        self.ax = ax
+        self.canvas = canvas
+        self.fondo = None
+        self.redibujados = 0
+        self.blits = 0
+
+        # Configurar gráfico una sola vez
+        ax.set_title(titulo)
+        ax.set_ylabel("Voltaje (V)")
+        ax.set_xlabel("Tiempo desde el inicio de la ventana (ms)")
+        ax.grid(True)
+        ax.set_ylim(*self.LIMITES_Y)
+
+        # Líneas de referencia
+        ax.axhline(y=12, color='g', linestyle=':', alpha=0.5)
+        ax.axhline(y=-12, color='r', linestyle=':', alpha=0.5)
+        ax.axhline(y=0, color='gray', linestyle=':', alpha=0.3)
+
+        # La señal se excluye del fondo y se dibuja aparte
+        self.linea, = ax.plot([], [], 'b-', linewidth=2, animated=True)
+        self.texto_inicio = ax.text(0.01, 0.97, "", transform=ax.transAxes,
+                                    va="top", fontsize=9, animated=True)
+
+        # Cada dibujado completo (incluido el de un cambio de tamaño) renueva el fondo
+        self._conexion = canvas.mpl_connect('draw_event', self._al_dibujar)
+
+    def _al_dibujar(self, evento):
+        """Guarda el fondo tras un dibujado completo y repone la señal."""
+        self.fondo = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._dibujar_animados()
+
+    def _dibujar_animados(self):
+        """Dibuja los artistas que no forman parte del fondo."""
+        self.ax.draw_artist(self.linea)
+        self.ax.draw_artist(self.texto_inicio)
+
+    def _ajustar_limites(self, ancho):
+        """Fija el eje X en (0, ancho) si cambió el ancho de la ventana.
+
+        Returns:
+            bool: True si cambiaron los límites
+        """
+        ancho = max(ancho, 1e-9)
+        x_min, x_max = self.ax.get_xlim()
+        if x_min == 0 and abs(x_max - ancho) <= ancho * self.TOLERANCIA_ANCHO:
+            return False
+        self.ax.set_xlim(0, ancho)
+        return True
+
+    def redibujar(self):
+        """Dibujado completo de la figura; renueva el fondo cacheado."""
+        self.redibujados += 1
+        self.canvas.draw()
+
+    def actualizar(self, x_data, y_data, inicio=None, ancho=None):
+        """Actualiza la señal mostrada.
+
+        Args:
+            x_data (array_like): Tiempos de las muestras en ms
+            y_data (array_like): Voltajes de las muestras
+            inicio (float): Tiempo del inicio de la ventana visible en ms;
+                None para el de la primera muestra
+            ancho (float): Ancho de la ventana visible en ms; None para el
+                que ocupan las muestras
+        """
+        x_data = np.asarray(x_data, dtype=np.float64)
+        if inicio is None:
+            inicio = x_data[0] if x_data.size else 0.0
+        if ancho is None:
+            ancho = x_data[-1] - inicio if x_data.size else 1.0
+        self.linea.set_data(x_data - inicio, y_data)
+        self.texto_inicio.set_text(f"Inicio: {inicio:.3f} ms")
+
+        if self._ajustar_limites(ancho) or self.fondo is None:
+            self.redibujar()
+            return
+        self.blits += 1
+        self.canvas.restore_region(self.fondo)
+        self._dibujar_animados()
+        self.canvas.blit(self.ax.bbox)
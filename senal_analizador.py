@@ -0,0 +1,78 @@
+from buffer_circular import BufferCircular
+from piramide_lod import PiramideMinMax
+from sintesis_senal import SintetizadorSenal, tramas_a_bits
+
+
+class SenalAnalizador:
+    """Señal que dibuja el analizador, sin interfaz gráfica.
+
+    Reúne el historial circular, el sintetizador y la pirámide min/max, y
+    hace el trabajo de cada refresco: sintetizar las tramas recibidas y
+    elegir los puntos de la ventana visible. La usan `AnalizadorProtocolo`
+    y `benchmark_pipeline.py`, de modo que el benchmark mide el mismo
+    código que la interfaz.
+    """
+
+    EN_VIVO = 100  # Posición del historial que sigue a la última muestra
+
+    def __init__(self, capacidad, sobremuestreo, semilla=None, cobertura=None):
+        """Reserva el historial y arma la pirámide.
+
+        Args:
+            capacidad (int): Muestras crudas conservadas
+            sobremuestreo (int): Muestras sintetizadas por bit
+            semilla (int): Semilla del ruido de la señal
+            cobertura (int): Muestras que la pirámide conserva decimadas
+        """
+        self.historial = BufferCircular(capacidad)
+        self.sintetizador = SintetizadorSenal(sobremuestreo, semilla)
+        self.piramide = PiramideMinMax(self.historial, cobertura=cobertura)
+
+    def limpiar(self):
+        """Descarta el historial y sus resúmenes."""
+        self.historial.limpiar()
+        self.piramide.limpiar()
+
+    def agregar(self, tramas, voltajes, encuadre, tiempo_bit):
+        """Sintetiza un lote de tramas y lo agrega al historial.
+
+        Una trama de otro encuadre (configuración que no coincide) no entra
+        en la matriz de bits: se omite y no se dibuja.
+
+        Args:
+            tramas (list): Tramas a representar, como cadenas de bits
+            voltajes (list): Voltaje de cada trama
+            encuadre (Encuadre): Encuadre configurado en el analizador
+            tiempo_bit (float): Duración de un bit en ms
+        """
+        if set(map(len, tramas)) != {encuadre.largo}:
+            pares = [(t, v) for t, v in zip(tramas, voltajes) if len(t) == encuadre.largo]
+            if not pares:
+                return
+            tramas, voltajes = zip(*pares)
+        # Varios puntos por bit para mostrar transiciones, en una sola operación
+        muestras = self.sintetizador.generar(tramas_a_bits(tramas), voltajes)
+        tiempos = self.sintetizador.tiempos(self.historial.total, muestras.size, tiempo_bit)
+
+        # El historial circular descarta solo las muestras más antiguas
+        self.historial.extender(tiempos, muestras)
+        self.piramide.actualizar()
+
+    def ventana(self, ancho, posicion, ancho_pixeles):
+        """Puntos de la ventana visible.
+
+        Args:
+            ancho (float): Tiempo visible en ms (zoom)
+            posicion (float): EN_VIVO sigue a la última muestra; valores
+                menores retroceden proporcionalmente en el historial
+            ancho_pixeles (int): Ancho del gráfico en píxeles
+
+        Returns:
+            tuple: (tiempos, voltajes) decimados a unos dos puntos por píxel,
+                inicio y ancho de la ventana en ms
+        """
+        inicio, fin = self.piramide.primer_tiempo, self.historial.ultimo_tiempo
+        if posicion < self.EN_VIVO:
+            fin = max(inicio + ancho, inicio + (fin - inicio) * posicion / self.EN_VIVO)
+        x, y = self.piramide.consultar(fin - ancho, fin, ancho_pixeles)
+        return x, y, fin - ancho, ancho
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+def tramas_a_bits(tramas):
+    """Convierte tramas de texto '0'/'1' en una matriz de bits.
+
+    Args:
+        tramas (list): Tramas de igual largo en texto
+
+    Returns:
+        np.ndarray: Matriz (N, bits por trama) de uint8
+    """
+    if len(tramas) == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+    texto = "".join(tramas).encode()
+    return (np.frombuffer(texto, dtype=np.uint8) - ord('0')).reshape(len(tramas), -1)
+
+
+class SintetizadorSenal:
+    """Sintetizador vectorizado de la señal sobremuestreada de las tramas.
+
+    Cada bit se representa con `sobremuestreo` muestras: los '1' con el
+    voltaje de la trama y los '0' con el voltaje invertido, más ruido
+    uniforme de un `numpy.random.Generator` con semilla, para que la
+    señal sea reproducible.
+    """
+
+    SOBREMUESTREO = 10  # Muestras por bit
+    AMPLITUD_RUIDO = 0.2  # V; menos ruido para mejor visualización
+
+    def __init__(self, sobremuestreo=None, semilla=None, amplitud_ruido=None):
+        """Configura el sintetizador.
+
+        Args:
+            sobremuestreo (int): Muestras por bit
+            semilla (int): Semilla del generador de ruido
+            amplitud_ruido (float): Amplitud máxima del ruido en V
+        """
+        self.sobremuestreo = int(sobremuestreo or self.SOBREMUESTREO)
+        self.amplitud_ruido = self.AMPLITUD_RUIDO if amplitud_ruido is None else amplitud_ruido
+        self.generador = np.random.default_rng(semilla)
+
+    def generar(self, bits, voltajes):
+        """Genera de una vez las muestras de un lote de tramas.
+
+        Args:
+            bits (np.ndarray): Matriz (N, bits por trama) de 0/1
+            voltajes (array_like): Voltaje de cada trama
+
+        Returns:
+            np.ndarray: N * bits por trama * sobremuestreo muestras
+        """
+        bits = np.asarray(bits, dtype=np.uint8)
+        voltajes = np.asarray(voltajes, dtype=np.float64).reshape(-1, 1)
+
+        # Nivel de cada bit: +V para '1', -V para '0'
+        niveles = np.where(bits == 1, voltajes, -voltajes)
+        muestras = np.repeat(niveles.ravel(), self.sobremuestreo)
+
+        # Agregar ruido a la señal para hacerla más realista
+        if self.amplitud_ruido:
+            muestras += self.generador.uniform(-self.amplitud_ruido, self.amplitud_ruido,
+                                               muestras.size)
+        return muestras
+
+    def tiempos(self, primera_muestra, cantidad, tiempo_bit):
+        """Tiempos de un bloque de muestras consecutivas.
+
+        Args:
+            primera_muestra (int): Índice global de la primera muestra
+            cantidad (int): Muestras del bloque
+            tiempo_bit (float): Duración de un bit en ms
+
+        Returns:
+            np.ndarray: Tiempos en ms
+        """
+        paso = tiempo_bit / self.sobremuestreo
+        return (primera_muestra + np.arange(cantidad)) * paso
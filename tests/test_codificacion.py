@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from codificador_tramas import construir_trama, formatear_lote, valor_a_byte
+from decodificador_uart import decodificar_senal
+from encuadre_uart import ENCUADRES_COMUNES, obtener_encuadre
+from parser_flujo import ParserFlujo
+from sintesis_senal import SintetizadorSenal, tramas_a_bits
+
+VOLTAJES = np.linspace(-12, 12, 241)
+MUESTRAS_POR_BIT = 10
+
+
+@pytest.mark.parametrize("nombre", ENCUADRES_COMUNES)
+def test_texto_ida_y_vuelta(nombre):
+    encuadre = obtener_encuadre(nombre)
+    datos, _ = formatear_lote(VOLTAJES, encuadre=encuadre)
+
+    parser = ParserFlujo(encuadre)
+    tramas = parser.alimentar(datos)
+
+    assert [valor for _, valor in tramas] == VOLTAJES.tolist()
+    assert [trama for trama, _ in tramas] == [construir_trama(v, encuadre) for v in VOLTAJES]
+    assert parser.errores == 0 and parser.bytes_descartados == 0
+    for trama, _ in tramas:
+        verificacion = encuadre.verificar_trama(trama)
+        assert verificacion.inicio_correcto and verificacion.paridad_correcta
+        assert verificacion.parada_correcta
+
+
+@pytest.mark.parametrize("nombre", ENCUADRES_COMUNES)
+def test_senal_ida_y_vuelta(nombre):
+    encuadre = obtener_encuadre(nombre)
+    _, lote = formatear_lote(VOLTAJES, encuadre=encuadre)
+    tramas = [construir_trama(v, encuadre) for v in VOLTAJES]
+
+    # Tramas seguidas con la marca ('1') a tensión negativa, como en RS-232,
+    # y la línea en reposo antes y después
+    sintetizador = SintetizadorSenal(MUESTRAS_POR_BIT, amplitud_ruido=0.5)
+    muestras = sintetizador.generar(tramas_a_bits(tramas), np.full(len(tramas), -12.0))
+    reposo = np.full(3 * MUESTRAS_POR_BIT, -12.0)
+    senal = np.concatenate((reposo, muestras, reposo))
+
+    resultado = decodificar_senal(senal, MUESTRAS_POR_BIT, lsb_primero=False, encuadre=encuadre)
+
+    assert resultado.bytes_datos.tolist() == lote.bytes_datos.tolist()
+    assert resultado.paridad_correcta.all() and resultado.parada_correcta.all()
+
+
+def test_senal_en_bloques_no_pierde_tramas_partidas():
+    encuadre = obtener_encuadre()
+    tramas = [construir_trama(v, encuadre) for v in VOLTAJES]
+    muestras = SintetizadorSenal(MUESTRAS_POR_BIT, amplitud_ruido=0).generar(
+        tramas_a_bits(tramas), np.full(len(tramas), -12.0))
+    senal = np.concatenate((np.full(MUESTRAS_POR_BIT, -12.0), muestras, np.full(MUESTRAS_POR_BIT, -12.0)))
+
+    datos = []
+    pendiente = np.zeros(0)
+    for inicio in range(0, senal.size, 997):
+        bloque = np.concatenate((pendiente, senal[inicio:inicio + 997]))
+        resultado = decodificar_senal(bloque, MUESTRAS_POR_BIT, lsb_primero=False)
+        datos.extend(resultado.bytes_datos.tolist())
+        pendiente = bloque[resultado.consumidas:]
+
+    esperados = [encuadre.dato_de_byte[valor_a_byte(v)] for v in VOLTAJES]
+    assert datos == esperados
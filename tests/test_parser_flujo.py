@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from codificador_tramas import ENVIO_PENDIENTE, formatear_lote, sellar_envio
+from formato_binario import (ANUNCIO_BINARIO, ANUNCIO_TEXTO, SYNC, TAMANO_PAQUETE, codificar_paquetes,
+                             crc8, paquetes_consecutivos)
+from parser_flujo import ParserFlujo
+
+VOLTAJES = np.random.default_rng(0).uniform(-12, 12, 300)
+
+
+def alimentar_en_bloques(parser, datos, tamano):
+    """Pasa `datos` por el parser en lecturas de `tamano` bytes."""
+    tramas, marcas, sensores = [], [], []
+    for inicio in range(0, len(datos), tamano):
+        tramas.extend(parser.alimentar(datos[inicio:inicio + tamano]))
+        marcas.extend(parser.marcas)
+        sensores.extend(parser.sensores)
+    return tramas, marcas, sensores
+
+
+@pytest.mark.parametrize("tamano", [1, 2, 5, 7, 64, 4096])
+def test_texto_en_bloques(tamano):
+    generados = list(range(1000, 1000 + VOLTAJES.size))
+    sensores = [i % 4 + 1 for i in range(VOLTAJES.size)]
+    datos, _ = formatear_lote(VOLTAJES, generados, envio=5000, sensores=sensores)
+    completo = ParserFlujo().alimentar(datos)
+
+    parser = ParserFlujo()
+    tramas, marcas, canales = alimentar_en_bloques(parser, datos, tamano)
+
+    assert tramas == completo
+    assert [valor for _, valor in tramas] == VOLTAJES.tolist()
+    assert marcas == [(g, 5000) for g in generados]
+    assert canales == sensores
+    assert parser.errores == 0 and parser.bytes_descartados == 0
+
+
+@pytest.mark.parametrize("tamano", [1, 3, 64])
+def test_resincroniza_ante_basura(tamano):
+    datos, _ = formatear_lote(VOLTAJES[:50])
+    registros = datos.splitlines(keepends=True)
+    basura = b"\x00\xff<<TRAMA:|VOLT:>\n<roto"
+    mezcla = b"".join(basura + registro if i % 7 == 0 else registro
+                      for i, registro in enumerate(registros))
+
+    parser = ParserFlujo()
+    tramas, _, _ = alimentar_en_bloques(parser, mezcla, tamano)
+
+    assert [valor for _, valor in tramas] == VOLTAJES[:50].tolist()
+    assert parser.bytes_descartados > 0
+
+
+def test_registros_malformados_se_cuentan():
+    parser = ParserFlujo()
+    tramas = parser.alimentar(b"<TRAMA:0102|VOLT:1.0>\n<TRAMA:01011010101|VOLT:x>\n"
+                              b"<TRAMA:01011010101|VOLT:2.5>\n")
+    assert tramas == [("01011010101", 2.5)]
+    assert parser.errores == 2
+
+
+def test_sellar_envio_completa_la_marca_pendiente():
+    datos, _ = formatear_lote(VOLTAJES[:10], list(range(10)))
+    assert datos.count(ENVIO_PENDIENTE) == 10
+
+    sellado = sellar_envio(datos, 1_700_000_000_000_000_000)
+
+    assert len(sellado) == len(datos)
+    parser = ParserFlujo()
+    parser.alimentar(sellado)
+    assert parser.marcas == [(i, 1_700_000_000_000_000_000) for i in range(10)]
+
+
+def test_crc8_conocido():
+    # CRC-8 (polinomio 0x07, sin reflexión ni XOR final) de "123456789"
+    assert crc8(b"123456789") == 0xF4
+
+
+def test_paquetes_con_crc_incorrecto_se_descartan():
+    paquetes = bytearray(codificar_paquetes(VOLTAJES[:20]))
+    paquetes[5 * TAMANO_PAQUETE + 3] ^= 0x01  # Voltaje alterado: el CRC ya no coincide
+
+    parser = ParserFlujo()
+    tramas = parser.alimentar(ANUNCIO_BINARIO + bytes(paquetes))
+
+    esperados = np.round(np.delete(VOLTAJES[:20], 5) * 1000) / 1000
+    assert [valor for _, valor in tramas] == esperados.tolist()
+    assert parser.bytes_descartados > 0
+    assert paquetes_consecutivos(paquetes, 0, 20) == 5
+
+
+@pytest.mark.parametrize("tamano", [1, 4, TAMANO_PAQUETE, 1000])
+def test_binario_en_bloques(tamano):
+    datos = ANUNCIO_BINARIO + codificar_paquetes(VOLTAJES) + ANUNCIO_TEXTO + formatear_lote(VOLTAJES)[0]
+    completo = ParserFlujo().alimentar(datos)
+
+    parser = ParserFlujo()
+    tramas, _, _ = alimentar_en_bloques(parser, datos, tamano)
+
+    assert tramas == completo
+    assert len(tramas) == 2 * VOLTAJES.size
+    assert not parser.modo_binario
+    assert parser.bytes_descartados == 0
+
+
+@pytest.mark.parametrize("tamano", [1, 7, 4096])
+def test_binario_sin_anuncio(tamano):
+    # El analizador se conectó a mitad de un paquete y sin ver el anuncio
+    datos = codificar_paquetes(VOLTAJES)[3:]
+
+    parser = ParserFlujo()
+    tramas, _, _ = alimentar_en_bloques(parser, datos, tamano)
+
+    assert parser.modo_binario
+    assert datos[3] == SYNC
+    assert len(tramas) == VOLTAJES.size - 1
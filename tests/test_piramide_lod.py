@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from buffer_circular import BufferCircular
+from piramide_lod import PiramideMinMax
+
+
+def llenar(piramide, valores, lote=1000):
+    """Agrega los valores al historial de la pirámide en lotes, con tiempo = índice."""
+    buffer = piramide.buffer
+    for inicio in range(0, valores.size, lote):
+        bloque = valores[inicio:inicio + lote]
+        buffer.extender(np.arange(inicio, inicio + bloque.size, dtype=np.float64), bloque)
+        piramide.actualizar()
+
+
+def comparar(piramide, valores, ancho, pixeles):
+    """Compara una consulta en vivo con el mínimo y máximo por fuerza bruta."""
+    fin = valores.size - 1
+    x, y = piramide.consultar(fin - ancho, fin, pixeles)
+
+    assert x.size <= 2 * (pixeles + 2)
+    assert x[0] <= max(0, fin - ancho)
+    # Los bloques devueltos cubren desde x[0] hasta la última muestra
+    cubiertos = valores[int(x[0]):]
+    assert y.min() == cubiertos.min()
+    assert y.max() == cubiertos.max()
+
+
+@pytest.mark.parametrize("ancho", [50, 500, 5_000, 50_000, 99_999])
+def test_consulta_igual_a_fuerza_bruta(ancho):
+    valores = np.random.default_rng(1).normal(size=100_000)
+    piramide = PiramideMinMax(BufferCircular(100_000))
+    llenar(piramide, valores)
+
+    comparar(piramide, valores, ancho, 800)
+
+
+def test_pico_de_una_muestra_visible_en_todo_zoom():
+    valores = np.zeros(200_000)
+    valores[123_457] = 9.0
+    valores[7] = -9.0
+    piramide = PiramideMinMax(BufferCircular(200_000))
+    llenar(piramide, valores, lote=4097)
+
+    for ancho in (80_000, 150_000, 199_999):
+        x, y = piramide.consultar(valores.size - 1 - ancho, valores.size - 1, 300)
+        assert y.max() == 9.0
+    assert piramide.consultar(0, valores.size - 1, 300)[1].min() == -9.0
+
+
+def test_niveles_gruesos_conservan_lo_que_el_historial_descarto():
+    # El historial crudo guarda 10 000 muestras; la pirámide debe abarcar 1 000 000
+    valores = np.random.default_rng(2).uniform(-12, 12, 1_000_000)
+    piramide = PiramideMinMax(BufferCircular(10_000), cobertura=valores.size)
+    llenar(piramide, valores, lote=7919)
+
+    assert piramide.primer_tiempo == 0
+    for ancho in (20_000, 300_000, 999_999):
+        comparar(piramide, valores, ancho, 1000)
+
+
+def test_limpiar_descarta_los_resumenes():
+    piramide = PiramideMinMax(BufferCircular(1000))
+    llenar(piramide, np.full(5000, 5.0))
+    piramide.buffer.limpiar()
+    piramide.limpiar()
+    llenar(piramide, np.full(3000, -1.0))
+
+    x, y = piramide.consultar(0, 2999, 100)
+    assert set(y.tolist()) == {-1.0}
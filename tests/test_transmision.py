@@ -0,0 +1,116 @@
+import time
+
+import pytest
+
+from bus_sensores import PlanificadorSensores, SensorSimulado
+from codificador_tramas import formatear_lote
+from control_flujo import ColaTransmision
+from marcapasos import Marcapasos
+from parser_flujo import ParserFlujo
+from transporte import crear_tubo
+
+
+def leer_todo(extremo):
+    extremo.timeout = 0.5
+    return extremo.read(extremo.in_waiting)
+
+
+def test_cola_sella_el_envio_al_escribir():
+    transmisor, receptor = crear_tubo()
+    cola = ColaTransmision(transmisor)
+    datos, _ = formatear_lote([1.0, 2.0, 3.0], [10, 20, 30])
+    cola.encolar(datos, 3, sellar=True)
+
+    time.sleep(0.05)  # El lote espera en la cola
+    antes = time.time_ns()
+    assert cola.enviar(1 << 16) == (len(datos), 3)
+    despues = time.time_ns()
+
+    parser = ParserFlujo()
+    tramas = parser.alimentar(leer_todo(receptor))
+    assert [valor for _, valor in tramas] == [1.0, 2.0, 3.0]
+    for generado, (marca_generado, envio) in zip([10, 20, 30], parser.marcas):
+        assert marca_generado == generado
+        assert antes <= envio <= despues
+
+
+def test_cola_llena_descarta_los_lotes_mas_antiguos():
+    transmisor, receptor = crear_tubo()
+    cola = ColaTransmision(transmisor, capacidad=100)
+    for numero in range(5):
+        cola.encolar(bytes([65 + numero]) * 40, 2)
+
+    assert cola.tramas_descartadas == 6
+    assert cola.pendientes == 80
+    cola.detenido = True
+    assert cola.enviar(1000) == (0, 0)
+    cola.detenido = False
+    assert cola.enviar(1000) == (80, 4)
+    assert leer_todo(receptor) == b"D" * 40 + b"E" * 40
+
+
+def test_cola_respeta_el_maximo_por_escritura():
+    transmisor, receptor = crear_tubo()
+    cola = ColaTransmision(transmisor)
+    for _ in range(4):
+        cola.encolar(b"x" * 30, 1)
+
+    assert cola.enviar(70) == (60, 2)
+    # Siempre sale al menos un lote aunque supere el máximo
+    assert cola.enviar(10) == (30, 1)
+    assert cola.pendientes == 30
+
+
+def test_marcapasos_no_acumula_deriva():
+    marcapasos = Marcapasos(tasa=200)
+    inicio = time.monotonic()
+    for _ in range(41):
+        assert marcapasos.esperar()
+        marcapasos.registrar(1)
+        time.sleep(0.002)  # Trabajo de cada envío, menor que el periodo
+    transcurrido = time.monotonic() - inicio
+
+    assert transcurrido == pytest.approx(40 / 200, rel=0.1)
+    assert marcapasos.tasa_lograda() == pytest.approx(200, rel=0.1)
+
+
+def test_marcapasos_espera_a_que_salga_lo_escrito():
+    # 1000 baudios y 10 bits por carácter: 100 caracteres por segundo
+    marcapasos = Marcapasos(baudrate=1000, bits_por_caracter=10)
+    marcapasos.esperar()
+    marcapasos.registrar(10)
+    inicio = time.monotonic()
+    marcapasos.esperar()
+    assert time.monotonic() - inicio == pytest.approx(0.1, abs=0.03)
+
+
+def test_planificador_reparte_el_bus_segun_la_tasa():
+    sensores = [SensorSimulado(1, "Temperatura", tasa=1, semilla=0),
+                SensorSimulado(2, "Presión", tasa=10, semilla=1),
+                SensorSimulado(3, "Caudal", tasa=25, semilla=2)]
+    planificador = PlanificadorSensores(sensores)
+
+    identificadores, valores, vencimientos = planificador.vencidas(10.0)
+
+    assert vencimientos == sorted(vencimientos)
+    assert all(vencimiento <= 10.0 for vencimiento in vencimientos)
+    assert all(-12 <= valor <= 12 for valor in valores)
+    for sensor in sensores:
+        assert abs(identificadores.count(sensor.identificador) - 10 * sensor.tasa) <= 1
+    assert planificador.proximo() > 10.0
+
+
+def test_planificador_limita_las_muestras_por_llamada():
+    planificador = PlanificadorSensores([SensorSimulado(1, "Caudal", tasa=100, semilla=0)])
+
+    primeras = planificador.vencidas(1.0, maximo=30)[2]
+    resto = planificador.vencidas(1.0)[2]
+
+    assert len(primeras) == 30
+    assert primeras[-1] <= resto[0]
+    assert abs(len(primeras) + len(resto) - 100) <= 1
+
+
+def test_planificador_rechaza_identificadores_repetidos():
+    with pytest.raises(ValueError):
+        PlanificadorSensores([SensorSimulado(1, "Nivel"), SensorSimulado(1, "Caudal")])
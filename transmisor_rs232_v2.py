@@ -9,6 +9,9 @@ from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.backends._backend_tk import NavigationToolbar2Tk
 import numpy as np
+from transporte import abrir_transporte, PUERTOS_VIRTUALES
+from codificador_tramas import construir_trama
+from encuadre_uart import ENCUADRE_PREDETERMINADO, ENCUADRES_COMUNES, obtener_encuadre
 
 class SensorIndustrial(tk.Tk):
     """Simulador de sensor industrial con transmisión RS-232.
@@ -74,7 +77,7 @@ class SensorIndustrial(tk.Tk):
         ttk.Label(top_frame, text="Puerto:", 
                  style='Industrial.TLabel').pack(side=tk.LEFT, padx=5)
         self.port_select = ttk.Combobox(top_frame, 
-                                     values=["/dev/ttyS0", "/dev/ttyS1"],
+                                     values=self.DEFAULT_PORTS + PUERTOS_VIRTUALES,
                                      width=10)
         self.port_select.set("/dev/ttyS0")
         self.port_select.pack(side=tk.LEFT, padx=5)
@@ -88,6 +91,13 @@ class SensorIndustrial(tk.Tk):
         self.baud_rate.set("9600")
         self.baud_rate.pack(side=tk.LEFT, padx=5)
 
+        # Encuadre del carácter: bits de datos, paridad y bits de parada
+        ttk.Label(top_frame, text="Encuadre:", 
+                 style='Industrial.TLabel').pack(side=tk.LEFT, padx=5)
+        self.encuadre_select = ttk.Combobox(top_frame, values=ENCUADRES_COMUNES, width=6)
+        self.encuadre_select.set(ENCUADRE_PREDETERMINADO)
+        self.encuadre_select.pack(side=tk.LEFT, padx=5)
+
         # Título centrado
         title_label = ttk.Label(top_frame, 
                                text="Simulación de Sensor Industrial - RS-232",
@@ -271,14 +281,14 @@ class SensorIndustrial(tk.Tk):
             try:
                 puerto = self.port_select.get()
                 baudrate = int(self.baud_rate.get())
+                self.encuadre = obtener_encuadre(self.encuadre_select.get())
                 
-                self.ser = serial.Serial(
-                    port=puerto,
+                # La línea usa la misma paridad y bits de parada que las tramas
+                self.ser = abrir_transporte(
+                    puerto,
                     baudrate=baudrate,
-                    bytesize=serial.EIGHTBITS,
-                    parity=serial.PARITY_NONE,
-                    stopbits=serial.STOPBITS_ONE,
-                    timeout=1
+                    timeout=1,
+                    **self.encuadre.opciones_serial()
                 )
                 
                 if not self.ser.is_open:
@@ -306,7 +316,7 @@ class SensorIndustrial(tk.Tk):
             try:
                 baudrate = int(self.baud_rate.get())
                 if not self.ser or not self.ser.is_open:
-                    self.ser = serial.Serial('/tmp/ttyS1', baudrate)
+                    self.ser = abrir_transporte('/tmp/ttyS1', baudrate, **self.encuadre.opciones_serial())
                 elif self.ser.baudrate != baudrate:
                     self.ser.baudrate = baudrate
                 
@@ -315,19 +325,12 @@ class SensorIndustrial(tk.Tk):
                 self.activar_pin('RTS', True)    # RTS activo para solicitar envío
                 self.activar_pin('DTR', True)    # DTR siempre activo
                 
-                # Crear trama RS-232
-                # Convertir el valor a un byte (0-255)
-                byte_valor = int((valor + 12) * 10)  # Convertir rango -12V a +12V en 0-255
-                byte_valor = max(0, min(255, byte_valor))  # Asegurar rango válido
-                
-                # Formar trama RS-232:
+                # Formar trama RS-232 con el encuadre elegido:
                 # - 1 bit de inicio (0)
-                # - 8 bits de datos
-                # - 1 bit de paridad (par)
-                # - 1 bit de parada (1)
-                bits_datos = format(byte_valor, '08b')
-                paridad = '1' if bits_datos.count('1') % 2 == 0 else '0'  # Paridad par
-                trama = f"0{bits_datos}{paridad}1"  # Inicio(0) + Datos + Paridad + Parada(1)
+                # - 5 a 8 bits de datos (el voltaje de -12V a +12V cuantizado)
+                # - 1 bit de paridad, salvo sin paridad
+                # - 1, 1,5 o 2 bits de parada (1)
+                trama = construir_trama(valor, self.encuadre)
                 
                 # Mostrar datos binarios con explicación de la trama
                 self.mostrar_datos_binarios(trama)
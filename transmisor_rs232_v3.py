@@ -9,6 +9,17 @@ from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.backends._backend_tk import NavigationToolbar2Tk
 import numpy as np
+from collections import deque
+from motor_transmision import MotorTransmision
+from bus_sensores import PlanificadorSensores, crear_sensores
+from codificador_tramas import codificar_lote, verificar_trama
+from encuadre_uart import ENCUADRE_PREDETERMINADO, ENCUADRES_COMUNES, obtener_encuadre
+from buffer_circular import BufferCircular
+from formato_binario import FORMATOS
+from transporte import abrir_transporte, PUERTOS_VIRTUALES
+from control_flujo import LINEAS_MODEM, MODOS_FLUJO, SIN_CONTROL, leer_lineas, opciones_puerto
+from monitor_lineas import crear_monitor
+from perfilador import Perfilador, agregar_menu_perfil
 
 class SensorIndustrial(tk.Tk):
     """Simulador de sensor industrial con transmisión RS-232.
@@ -23,7 +34,15 @@ class SensorIndustrial(tk.Tk):
     DEFAULT_BAUD_RATES = ["1200", "2400", "4800", "9600", "19200"]
     DEFAULT_PORTS = ["COM6", "COM7", "COM8"]
     DEFAULT_SENSORS = ["Temperatura", "Presión", "Nivel", "Caudal"]
+    MAX_SENSORES = 1000  # Sensores multiplexados como máximo en un bus
+    TASA_LINEA = "Línea"  # Sin tasa fija: tan rápido como la línea
+    DEFAULT_TASAS = [TASA_LINEA, "1", "10", "100", "1000"]  # Registros por segundo
     VOLTAGE_RANGE = (-12, 12)  # Voltaje mínimo y máximo en V
+    INTERVALO_OBSERVACION = 100  # ms entre refrescos de la interfaz
+    MAX_TRAMAS_INSPECTOR = 6  # Últimas tramas visibles en el inspector
+    CAPACIDAD_HISTORIAL = 100_000  # Valores enviados que se conservan
+    PUNTOS_VISIBLES = 50  # Valores en la ventana visible
+    FUNCIONES_PERFIL = ["observar_transmision", "dibujar_señal", "actualizar_vista"]
     
     def __init__(self):
         """Inicializa la aplicación y configura la interfaz gráfica."""
@@ -70,11 +89,25 @@ class SensorIndustrial(tk.Tk):
         self.sensor_type.set("Temperatura")
         self.sensor_type.pack(side=tk.LEFT, padx=5)
 
+        # Cantidad de sensores multiplexados en la línea (1 = un solo sensor)
+        ttk.Label(top_frame, text="Sensores:", 
+                 style='Industrial.TLabel').pack(side=tk.LEFT, padx=5)
+        self.sensores_spin = ttk.Spinbox(top_frame, from_=1, to=self.MAX_SENSORES, width=5)
+        self.sensores_spin.set(1)
+        self.sensores_spin.pack(side=tk.LEFT, padx=5)
+
+        # Registros por segundo (un sensor) o velocidad de la línea
+        ttk.Label(top_frame, text="Tasa:", 
+                 style='Industrial.TLabel').pack(side=tk.LEFT, padx=5)
+        self.tasa_select = ttk.Combobox(top_frame, values=self.DEFAULT_TASAS, width=6)
+        self.tasa_select.set(self.TASA_LINEA)
+        self.tasa_select.pack(side=tk.LEFT, padx=5)
+
         # Control de puerto COM
         ttk.Label(top_frame, text="Puerto:", 
                  style='Industrial.TLabel').pack(side=tk.LEFT, padx=5)
         self.port_select = ttk.Combobox(top_frame, 
-                                     values=self.DEFAULT_PORTS,
+                                     values=self.DEFAULT_PORTS + PUERTOS_VIRTUALES,
                                      width=10)
         self.port_select.set("COM6")  # Puerto por defecto
         self.port_select.pack(side=tk.LEFT, padx=5)
@@ -88,6 +121,32 @@ class SensorIndustrial(tk.Tk):
         self.baud_rate.set("9600")
         self.baud_rate.pack(side=tk.LEFT, padx=5)
 
+        # Encuadre del carácter: bits de datos, paridad y bits de parada
+        ttk.Label(top_frame, text="Encuadre:", 
+                 style='Industrial.TLabel').pack(side=tk.LEFT, padx=5)
+        self.encuadre_select = ttk.Combobox(top_frame, values=ENCUADRES_COMUNES, width=6)
+        self.encuadre_select.set(ENCUADRE_PREDETERMINADO)
+        self.encuadre_select.pack(side=tk.LEFT, padx=5)
+
+        # Formato de la línea (texto compatible o binario compacto)
+        ttk.Label(top_frame, text="Formato:", 
+                 style='Industrial.TLabel').pack(side=tk.LEFT, padx=5)
+        self.formato_select = ttk.Combobox(top_frame, values=FORMATOS, width=8)
+        self.formato_select.set(FORMATOS[0])
+        self.formato_select.pack(side=tk.LEFT, padx=5)
+
+        # Control de flujo: el receptor puede detener la salida
+        ttk.Label(top_frame, text="Flujo:", 
+                 style='Industrial.TLabel').pack(side=tk.LEFT, padx=5)
+        self.flujo_select = ttk.Combobox(top_frame, values=MODOS_FLUJO, width=9)
+        self.flujo_select.set(SIN_CONTROL)
+        self.flujo_select.pack(side=tk.LEFT, padx=5)
+
+        # Marcas de tiempo para medir la latencia en el analizador (solo texto)
+        self.marcas_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top_frame, text="Marcas de tiempo",
+                        variable=self.marcas_var).pack(side=tk.LEFT, padx=5)
+
         # Título centrado
         title_label = ttk.Label(top_frame, 
                                text="Simulación de Sensor Industrial - RS-232",
@@ -110,6 +169,16 @@ class SensorIndustrial(tk.Tk):
                                   highlightthickness=0)
         self.pin_canvas.pack(fill=tk.X, padx=5, pady=5)
 
+        # Inspector de tramas persistente: un solo widget que se reutiliza
+        self.inspector_frame = ttk.LabelFrame(self.visual_frame, text="Inspector de Tramas RS-232",
+                                            padding="10", style='Industrial.TLabel')
+        self.inspector_frame.pack(fill=tk.X, padx=10, pady=5)
+        self.inspector_text = tk.Text(self.inspector_frame, height=self.MAX_TRAMAS_INSPECTOR,
+                                      font=('Courier', 11), bg='#2b2b2b', fg='#00ff88',
+                                      state='disabled')
+        self.inspector_text.pack(fill=tk.X)
+        self.tramas_inspector = deque(maxlen=self.MAX_TRAMAS_INSPECTOR)
+
         # Panel de señal
         self.signal_frame = ttk.LabelFrame(self.visual_frame, text="Señal de Transmisión RS-232",
                                          padding="15", style='Industrial.TLabel')
@@ -127,6 +196,16 @@ class SensorIndustrial(tk.Tk):
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
+        # Desplazamiento por el historial (100 = en vivo)
+        historial_frame = ttk.Frame(self.signal_frame, style='Industrial.TFrame')
+        historial_frame.pack(fill=tk.X, padx=5)
+        ttk.Label(historial_frame, text="Historial:",
+                 style='Industrial.TLabel').pack(side=tk.LEFT, padx=5)
+        self.historial_scale = ttk.Scale(historial_frame, from_=0, to=100, orient=tk.HORIZONTAL,
+                                         command=lambda _: self.actualizar_vista())
+        self.historial_scale.set(100)
+        self.historial_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
         # Configurar gráfico
         self.ax.set_facecolor('#1C1C1C')
         self.fig.patch.set_facecolor('#1C1C1C')
@@ -150,11 +229,20 @@ class SensorIndustrial(tk.Tk):
         self.dibujar_pines_rs232()
 
         # Inicializar datos para el gráfico
-        self.x_data = [0]
-        self.y_data = [0]
+        self.historial = BufferCircular(self.CAPACIDAD_HISTORIAL)
+        self.historial.agregar(0, 0)
         self.ser = None
+        self.motor = None
+        self.monitor = None  # Cambios de las líneas de entrada entre observaciones
+        self.transiciones_vistas = {}
         self.transmitiendo = False
 
+        # Perfil opcional de los métodos críticos (menú Perfil o variable RS232_PERFIL)
+        self.perfilador = Perfilador(self, self.FUNCIONES_PERFIL, self.after,
+                                     prefijo="perfil_transmisor")
+        self.perfilador.activar_desde_entorno()
+        agregar_menu_perfil(self, self.perfilador)
+
     def generar_dato_sensor(self):
         """Genera un valor de sensor simulado entre -12V y +12V"""
         return random.uniform(-12, 12)
@@ -209,8 +297,9 @@ class SensorIndustrial(tk.Tk):
         self.pin_canvas.delete('descripcion')
 
     def activar_pin(self, nombre, activo=True):
-        """Activa o desactiva visualmente un pin"""
-        color = '#00ff88' if activo else '#333333'
+        """Activa o desactiva visualmente un pin (None: el enlace no tiene esa línea; 'pulso': cambió y volvió)"""
+        colores = {None: self.bg_color, 'pulso': '#ffaa00', True: '#00ff88', False: '#333333'}
+        color = colores[activo if activo in colores else bool(activo)]
         self.pin_canvas.itemconfig(nombre, fill=color)
 
     def dibujar_grid(self):
@@ -220,50 +309,45 @@ class SensorIndustrial(tk.Tk):
         self.fig.patch.set_facecolor('#1C1C1C')
         self.canvas.draw()
 
-    def mostrar_datos_binarios(self, datos_binarios):
-        """Muestra los datos binarios en la interfaz"""
-        # Crear una ventana emergente para mostrar los datos binarios
-        if hasattr(self, 'ventana_datos') and self.ventana_datos.winfo_exists():
-            self.ventana_datos.destroy()
-            
-        self.ventana_datos = tk.Toplevel(self)
-        self.ventana_datos.title("Datos Binarios")
-        self.ventana_datos.geometry("400x200")
-        
-        # Frame para los datos
-        frame = ttk.Frame(self.ventana_datos, padding="10")
-        frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Mostrar los bits
-        ttk.Label(frame, text="Trama RS-232:", 
-                 font=('Arial', 12, 'bold')).pack(pady=5)
+    def mostrar_datos_binarios(self, tramas):
+        """Muestra las últimas tramas enviadas en el inspector"""
+        self.tramas_inspector.extend(tramas)
         
-        # Crear un widget Text para mostrar los bits con formato
-        text = tk.Text(frame, height=4, width=40, font=('Courier', 12))
-        text.pack(pady=5)
-        text.insert('1.0', datos_binarios)
-        text.configure(state='disabled')
-
-    def dibujar_señal(self, valor):
-        """Actualiza la visualización de la señal"""
-        # Agregar nuevo punto
-        self.x_data.append(self.x_data[-1] + 1)
-        self.y_data.append(valor)
-        
-        # Mantener solo los últimos 50 puntos
-        if len(self.x_data) > 50:
-            self.x_data = self.x_data[-50:]
-            self.y_data = self.y_data[-50:]
+        # Reutilizar el mismo widget reemplazando su contenido
+        self.inspector_text.configure(state='normal')
+        self.inspector_text.delete('1.0', tk.END)
+        self.inspector_text.insert('1.0', "\n".join(
+            " ".join(parte for parte in verificar_trama(trama, self.motor.encuadre)[:4] if parte)  # Inicio Datos Paridad Parada
+            for trama in self.tramas_inspector))
+        self.inspector_text.configure(state='disabled')
+
+    def dibujar_señal(self, valores):
+        """Actualiza la visualización de la señal con los valores recibidos"""
+        # Agregar nuevos puntos al historial
+        inicio = self.historial.ultimo_tiempo + 1
+        self.historial.extender(np.arange(inicio, inicio + len(valores)), valores)
+        self.actualizar_vista()
+
+    def actualizar_vista(self):
+        """Dibuja la ventana del historial elegida con el deslizador"""
+        posicion = float(self.historial_scale.get())
+        if posicion >= 100:
+            x_data, y_data = self.historial.ultimos(self.PUNTOS_VISIBLES)
+        else:
+            ancho = self.PUNTOS_VISIBLES - 1
+            inicio, fin = self.historial.primer_tiempo, self.historial.ultimo_tiempo
+            t_fin = max(inicio + ancho, inicio + (fin - inicio) * posicion / 100)
+            x_data, y_data = self.historial.ventana(t_fin - ancho, t_fin)
         
         # Actualizar datos de la línea y puntos
-        self.line.set_data(self.x_data, self.y_data)
-        self.scatter.set_offsets(list(zip(self.x_data, self.y_data)))
+        self.line.set_data(x_data, y_data)
+        self.scatter.set_offsets(np.column_stack((x_data, y_data)))
         
         # Ajustar límites
-        self.ax.set_xlim(max(0, self.x_data[-1] - 49), self.x_data[-1] + 1)
+        self.ax.set_xlim(max(0, x_data[-1] - 49), x_data[-1] + 1)
         
-        # Redibujar
-        self.canvas.draw()
+        # Redibujar cuando Tk quede libre; varias llamadas se agrupan en un dibujado
+        self.canvas.draw_idle()
 
     def iniciar_transmision(self):
         """Inicia o detiene la transmisión de datos"""
@@ -271,105 +355,145 @@ class SensorIndustrial(tk.Tk):
             try:
                 puerto = self.port_select.get()
                 baudrate = int(self.baud_rate.get())
+                flujo = self.flujo_select.get()
+                encuadre = obtener_encuadre(self.encuadre_select.get())
                 
-                self.ser = serial.Serial(
-                    port=puerto,
+                # La línea usa la misma paridad y bits de parada que las tramas
+                self.ser = abrir_transporte(
+                    puerto,
                     baudrate=baudrate,
-                    bytesize=serial.EIGHTBITS,
-                    parity=serial.PARITY_NONE,
-                    stopbits=serial.STOPBITS_ONE,
-                    timeout=1
+                    timeout=1,
+                    **encuadre.opciones_serial(),
+                    **opciones_puerto(flujo)
                 )
                 
                 if not self.ser.is_open:
                     self.ser.open()
                     
+                # Varios sensores: bus multiplexado con los tipos en rotación
+                cantidad = int(self.sensores_spin.get())
+                planificador = None
+                if cantidad > 1:
+                    planificador = PlanificadorSensores(crear_sensores(min(cantidad, self.MAX_SENSORES),
+                                                                       self.DEFAULT_SENSORS))
+                tasa = None
+                if self.tasa_select.get() != self.TASA_LINEA:
+                    tasa = float(self.tasa_select.get())
+                    if tasa <= 0:
+                        raise ValueError(f"Tasa inválida: {tasa}")
+                    
+                # El motor escribe en su propio hilo; la interfaz solo lo observa
+                self.motor = MotorTransmision(self.ser, self.generar_dato_sensor, baudrate,
+                                              formato=self.formato_select.get(),
+                                              marcas_tiempo=self.marcas_var.get(),
+                                              planificador=planificador, tasa=tasa,
+                                              flujo=flujo, encuadre=encuadre)
+                self.motor.start()
+                self.monitor = crear_monitor(self.ser)
+                if self.monitor is not None:
+                    self.transiciones_vistas = dict(self.monitor.transiciones)
+                    self.monitor.start()
+                    
                 self.transmitiendo = True
                 self.btn_transmitir.config(text="Detener Transmisión")
-                self.status_label.config(text=f"Estado: Conectado a {puerto} a {baudrate} baudios")
-                self.transmitir()
+                self.status_label.config(text=f"Estado: Conectado a {self.ser.port} a {baudrate} baudios")
+                self.observar_transmision()
                 
             except serial.SerialException as e:
                 self.status_label.config(text=f"Error de conexión: {str(e)}")
             except ValueError as e:
+                if self.ser and self.ser.is_open:
+                    self.ser.close()
                 self.status_label.config(text=f"Error de configuración: {str(e)}")
         else:
             self.detener_transmision()
 
-    def transmitir(self):
-        """Transmite datos por el puerto serial"""
-        if self.transmitiendo:
-            valor = self.generar_dato_sensor()
-            tipo = self.sensor_type.get()
-            mensaje = f"{tipo}: {valor:.2f}"
+    def observar_transmision(self):
+        """Refleja en la interfaz el avance del motor de transmisión"""
+        if not self.transmitiendo:
+            return
+        motor = self.motor
+
+        if motor.error is not None:
+            print(f"Error de puerto serial: {motor.error}")
+            self.detener_transmision()
+            self.status_label.config(text=f"Error: {str(motor.error)}")
+            return
+
+        # Recoger los valores enviados desde la última observación
+        valores = []
+        while motor.valores_recientes:
+            valores.append(motor.valores_recientes.popleft())
+
+        # TX activo mientras haya tráfico; las líneas de control muestran
+        # el estado real del puerto (CTS inactivo = el receptor pidió parar)
+        self.activar_pin('TX', bool(valores) and not motor.cola.detenido)
+        for nombre, activo in leer_lineas(self.ser).items():
+            self.activar_pin(nombre, activo)
+        if self.monitor is not None:
+            # Una línea que cambió y volvió entre dos observaciones se resalta
+            for nombre, cantidad in self.monitor.transiciones.items():
+                if cantidad - self.transiciones_vistas.get(nombre, 0) > 1:
+                    self.activar_pin(nombre, 'pulso')
+            self.transiciones_vistas = dict(self.monitor.transiciones)
+
+        if valores:
+            # Mostrar datos binarios de las últimas tramas enviadas
+            recientes = codificar_lote(valores[-self.MAX_TRAMAS_INSPECTOR:], encuadre=motor.encuadre)
+            self.mostrar_datos_binarios(motor.encuadre.textos[dato] for dato in recientes.bytes_datos.tolist())
             
-            try:
-                baudrate = int(self.baud_rate.get())
-                puerto = self.port_select.get()
-                if not self.ser or not self.ser.is_open:
-                    self.ser = serial.Serial(puerto, baudrate, timeout=1)
-                elif self.ser.baudrate != baudrate:
-                    self.ser.baudrate = baudrate
-                
-                # Activar pines relevantes
-                self.activar_pin('TX', True)     # TX activo durante transmisión
-                self.activar_pin('RTS', True)    # RTS activo para solicitar envío
-                self.activar_pin('DTR', True)    # DTR siempre activo
-                
-                # Crear trama RS-232
-                # Convertir el valor a un byte (0-255)
-                byte_valor = int((valor + 12) * 10)  # Convertir rango -12V a +12V en 0-255
-                byte_valor = max(0, min(255, byte_valor))  # Asegurar rango válido
-                
-                # Formar trama RS-232:
-                # - 1 bit de inicio (0)
-                # - 8 bits de datos
-                # - 1 bit de paridad (par)
-                # - 1 bit de parada (1)
-                bits_datos = format(byte_valor, '08b')
-                paridad = '1' if bits_datos.count('1') % 2 == 0 else '0'  # Paridad par
-                trama = f"0{bits_datos}{paridad}1"  # Inicio(0) + Datos + Paridad + Parada(1)
-                
-                # Mostrar datos binarios con explicación de la trama
-                self.mostrar_datos_binarios(trama)
-                
-                # Enviar datos con formato especial para el analizador incluyendo la trama
-                mensaje_formateado = f"<TRAMA:{trama}|VOLT:{valor}>\n"
-                self.ser.write(mensaje_formateado.encode())
-                
-                # Visualizar la señal
-                self.dibujar_señal(valor)
-                
-                # Desactivar pines después de un tiempo
-                self.after(50, lambda: self.activar_pin('TX', False))
-                self.after(100, lambda: self.activar_pin('RTS', False))
-                
-                # Actualizar estado con información detallada
-                self.status_label.config(
-                    text=f"Estado: Transmitiendo a {baudrate} baudios | Bits enviados: {len(trama)}")
-                
-            except serial.SerialException as e:
-                print(f"Error de puerto serial: {e}")
-                if self.ser and self.ser.is_open:
-                    self.ser.close()
-                self.ser = None
-                self.status_label.config(text=f"Error: {str(e)}")
-                
-            # Calcular delay basado en baudrate
-            delay = max(1000, int(1000 * (10 / int(self.baud_rate.get()))))  # mínimo 1 segundo
-            self.after(delay, self.transmitir)
+            # Visualizar la señal
+            self.dibujar_señal(valores)
+            
+        # Actualizar estado con información detallada
+        estado = (f"Estado: Transmitiendo a {motor.baudrate} baudios ({motor.formato}, "
+                  f"{motor.encuadre.nombre}) | "
+                  f"Tramas: {motor.tramas_enviadas} ({motor.tasa_tramas():.1f}/s) | "
+                  f"Bytes enviados: {motor.bytes_enviados}")
+        if motor.planificador is not None:
+            # Si el bus pide más de lo que da la línea, el retraso crece
+            planificador = motor.planificador
+            estado += (f" | Sensores: {len(planificador.sensores)} "
+                       f"({planificador.tasa_total:.0f} muestras/s pedidas) | "
+                       f"Retraso: {planificador.retraso * 1000:.0f} ms")
+        elif motor.tasa:
+            # Ritmo fijo: cuánto se logró y con qué puntualidad
+            informe = motor.marcapasos.informe()
+            estado += (f" | Objetivo: {motor.tasa:g}/s | Jitter p99: "
+                       f"{informe['jitter_p99_ms']:.2f} ms")
+        cola = motor.cola
+        if cola.modo != SIN_CONTROL:
+            # Lo retenido mientras el receptor no acepta y lo que se perdió
+            estado += (f" | Flujo {cola.modo}: {'DETENIDO' if cola.detenido else 'libre'} "
+                       f"({cola.pausas} pausas, {cola.tiempo_detenido:.1f} s) | "
+                       f"Pendiente: {cola.pendientes} B (máx {cola.max_pendientes}) | "
+                       f"Descartadas: {cola.tramas_descartadas}")
+        self.status_label.config(text=estado)
+        
+        self.after(self.INTERVALO_OBSERVACION, self.observar_transmision)
 
     def detener_transmision(self):
         """Detiene la transmisión de datos"""
         self.transmitiendo = False
+        if self.motor is not None:
+            self.motor.detener()
+            self.motor = None
+        if self.monitor is not None:
+            self.monitor.detener()
+            self.monitor = None
         if self.ser and self.ser.is_open:
             self.ser.close()
+        self.activar_pin('TX', False)
+        for nombre in LINEAS_MODEM:
+            self.activar_pin(nombre, False)
         self.btn_transmitir.config(text="Iniciar Transmisión")
         self.status_label.config(text="Estado: Detenido")
 
     def on_closing(self):
         """Maneja el cierre de la aplicación"""
         self.detener_transmision()
+        if self.perfilador.activo:
+            print(f"Reporte de perfil: {self.perfilador.guardar_reporte()}")
         self.destroy()
 
 if __name__ == "__main__":
@@ -1,19 +1,32 @@
 import serial
-import time
+import sys
+from encuadre_uart import obtener_encuadre
+from marcapasos import Marcapasos
+from transporte import abrir_transporte
 
 
 try:
-    # Configurar el puerto serial virtual
-    ser = serial.Serial('/tmp/ttyS1', 9600, timeout=1)
-    print("Transmisor conectado al puerto virtual /tmp/ttyS1")
+    # Configurar el puerto serial virtual (o el indicado, p. ej. pty:// o socket://)
+    puerto = sys.argv[1] if len(sys.argv) > 1 else '/tmp/ttyS1'
+    # Con el encuadre predeterminado, el mismo que usan el transmisor y el analizador
+    ser = abrir_transporte(puerto, 9600, timeout=1, **obtener_encuadre().opciones_serial())
+    print(f"Transmisor conectado al puerto virtual {ser.port}")
 
 
-    # Enviar datos a través del puerto serial
+    # Enviar datos a través del puerto serial, un mensaje por segundo
+    # medido desde el inicio (sin deriva) y al ritmo de la línea
+    marcapasos = Marcapasos(9600, tasa=1)
     for i in range(10):
+        marcapasos.esperar()
         mensaje = f"Mensaje {i}"
-        ser.write(f"{mensaje}\n".encode())
+        datos = f"{mensaje}\n".encode()
+        ser.write(datos)
+        marcapasos.registrar(len(datos))
         print(f"Enviado: {mensaje}")
-        time.sleep(1)  # Esperar 1 segundo entre envíos
+
+    informe = marcapasos.informe()
+    print(f"Tasa lograda: {informe['tasa_lograda']:.4f} mensajes/s | "
+          f"Jitter p99: {informe['jitter_p99_ms']:.2f} ms")
 
 
 except serial.SerialException as e:
@@ -0,0 +1,443 @@
+import os
+import select
+import socket
+import threading
+import time
+from collections import deque
+
+import serial
+
+# Esquemas propios; cualquier otro nombre se abre con `serial.serial_for_url`,
+# que acepta dispositivos (COM6, /dev/ttyS1) y URLs como loop:// o socket://
+ESQUEMA_MEMORIA = "mem://"
+ESQUEMA_PTY = "pty://"
+ESQUEMA_SERVIDOR = "servidor://"
+
+# Opciones que se agregan a las listas de puertos de las interfaces
+PUERTOS_VIRTUALES = ["loop://", "pty://", "servidor://localhost:7777",
+                     "socket://localhost:7777"]
+
+
+def abrir_transporte(puerto, baudrate=9600, timeout=None, **opciones):
+    """Abre un enlace serial real o simulado por su nombre.
+
+    - `mem://nombre`: tubo en memoria dentro del mismo proceso; la primera
+      apertura de un nombre devuelve un extremo y la segunda el otro
+    - `pty://`: par pseudoterminal de Linux; el otro programa abre la ruta
+      de `nombre_esclavo` como un puerto serial común
+    - `servidor://host:puerto`: espera una conexión TCP (por ejemplo de
+      otro programa abierto con `socket://host:puerto`)
+    - Cualquier otro: dispositivo o URL de pyserial (`loop://`, `socket://`)
+
+    Args:
+        puerto (str): Nombre del puerto o URL
+        baudrate (int): Velocidad en baudios
+        timeout (float): Espera máxima de `read` en segundos
+        **opciones: Parámetros adicionales de `serial.Serial`
+
+    Returns:
+        Objeto con la interfaz de `serial.Serial` que usan los programas
+        (`read`, `write`, `in_waiting`, `timeout`, `is_open`, `close`)
+
+    Raises:
+        serial.SerialException: Si el enlace no se puede abrir
+    """
+    try:
+        if puerto.startswith(ESQUEMA_MEMORIA):
+            return _abrir_memoria(puerto, baudrate, timeout)
+        if puerto.startswith(ESQUEMA_PTY):
+            return PuertoPty(baudrate, timeout)
+        if puerto.startswith(ESQUEMA_SERVIDOR):
+            host, _, numero = puerto[len(ESQUEMA_SERVIDOR):].rpartition(":")
+            return ServidorTcp(host, int(numero), baudrate, timeout)
+        return serial.serial_for_url(puerto, baudrate=baudrate, timeout=timeout, **opciones)
+    except serial.SerialException:
+        raise
+    except (OSError, ValueError) as e:
+        raise serial.SerialException(f"No se pudo abrir {puerto}: {e}") from e
+
+
+class _Canal:
+    """Un sentido del tubo en memoria: cola de bloques de bytes.
+
+    También lleva las líneas de control que maneja el extremo que escribe
+    (RTS y DTR); el otro extremo las ve cruzadas como CTS y DSR/DCD, igual
+    que con un cable null-modem.
+    """
+
+    def __init__(self, capacidad):
+        self.bloques = deque()
+        self.cantidad = 0
+        self.capacidad = capacidad
+        self.cerrado = False
+        self.rts = True  # pyserial activa RTS y DTR al abrir el puerto
+        self.dtr = True
+        self.transiciones = {"rts": 0, "dtr": 0}  # Cambios de cada línea, como TIOCGICOUNT
+        self.condicion = threading.Condition()
+
+    def cambiar_linea(self, nombre, activa):
+        with self.condicion:
+            if getattr(self, nombre) != bool(activa):
+                setattr(self, nombre, bool(activa))
+                self.transiciones[nombre] += 1
+                self.condicion.notify_all()
+
+
+class ExtremoMemoria:
+    """Extremo de un tubo en memoria con la interfaz de `serial.Serial`.
+
+    Lo escrito en un extremo se lee en el otro. Los bloques se encolan sin
+    copiarse (los `bytes` son inmutables) y una lectura de al menos el
+    tamaño del bloque lo devuelve tal cual, así que el costo del enlace no
+    depende del volumen de datos. La capacidad limita la memoria: `write`
+    espera, como un puerto con su buffer lleno, hasta que el otro lado lea.
+    Las líneas de control se emulan con un cable null-modem: RTS llega
+    como CTS y DTR como DSR y DCD al otro extremo.
+    """
+
+    CAPACIDAD = 1 << 20  # Bytes pendientes por sentido
+
+    def __init__(self, entrada, salida, nombre="mem://", baudrate=9600, timeout=None):
+        self._entrada = entrada
+        self._salida = salida
+        self.port = nombre
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.write_timeout = None
+        self.is_open = True
+
+    @property
+    def in_waiting(self):
+        return self._entrada.cantidad
+
+    @property
+    def rts(self):
+        return self._salida.rts
+
+    @rts.setter
+    def rts(self, activa):
+        self._salida.cambiar_linea("rts", activa)
+
+    @property
+    def dtr(self):
+        return self._salida.dtr
+
+    @dtr.setter
+    def dtr(self, activa):
+        self._salida.cambiar_linea("dtr", activa)
+
+    @property
+    def cts(self):
+        return self._entrada.rts
+
+    @property
+    def dsr(self):
+        return self._entrada.dtr
+
+    @property
+    def cd(self):
+        return self._entrada.dtr
+
+    @property
+    def ri(self):
+        return False
+
+    def contadores_lineas(self):
+        """Cambios acumulados de cada línea de entrada (CTS, DSR, DCD, RI)."""
+        transiciones = self._entrada.transiciones
+        return {"CTS": transiciones["rts"], "DSR": transiciones["dtr"],
+                "DCD": transiciones["dtr"], "RI": 0}
+
+    def esperar_lineas(self, previos, timeout=None):
+        """Espera a que cambie alguna línea de entrada, como TIOCMIWAIT.
+
+        Args:
+            previos (dict): Contadores ya vistos (de `contadores_lineas`)
+            timeout (float): Espera máxima en segundos
+
+        Returns:
+            dict: Contadores actuales (iguales a `previos` si venció el timeout)
+        """
+        canal = self._entrada
+        with canal.condicion:
+            canal.condicion.wait_for(
+                lambda: self.contadores_lineas() != previos or canal.cerrado or not self.is_open,
+                timeout)
+            return self.contadores_lineas()
+
+    def read(self, size=1):
+        """Lee hasta `size` bytes, esperando como mucho `timeout` segundos."""
+        canal = self._entrada
+        with canal.condicion:
+            if self.timeout is None or self.timeout > 0:
+                canal.condicion.wait_for(
+                    lambda: canal.cantidad >= size or canal.cerrado or not self.is_open,
+                    self.timeout)
+            partes = []
+            faltan = size
+            while faltan and canal.bloques:
+                bloque = canal.bloques[0]
+                if len(bloque) <= faltan:
+                    partes.append(canal.bloques.popleft())
+                else:
+                    partes.append(bloque[:faltan])
+                    canal.bloques[0] = bloque[faltan:]
+                faltan -= len(partes[-1])
+            canal.cantidad -= size - faltan
+            canal.condicion.notify_all()
+        return partes[0] if len(partes) == 1 else b"".join(partes)
+
+    def write(self, datos):
+        """Encola `datos` para el otro extremo."""
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        datos = bytes(datos)
+        canal = self._salida
+        with canal.condicion:
+            listo = canal.condicion.wait_for(
+                lambda: canal.cantidad < canal.capacidad or canal.cerrado or not self.is_open,
+                self.write_timeout)
+            if not listo:
+                raise serial.SerialTimeoutException("Tiempo de escritura agotado")
+            if not canal.cerrado:
+                canal.bloques.append(datos)
+                canal.cantidad += len(datos)
+                canal.condicion.notify_all()
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def reset_input_buffer(self):
+        with self._entrada.condicion:
+            self._entrada.bloques.clear()
+            self._entrada.cantidad = 0
+            self._entrada.condicion.notify_all()
+
+    def close(self):
+        self.is_open = False
+        # Al cerrar el puerto caen las líneas que maneja este extremo
+        self._salida.cambiar_linea("rts", False)
+        self._salida.cambiar_linea("dtr", False)
+        for canal in (self._entrada, self._salida):
+            with canal.condicion:
+                canal.cerrado = True
+                canal.condicion.notify_all()
+
+
+def crear_tubo(capacidad=None, baudrate=9600, nombre="mem://"):
+    """Crea un tubo en memoria.
+
+    Returns:
+        tuple: Los dos extremos (ExtremoMemoria)
+    """
+    capacidad = capacidad or ExtremoMemoria.CAPACIDAD
+    ida, vuelta = _Canal(capacidad), _Canal(capacidad)
+    return (ExtremoMemoria(vuelta, ida, nombre, baudrate),
+            ExtremoMemoria(ida, vuelta, nombre, baudrate))
+
+
+_tubos_pendientes = {}  # Nombre -> extremo que espera su segunda apertura
+_candado_tubos = threading.Lock()
+
+
+def _abrir_memoria(nombre, baudrate, timeout):
+    with _candado_tubos:
+        extremo = _tubos_pendientes.pop(nombre, None)
+        if extremo is None:
+            extremo, otro = crear_tubo(baudrate=baudrate, nombre=nombre)
+            _tubos_pendientes[nombre] = otro
+    extremo.timeout = timeout
+    return extremo
+
+
+class _TransporteFlujo:
+    """Base de los enlaces sobre un descriptor del sistema (pty, TCP).
+
+    Lee de forma no bloqueante hacia un buffer propio, con lo que
+    `in_waiting` es exacto en todas las plataformas, y espera con
+    `select` en lugar de sondear.
+    """
+
+    TAMANO_LECTURA = 1 << 16  # Bytes pedidos al sistema por lectura
+
+    def __init__(self, nombre, baudrate, timeout):
+        self.port = nombre
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.write_timeout = None
+        self.is_open = True
+        self._recibido = bytearray()
+
+    def _descriptor(self):
+        """Descriptor por el que llegan datos, o None si todavía no hay."""
+        raise NotImplementedError
+
+    def _recibir(self):
+        """Lee sin bloquear lo disponible; b'' si no hay nada."""
+        raise NotImplementedError
+
+    def _enviar(self, datos):
+        """Escribe sin bloquear; devuelve los bytes aceptados."""
+        raise NotImplementedError
+
+    def _esperar(self, espera, escritura=False):
+        descriptor = self._descriptor()
+        if descriptor is None:
+            time.sleep(0.01 if espera is None else min(espera, 0.01))
+            return
+        listas = ([], [descriptor], []) if escritura else ([descriptor], [], [])
+        select.select(*listas, espera)
+
+    @property
+    def in_waiting(self):
+        self._recibido += self._recibir()
+        return len(self._recibido)
+
+    def read(self, size=1):
+        """Lee hasta `size` bytes, esperando como mucho `timeout` segundos."""
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        limite = None if self.timeout is None else time.monotonic() + self.timeout
+        self._recibido += self._recibir()
+        while len(self._recibido) < size:
+            espera = None if limite is None else limite - time.monotonic()
+            if espera is not None and espera <= 0:
+                break
+            self._esperar(espera)
+            self._recibido += self._recibir()
+        datos = bytes(self._recibido[:size])
+        del self._recibido[:size]
+        return datos
+
+    def write(self, datos):
+        """Escribe todos los datos, esperando si el sistema no los acepta."""
+        if not self.is_open:
+            raise serial.PortNotOpenError()
+        vista = memoryview(bytes(datos))
+        limite = None if self.write_timeout is None else time.monotonic() + self.write_timeout
+        while vista:
+            vista = vista[self._enviar(vista):]
+            if vista:
+                espera = None if limite is None else limite - time.monotonic()
+                if espera is not None and espera <= 0:
+                    raise serial.SerialTimeoutException("Tiempo de escritura agotado")
+                self._esperar(espera, escritura=True)
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def reset_input_buffer(self):
+        self._recibir()
+        self._recibido.clear()
+
+
+class PuertoPty(_TransporteFlujo):
+    """Par pseudoterminal creado por el propio programa (solo Linux/Unix).
+
+    Este objeto es el lado maestro; el otro programa abre `nombre_esclavo`
+    (por ejemplo /dev/pts/3) como cualquier puerto serial, sin socat.
+    """
+
+    def __init__(self, baudrate=9600, timeout=None):
+        import tty
+        maestro, esclavo = os.openpty()
+        # Sin eco ni traducción de fin de línea, como una línea serial
+        tty.setraw(esclavo)
+        os.set_blocking(maestro, False)
+        self._maestro = maestro
+        self._esclavo = esclavo  # Abierto para que el par no se cierre sin lector
+        self.nombre_esclavo = os.ttyname(esclavo)
+        super().__init__(self.nombre_esclavo, baudrate, timeout)
+
+    def _descriptor(self):
+        return self._maestro
+
+    def fileno(self):
+        """Descriptor del lado maestro, para esperar con `selectors`."""
+        return self._maestro
+
+    def _recibir(self):
+        try:
+            return os.read(self._maestro, self.TAMANO_LECTURA)
+        except (BlockingIOError, InterruptedError):
+            return b""
+
+    def _enviar(self, datos):
+        try:
+            return os.write(self._maestro, datos)
+        except BlockingIOError:
+            return 0
+
+    def close(self):
+        if self.is_open:
+            self.is_open = False
+            os.close(self._maestro)
+            os.close(self._esclavo)
+
+
+class ServidorTcp(_TransporteFlujo):
+    """Enlace que espera una conexión TCP entrante.
+
+    Complementa a `socket://` de pyserial, que solo se conecta: un programa
+    abre `servidor://host:puerto` y el otro `socket://host:puerto`. Si el
+    cliente se desconecta se vuelve a aceptar otro; mientras no hay
+    cliente lo escrito se descarta, como en una línea sin nada conectado.
+    """
+
+    def __init__(self, host, puerto, baudrate=9600, timeout=None):
+        self._escucha = socket.create_server((host or "", puerto))
+        self._escucha.setblocking(False)
+        self._conexion = None
+        super().__init__(f"{ESQUEMA_SERVIDOR}{host}:{puerto}", baudrate, timeout)
+
+    def _aceptar(self):
+        if self._conexion is None:
+            try:
+                self._conexion, _ = self._escucha.accept()
+            except BlockingIOError:
+                return None
+            self._conexion.setblocking(False)
+            self._conexion.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return self._conexion
+
+    def _descriptor(self):
+        return self._conexion or self._escucha
+
+    def _desconectar(self):
+        self._conexion.close()
+        self._conexion = None
+
+    def _recibir(self):
+        conexion = self._aceptar()
+        if conexion is None:
+            return b""
+        try:
+            datos = conexion.recv(self.TAMANO_LECTURA)
+        except BlockingIOError:
+            return b""
+        except OSError:
+            datos = b""
+        if not datos:
+            self._desconectar()
+        return datos
+
+    def _enviar(self, datos):
+        conexion = self._aceptar()
+        if conexion is None:
+            return len(datos)
+        try:
+            return conexion.send(datos)
+        except BlockingIOError:
+            return 0
+        except OSError:
+            self._desconectar()
+            return len(datos)
+
+    def close(self):
+        if self.is_open:
+            self.is_open = False
+            if self._conexion is not None:
+                self._desconectar()
+            self._escucha.close()